@@ -0,0 +1,71 @@
+"""
+Benchmark de memoria del Router: bytes por nodo del diagrama posicionado.
+
+Compara los registros con __slots__ (NodeRecord / Anchors / EdgeRecord) con la
+representación anterior (node_data_map {'art', 'w', 'h', 'type'} + node_anchors con
+dicts de tuplas, ambos indexados por tuplas (fila, columna)).
+Los strings (etiquetas y arte ASCII) son idénticos en ambas y no se cuentan.
+
+Uso: python scripts/bench_memory.py [1000 10000 100000]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from ascii_architect.router import Router
+
+COLS = 4
+
+
+def synthetic_flow(n: int) -> str:
+    rows = []
+    for start in range(0, n, COLS):
+        rows.append(" -> ".join(f"svc_{i}.py" for i in range(start, min(start + COLS, n))))
+    return " ; ".join(rows)
+
+
+def deep_size(obj, seen=None) -> int:
+    """Tamaño recursivo (dict, list, tuple, __slots__), sin contar str."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, str):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(v, seen) for v in obj)
+    else:
+        for name in getattr(type(obj), '__slots__', ()):
+            size += deep_size(getattr(obj, name), seen)
+    return size
+
+
+def legacy_structures(diagram):
+    """Reconstruye el dict-de-dicts que usaba el Router antes de los registros."""
+    node_data_map = {}
+    node_anchors = {}
+    for node in diagram.nodes:
+        node_data_map[(node.row, node.col)] = {'art': node.art, 'w': node.w, 'h': node.h, 'type': node.shape}
+        cx, cy = node.x + node.w // 2, node.y + node.h // 2
+        node_anchors[(node.row, node.col)] = {
+            'n': (cx, node.y), 's': (cx, node.y + node.h - 1),
+            'e': (node.x + node.w - 1, cy), 'w': (node.x, cy)
+        }
+    return node_data_map, node_anchors
+
+
+def main():
+    sizes = [int(v) for v in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'nodos':>10} | {'slots B/nodo':>13} | {'dicts B/nodo':>13} | ahorro")
+    print("-" * 52)
+    for n in sizes:
+        diagram = Router().layout(synthetic_flow(n))
+        slots = deep_size(diagram) / n
+        legacy = deep_size(legacy_structures(diagram)) / n
+        print(f"{n:>10} | {slots:>13.0f} | {legacy:>13.0f} | {1 - slots / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Prueba de carga del servicio HTTP ('ascii-arch http').
+
+Lanza `--concurrency` clientes (hilos, http.client, una conexión por petición) que hacen
+`--requests` peticiones en total contra /flow (o /scan, /health) y reporta throughput,
+latencias (p50/p95/p99/max) y errores; al final muestra el /metrics del servidor.
+Con --spawn arranca el servidor (con --workers procesos) en un puerto libre y lo para al
+terminar.
+
+Uso:
+    python scripts/load_test.py --spawn --workers 4 --concurrency 16 --requests 2000
+    python scripts/load_test.py --url http://127.0.0.1:8765 --endpoint scan
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BODIES = {
+    "flow": lambda i: {"layout": f"Client_{i % 50} -> API_Gateway -> Service_{i % 7} ; Service_{i % 7} -> db_{i % 3}.sql",
+                       "compact": i % 2 == 0},
+    "scan": lambda i: {"path": "src", "depth": 3, "max_nodes": 40},
+    "health": lambda i: None,
+}
+
+
+def request(host: str, port: int, endpoint: str, body) -> tuple:
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        if body is None:
+            conn.request("GET", f"/{endpoint}")
+        else:
+            conn.request("POST", f"/{endpoint}", body=json.dumps(body), headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, data
+    finally:
+        conn.close()
+
+
+def percentile(ordered: list, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+
+def run(host: str, port: int, endpoint: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = {}
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            try:
+                status, _ = request(host, port, endpoint, BODIES[endpoint](i))
+                kind = None if status == 200 else f"HTTP {status}"
+            except OSError as e:
+                kind = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if kind:
+                    errors[kind] = errors.get(kind, 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "seconds": round(wall, 2),
+        "throughput_rps": round(total / wall, 1),
+        "latency_ms": {name: round(percentile(latencies, p), 1)
+                       for name, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+        "errors": errors,
+    }
+
+
+def spawn_server(workers: int):
+    """Arranca 'ascii-arch http' en un puerto libre; devuelve (proceso, puerto)."""
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    proc = subprocess.Popen([sys.executable, "-m", "ascii_architect.cli", "http", "--port", "0",
+                             "--workers", str(workers), "--root", ROOT],
+                            stdout=subprocess.PIPE, text=True, env=env, cwd=ROOT)
+    line = proc.stdout.readline()       # '🌐 Escuchando en http://127.0.0.1:PUERTO ...'
+    if "http://" not in line:
+        proc.kill()
+        raise SystemExit(f"El servidor no arrancó: {line!r}")
+    port = int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+    return proc, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--endpoint", choices=sorted(BODIES), default="flow")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--spawn", action="store_true", help="Arranca el servidor para la prueba.")
+    parser.add_argument("--workers", type=int, default=0, help="Workers del servidor con --spawn (0 = uno por CPU).")
+    args = parser.parse_args()
+
+    proc = None
+    if args.spawn:
+        proc, port = spawn_server(args.workers)
+        host = "127.0.0.1"
+    else:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    try:
+        request(host, port, "health", None)     # Calentamiento (y comprobación)
+        result = run(host, port, args.endpoint, args.requests, args.concurrency)
+        print(json.dumps(result, indent=2))
+        _, metrics = request(host, port, "metrics", None)
+        print("/metrics:", metrics.decode("utf-8"))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""ASCII Architect - Análisis local del grafo
+Responde sin IA (y en milisegundos) las preguntas típicas de arquitectura sobre un
+ScanGraph. Todo en O(V + E) salvo los rankings (O(V log k)):
+
+- fan-in / fan-out: los módulos más importados y los que más importan.
+- ciclos de imports: SCCs de Tarjan (graph.tarjan_scc) con más de un nodo o auto-bucle.
+- capas: profundidad de cada módulo en el DAG de componentes (0 = no importa nada
+  del proyecto) y la cadena de imports más larga.
+- huérfanos: módulos que ni importan ni son importados.
+- hubs: módulos con grado muy por encima de la media (media + 2σ, como mínimo HUB_MIN_DEGREE).
+
+Solo cuentan las aristas 'import'; el resto (contains, builds, ...) es estructura.
+analyze() devuelve un dict listo para json.dumps; format_report() lo resume en texto.
+"""
+import heapq
+
+from ascii_architect.graph import EDGE_KINDS, ScanGraph, tarjan_scc
+
+IMPORT_KIND = EDGE_KINDS.index("import")
+CONTAINS_KIND = EDGE_KINDS.index("contains")
+HUB_MIN_DEGREE = 5
+DEFAULT_TOP = 5
+REPORT_LIST_LIMIT = 10
+
+
+def _ranking(labels: list, counts: list, top: int) -> list:
+    best = heapq.nlargest(top, (i for i in range(len(counts)) if counts[i]), key=lambda i: (counts[i], -i))
+    return [{"node": labels[i], "count": counts[i]} for i in best]
+
+
+def _layers(adjacency: list, components: list):
+    """
+    Capa de cada nodo: 0 si no importa nada; si no, 1 + la mayor capa de lo que importa
+    (los ciclos comparten capa). components: los de tarjan_scc, sumideros primero (así
+    los sucesores ya tienen capa). Devuelve (capas, siguiente) con siguiente[i] = nodo
+    por el que sigue la cadena más larga desde i (None al llegar a la capa 0).
+    """
+    component_of = [0] * len(adjacency)
+    for index, members in enumerate(components):
+        for node in members:
+            component_of[node] = index
+    layer = [0] * len(adjacency)
+    following = [None] * len(adjacency)
+    for index, members in enumerate(components):
+        best, via = 0, None
+        for node in members:
+            for nxt in adjacency[node]:
+                if component_of[nxt] != index and layer[nxt] + 1 > best:
+                    best, via = layer[nxt] + 1, nxt
+        for node in members:
+            layer[node] = best
+            following[node] = via
+    return layer, following
+
+
+def analyze(graph: ScanGraph, top: int = DEFAULT_TOP) -> dict:
+    """Métricas del grafo de imports (ver docstring del módulo)."""
+    n = graph.node_count
+    labels = graph.labels
+    adjacency = [[] for _ in range(n)]
+    fan_in = [0] * n
+    fan_out = [0] * n
+    structural = set()    # Orígenes de aristas que no son imports: carpetas, compose, Terraform
+    kinds = dict.fromkeys(EDGE_KINDS, 0)
+    for a, b, kind in zip(graph.src, graph.dst, graph.kinds):
+        kinds[EDGE_KINDS[kind]] += 1
+        if kind == IMPORT_KIND:
+            adjacency[a].append(b)
+            fan_out[a] += 1
+            fan_in[b] += 1
+        else:
+            structural.add(a)
+            if kind != CONTAINS_KIND:
+                structural.add(b)   # Dockerfile, manifiestos, .sql...: no son módulos
+
+    modules = [i for i in range(n) if fan_in[i] or fan_out[i] or i not in structural]
+
+    components = tarjan_scc(adjacency)
+    cycles = []
+    for component in components:
+        if len(component) > 1 or component[0] in adjacency[component[0]]:
+            cycles.append(sorted(labels[i] for i in component))
+    cycles.sort(key=lambda members: (-len(members), members))
+
+    layer, following = _layers(adjacency, components)
+    linked = [i for i in modules if fan_in[i] or fan_out[i]]
+    depth = max((layer[i] for i in linked), default=-1) + 1
+    sizes = [0] * depth
+    for i in linked:
+        sizes[layer[i]] += 1
+    chain = []
+    if linked:
+        node = min(linked, key=lambda i: (-layer[i], labels[i]))
+        while node is not None:
+            chain.append(labels[node])
+            node = following[node]
+
+    degrees = [fan_in[i] + fan_out[i] for i in modules]
+    hubs = []
+    if degrees:
+        mean = sum(degrees) / len(degrees)
+        spread = (sum((d - mean) ** 2 for d in degrees) / len(degrees)) ** 0.5
+        threshold = max(HUB_MIN_DEGREE, mean + 2 * spread)
+        hubs = [{"node": labels[i], "fan_in": fan_in[i], "fan_out": fan_out[i]}
+                for i in modules if fan_in[i] + fan_out[i] >= threshold]
+        hubs.sort(key=lambda hub: (-(hub["fan_in"] + hub["fan_out"]), hub["node"]))
+
+    return {
+        "nodes": n,
+        "edges": len(graph),
+        "kinds": {kind: count for kind, count in kinds.items() if count},
+        "modules": len(modules),
+        "imports": kinds["import"],
+        "fan_in": _ranking(labels, fan_in, top),
+        "fan_out": _ranking(labels, fan_out, top),
+        "cycles": cycles,
+        "layers": {"depth": depth, "sizes": sizes, "longest_chain": chain},
+        "orphans": sorted(labels[i] for i in modules if not fan_in[i] and not fan_out[i]),
+        "hubs": hubs,
+    }
+
+
+def _sample(items: list, limit: int = REPORT_LIST_LIMIT) -> str:
+    text = ", ".join(items[:limit])
+    return f"{text} (+{len(items) - limit})" if len(items) > limit else text
+
+
+def format_report(result: dict) -> str:
+    """Reporte de texto compacto de analyze()."""
+    lines = [f"📊 {result['modules']} módulos, {result['imports']} imports "
+             f"({result['nodes']} nodos, {result['edges']} aristas en total)."]
+    if result["fan_in"]:
+        lines.append("📥 Más importados: " + ", ".join(f"{e['node']} ({e['count']})" for e in result["fan_in"]))
+    if result["fan_out"]:
+        lines.append("📤 Más dependencias: " + ", ".join(f"{e['node']} ({e['count']})" for e in result["fan_out"]))
+    if result["hubs"]:
+        lines.append("🕸️  Hubs: " + _sample([f"{h['node']} (↓{h['fan_in']} ↑{h['fan_out']})" for h in result["hubs"]]))
+
+    layers = result["layers"]
+    if layers["depth"]:
+        lines.append(f"🧱 Capas: {layers['depth']} (módulos por capa, de la base hacia arriba: "
+                     f"{' / '.join(map(str, layers['sizes']))})")
+        if len(layers["longest_chain"]) > 1:
+            lines.append("   Cadena más larga: " + " -> ".join(layers["longest_chain"]))
+
+    if result["cycles"]:
+        lines.append(f"🔁 Ciclos de imports: {len(result['cycles'])}")
+        for members in result["cycles"][:REPORT_LIST_LIMIT]:
+            lines.append("   - " + _sample(members, 6))
+        if len(result["cycles"]) > REPORT_LIST_LIMIT:
+            lines.append(f"   ... y {len(result['cycles']) - REPORT_LIST_LIMIT} más")
+    else:
+        lines.append("✅ Sin ciclos de imports.")
+
+    if result["orphans"]:
+        lines.append(f"🏝️  Huérfanos ({len(result['orphans'])}): {_sample(result['orphans'])}")
+    return "\n".join(lines)
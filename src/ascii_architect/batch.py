@@ -0,0 +1,151 @@
+"""ASCII Architect - Render por lotes
+Muchos diagramas en un solo proceso (o un pool): sin pagar el arranque del intérprete por
+cada uno como con 'ascii-arch flow'.
+
+Entrada JSONL, un spec por línea:
+    {"id": "auth", "layout": "User -> API -> DB", "compact": true, "cycles": "report",
+     "page": 1, "page_size": "100x40"}
+Solo 'layout' es obligatorio. Salida JSONL, un resultado por spec:
+    {"id": "auth", "line": 1, "ok": true, "diagram": "...", "cycles": [...], "pages": 3}
+    {"id": "roto", "line": 2, "ok": false, "error": "ValueError: falta 'layout'"}
+
+- Cada worker crea UN Router (reglas compiladas y caché de formas compartidas entre
+  todos sus diagramas) y lo reutiliza.
+- Errores aislados por spec: una línea mala da un resultado con ok=false y el lote
+  sigue. Si un worker muere, el pool entero queda roto: los specs que estaban en vuelo
+  dan ok=false, se crea un pool nuevo y el resto del lote continúa en él.
+- Orden 'input' (el de entrada) o 'completed' (según terminan). Como mucho `window`
+  specs en vuelo: la entrada (stdin) se lee a medida que se procesa.
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from ascii_architect.classifier import load_rules
+from ascii_architect.pager import parse_page_size
+from ascii_architect.router import Router
+
+BATCH_ORDERS = ("input", "completed")
+WINDOW_PER_WORKER = 16
+
+_router = None   # Router del worker (uno por proceso)
+
+
+def read_specs(lines):
+    """(número de línea, spec) por cada línea no vacía; el spec es el error si no es JSON."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"JSON inválido: {e}")
+
+
+def make_router(rules: str = None, compact: bool = False) -> Router:
+    return Router(use_neural_engine=False, rules=load_rules(rules) if rules else None, compact=compact)
+
+
+def _init_worker(rules: str, compact: bool):
+    global _router
+    _router = make_router(rules, compact)
+
+
+def render_spec(line: int, spec, router: Router = None) -> dict:
+    """Renderiza un spec. Nunca lanza: el error va en el resultado (ok=false)."""
+    router = router or _router
+    item_id = spec.get("id") if isinstance(spec, dict) else None
+    try:
+        if isinstance(spec, Exception):
+            raise spec
+        if not isinstance(spec, dict):
+            raise ValueError("cada línea debe ser un objeto JSON")
+        layout = spec.get("layout")
+        if not isinstance(layout, str) or not layout.strip():
+            raise ValueError("falta 'layout'")
+        cycles = spec.get("cycles", "keep")
+        if cycles not in Router.CYCLE_MODES:
+            raise ValueError(f"Modo de ciclos desconocido: '{cycles}' (usa {', '.join(Router.CYCLE_MODES)})")
+        router.cycles = cycles
+        size = parse_page_size(spec["page_size"]) if spec.get("page_size") else None
+        diagram = router.render(layout, compact=spec.get("compact"), page=spec.get("page"), page_size=size)
+    except Exception as e:
+        return {"id": item_id, "line": line, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    result = {"id": item_id, "line": line, "ok": True, "diagram": diagram}
+    if router.last_cycles:
+        result["cycles"] = router.last_cycles
+    if router.last_pages:
+        result["pages"] = router.last_pages.count
+    return result
+
+
+def _failed(line: int, spec, error: Exception) -> dict:
+    item_id = spec.get("id") if isinstance(spec, dict) else None
+    return {"id": item_id, "line": line, "ok": False, "error": f"{type(error).__name__}: {error}"}
+
+
+def run_batch(specs, jobs: int = 0, order: str = "input", rules: str = None, compact: bool = False,
+              window: int = None):
+    """
+    Genera un resultado por spec de `specs` ([(línea, spec)], ver read_specs).
+
+    Args:
+        jobs: procesos del pool (0 = uno por CPU; 1 = en este proceso, sin pool).
+        order: 'input' u 'completed'.
+        window: specs en vuelo como mucho (por defecto WINDOW_PER_WORKER por proceso).
+    """
+    if order not in BATCH_ORDERS:
+        raise ValueError(f"Orden desconocido: '{order}' (usa {', '.join(BATCH_ORDERS)})")
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        router = make_router(rules, compact)
+        for line, spec in specs:
+            yield render_spec(line, spec, router)
+        return
+
+    window = window or jobs * WINDOW_PER_WORKER
+    specs = iter(specs)
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(rules, compact))
+
+    pools = [new_pool()]    # El último es el activo; los rotos se cierran al final
+    try:
+        pending = deque()   # (futuro, línea, spec) en orden de entrada
+
+        def fill():
+            while len(pending) < window:
+                item = next(specs, None)
+                if item is None:
+                    return
+                try:
+                    future = pools[-1].submit(render_spec, *item)
+                except BrokenProcessPool:
+                    # Un worker murió: lo que estaba en vuelo ya tiene su error; el resto, a un pool nuevo
+                    pools.append(new_pool())
+                    future = pools[-1].submit(render_spec, *item)
+                pending.append((future, *item))
+
+        def collect(entry):
+            future, line, spec = entry
+            try:
+                return future.result()
+            except Exception as e:     # Worker caído (BrokenProcessPool) o spec no serializable
+                return _failed(line, spec, e)
+
+        fill()
+        while pending:
+            if order == "input":
+                yield collect(pending.popleft())
+            else:
+                done, _ = wait([entry[0] for entry in pending], return_when=FIRST_COMPLETED)
+                for entry in [entry for entry in pending if entry[0] in done]:
+                    pending.remove(entry)
+                    yield collect(entry)
+            fill()
+    finally:
+        for pool in pools:
+            pool.shutdown()
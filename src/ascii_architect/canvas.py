@@ -1,13 +1,18 @@
 class Canvas:
-    def __init__(self, width=80, height=20):
+    def __init__(self, width=80, height=20, origin_x=0, origin_y=0):
         self.width = width
         self.height = height
+        # Origen de la ventana: permite rasterizar solo una página de un diagrama grande
+        self.origin_x = origin_x
+        self.origin_y = origin_y
         # Creamos una matriz llena de espacios vacíos
         # self.grid[y][x]
         self.grid = [[" " for _ in range(width)] for _ in range(height)]
 
     def put_char(self, x, y, char):
         """Escribe un solo carácter si está dentro de los límites."""
+        x -= self.origin_x
+        y -= self.origin_y
         if 0 <= x < self.width and 0 <= y < self.height:
             self.grid[y][x] = char
 
@@ -0,0 +1,213 @@
+"""ASCII Architect - Clasificador de Formas
+Compila una tabla de reglas (substring, sufijo, extensión, regex + prioridad) en un
+autómata Aho-Corasick y una única regex combinada. Cada etiqueta se evalúa UNA vez,
+en O(longitud de la etiqueta) para las reglas literales, sin importar cuántas haya.
+"""
+import json
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+SHAPES = ("BOX", "SOFTBOX", "CYLINDER", "DIAMOND")
+RULE_KINDS = ("substring", "suffix", "extension", "regex")
+# Flags globales en línea, p. ej. '(?i)': dentro de la regex combinada cambiarían (o romperían) las demás
+_INLINE_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+class ShapeRule(NamedTuple):
+    kind: str          # substring | suffix | extension | regex
+    pattern: str
+    shape: str
+    priority: int = 0  # Mayor prioridad gana; empate -> la regla que aparece antes
+
+
+# Reglas históricas del Router (mismo orden de preferencia que los any(...) originales)
+DEFAULT_RULES = [
+    ShapeRule("substring", "DB", "CYLINDER", 30),
+    ShapeRule("substring", "SQL", "CYLINDER", 30),
+    ShapeRule("substring", "DATA", "CYLINDER", 30),
+    ShapeRule("substring", "?", "DIAMOND", 20),
+    ShapeRule("substring", "IF", "DIAMOND", 20),
+    ShapeRule("substring", "DECISION", "DIAMOND", 20),
+    ShapeRule("substring", "START", "SOFTBOX", 10),
+    ShapeRule("substring", "END", "SOFTBOX", 10),
+    ShapeRule("substring", "USER", "SOFTBOX", 10),
+    ShapeRule("substring", "[DIR]", "SOFTBOX", 10),
+]
+# Prioridad de una regla de usuario sin "priority": por encima de todas las de fábrica
+USER_RULE_PRIORITY = max(rule.priority for rule in DEFAULT_RULES) + 10
+
+
+class ShapeClassifier:
+    """
+    Decide la forma (BOX, SOFTBOX, CYLINDER, DIAMOND) de un nodo a partir de su etiqueta.
+
+    - substring / suffix / extension -> un solo autómata Aho-Corasick.
+    - regex -> una regex combinada (lookaheads ordenados por prioridad). Las que tienen
+      grupos (backreferences, grupos con nombre) o flags en línea se evalúan aparte.
+    Los resultados se cachean por etiqueta (LRU).
+    """
+
+    def __init__(self, rules: Optional[Iterable[ShapeRule]] = None, default: str = "BOX",
+                 case_sensitive: bool = False, cache_size: int = 4096):
+        self.rules = [self._validate(ShapeRule(*r)) for r in (DEFAULT_RULES if rules is None else rules)]
+        self.default = default.upper()
+        self.case_sensitive = case_sensitive
+
+        # Rango global: 0 = mejor regla. Ordenamos por prioridad desc, luego por posición.
+        order = sorted(range(len(self.rules)), key=lambda i: (-self.rules[i].priority, i))
+        self._rank = {rule_idx: rank for rank, rule_idx in enumerate(order)}
+        self._by_rank = [self.rules[i] for i in order]
+
+        self._compile_automaton()
+        self._compile_regex()
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def _validate(rule: ShapeRule) -> ShapeRule:
+        if rule.kind not in RULE_KINDS:
+            raise ValueError(f"Tipo de regla desconocido: '{rule.kind}' (usa {', '.join(RULE_KINDS)})")
+        shape = rule.shape.upper()
+        if shape not in SHAPES:
+            raise ValueError(f"Forma desconocida: '{rule.shape}' (usa {', '.join(SHAPES)})")
+        if not rule.pattern:
+            raise ValueError("Una regla no puede tener patrón vacío.")
+        pattern = rule.pattern
+        if rule.kind == "extension":
+            pattern = "." + pattern.lstrip(".")
+        return ShapeRule(rule.kind, pattern, shape, int(rule.priority))
+
+    def _norm(self, text: str) -> str:
+        return text if self.case_sensitive else text.upper()
+
+    # ------------------------------------------------------------------
+    # Compilación
+    # ------------------------------------------------------------------
+    def _compile_automaton(self):
+        """Aho-Corasick: goto (dict por estado), fail links y mejor rango por estado."""
+        no_match = len(self.rules)
+        self._goto = [{}]
+        best_any = [no_match]   # Mejor regla substring que termina en este estado
+        best_end = [no_match]   # Mejor regla suffix/extension (solo válida al final)
+
+        for idx, rule in enumerate(self.rules):
+            if rule.kind == "regex":
+                continue
+            state = 0
+            for ch in self._norm(rule.pattern):
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    best_any.append(no_match)
+                    best_end.append(no_match)
+                state = nxt
+            rank = self._rank[idx]
+            if rule.kind == "substring":
+                best_any[state] = min(best_any[state], rank)
+            else:
+                best_end[state] = min(best_end[state], rank)
+
+        # BFS para fail links; heredamos el mejor rango de la cadena de salida
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                target = self._goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                best_any[nxt] = min(best_any[nxt], best_any[fail[nxt]])
+                best_end[nxt] = min(best_end[nxt], best_end[fail[nxt]])
+                queue.append(nxt)
+
+        self._fail = fail
+        self._best_any = best_any
+        self._best_end = best_end
+        self._no_match = no_match
+
+    def _compile_regex(self):
+        """
+        Una sola regex: alternativas en orden de prioridad, cada una marcada con un grupo vacío.
+        Cada patrón se compila antes por separado (ValueError si es inválido); los que no se
+        pueden empalmar sin cambiar de significado (grupos: sus \\1 apuntarían a otro grupo;
+        flags en línea) quedan en _regex_alone, evaluados uno a uno.
+        """
+        parts = []
+        self._regex_ranks = {}
+        self._regex_alone = []     # [(rango, regex compilada)] en orden de prioridad
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        for rank, rule in enumerate(self._by_rank):
+            if rule.kind != "regex":
+                continue
+            try:
+                compiled = re.compile(rule.pattern, flags)
+            except re.error as e:
+                raise ValueError(f"Regex inválida '{rule.pattern}': {e}")
+            if compiled.groups or _INLINE_FLAGS.search(rule.pattern):
+                self._regex_alone.append((rank, compiled))
+                continue
+            name = f"_r{rank}"
+            self._regex_ranks[name] = rank
+            parts.append(f"(?=[\\s\\S]*?(?:{rule.pattern}))(?P<{name}>)")
+        self._regex = re.compile("(?:" + "|".join(parts) + ")", flags) if parts else None
+
+    # ------------------------------------------------------------------
+    # Clasificación
+    # ------------------------------------------------------------------
+    def _classify(self, label: str) -> str:
+        text = label.strip()
+        best = self._no_match
+
+        # 1. Autómata (una pasada por carácter)
+        goto, fail, best_any = self._goto, self._fail, self._best_any
+        state = 0
+        for ch in self._norm(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best_any[state] < best:
+                best = best_any[state]
+        if self._best_end[state] < best:
+            best = self._best_end[state]
+
+        # 2. Regex combinada (solo si puede mejorar el resultado)
+        if self._regex is not None and best > 0:
+            match = self._regex.match(text)
+            if match and match.lastgroup in self._regex_ranks:
+                best = min(best, self._regex_ranks[match.lastgroup])
+        for rank, regex in self._regex_alone:
+            if rank >= best:
+                break
+            if regex.search(text):
+                best = rank
+                break
+
+        return self._by_rank[best].shape if best < self._no_match else self.default
+
+
+def load_rules(path: str) -> list:
+    """
+    Carga una tabla de reglas desde JSON.
+
+    Formatos aceptados:
+      [ {"kind": "suffix", "pattern": "_repo.py", "shape": "CYLINDER", "priority": 50}, ... ]
+      {"defaults": false, "rules": [ ... ]}   # defaults=true (por defecto) añade DEFAULT_RULES
+
+    Una regla sin "priority" toma USER_RULE_PRIORITY: gana a las de fábrica que acierten
+    la misma etiqueta. Para quedar por debajo de ellas hay que dar una prioridad explícita.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    use_defaults = True
+    if isinstance(data, dict):
+        use_defaults = data.get("defaults", True)
+        data = data.get("rules", [])
+
+    rules = [ShapeRule(r["kind"], r["pattern"], r["shape"], r.get("priority", USER_RULE_PRIORITY)) for r in data]
+    return rules + DEFAULT_RULES if use_defaults else rules
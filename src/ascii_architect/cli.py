@@ -1,9 +1,12 @@
 import typer
 import sys
+import time
+from pathlib import Path
 from typing import Optional
-from ascii_architect.router import Router
-from ascii_architect.scanner import ProjectScanner
-from ascii_architect.narrator import Narrator
+from ascii_architect.docs_context import DEFAULT_BUDGET
+from ascii_architect.compact_topology import DEFAULT_PAYLOAD_BUDGET
+# El resto se importa dentro de cada comando: 'flow' no carga el scanner, el Narrador
+# (requests) ni asyncio, y nada carga torch salvo --neural (tests/test_startup.py)
 
 app = typer.Typer(
     name="ascii-arch",
@@ -12,110 +15,291 @@ app = typer.Typer(
     context_settings={"help_option_names": ["-h", "--help"]}
 )
 
+def _skip_watch(name: str) -> bool:
+    from ascii_architect.ignore import IGNORE_FILES
+    from ascii_architect.scanner import ProjectScanner
+    return name in ProjectScanner.IGNORE_DIRS or (name.startswith('.') and name not in IGNORE_FILES)
+
+
+def _run_watch(render, root: str, depth: int, accept=None):
+    """Bucle --watch común a flow y scan: redibuja al guardar, Ctrl+C para salir."""
+    from ascii_architect.watch import FrameRenderer, make_watcher, watch as watch_loop
+    watcher = make_watcher(root, max_depth=depth, skip=_skip_watch)
+    renderer = FrameRenderer()
+    try:
+        watch_loop(render, watcher, renderer, accept=accept)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        renderer.close()
+
+
+async def _narrate_styles(narrator, topology, styles: list, docs, refresh: bool, limit: int):
+    started = time.perf_counter()
+    async for name, text in narrator.explain_styles(topology, styles, context=docs, refresh=refresh, limit=limit):
+        elapsed = time.perf_counter() - started
+        typer.secho(f"\n🤖 ANÁLISIS IA (Estilo: {name.upper()}, {elapsed:.1f}s):", fg=typer.colors.MAGENTA, bold=True)
+        print(text)
+
+
+def _frame_header(target: str) -> str:
+    return f"👀 {target} · {time.strftime('%H:%M:%S')} · Ctrl+C para salir\n"
+
+
 @app.command()
 def flow(
-    layout: str = typer.Argument(..., help="String de flujo manual."),
-    neural: bool = typer.Option(False, "--neural", "-n", help="Usa motor neuronal.")
+    layout: Optional[str] = typer.Argument(None, help="String de flujo manual."),
+    neural: bool = typer.Option(False, "--neural", "-n", help="Usa motor neuronal."),
+    rules: Optional[str] = typer.Option(None, "--rules", "-r", help="JSON con reglas de formas (substring/suffix/extension/regex)."),
+    compact: bool = typer.Option(False, "--compact", "-c", help="Compacta el layout (reduce el área del canvas)."),
+    cycles: str = typer.Option("keep", "--cycles", help="Ciclos: keep, report (los lista) o collapse (los condensa)."),
+    page: Optional[int] = typer.Option(None, "--page", "-p", help="Renderiza solo esta página del diagrama (1-based)."),
+    page_size: Optional[str] = typer.Option(None, "--page-size", help="Pagina el diagrama en tiles ANCHOxALTO (ej: 100x40)."),
+    watch: Optional[str] = typer.Option(None, "--watch", "-w", help="Archivo con el flujo (una fila por línea): redibuja al guardarlo.")
 ):
+    if layout is None and watch is None:
+        typer.secho("❌ Error: indica un flujo o --watch ARCHIVO.", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    from ascii_architect.classifier import load_rules
+    from ascii_architect.pager import parse_page_size
+    from ascii_architect.router import Router
     try:
-        router = Router(use_neural_engine=neural)
-        router.process(layout)
+        router = Router(use_neural_engine=neural, rules=load_rules(rules) if rules else None, compact=compact, cycles=cycles)
+        size = parse_page_size(page_size) if page_size else None
+        if watch is None:
+            router.process(layout, page=page, page_size=size)
+            return
     except Exception as e:
         typer.secho(f"❌ Error: {e}", fg=typer.colors.RED)
+        return
+
+    target = Path(watch).resolve()
+
+    def frame(changes):
+        try:
+            lines = target.read_text(encoding="utf-8").splitlines()
+            text = router.render(" ; ".join(line.strip() for line in lines if line.strip()), page=page, page_size=size)
+        except Exception as e:
+            text = f"❌ Error: {e}"
+        return _frame_header(watch) + text
+
+    # Se observa la carpeta: los editores suelen guardar con rename (el inode cambia)
+    _run_watch(frame, str(target.parent), 1, accept=lambda changes: str(target) in changes)
 
 @app.command()
 def scan(
     path: str = typer.Argument(".", help="Ruta a analizar"),
     depth: int = typer.Option(1, "--depth", "-d", help="Profundidad de escaneo."),
+    jobs: int = typer.Option(1, "--jobs", "-j", help="Workers para leer imports en paralelo (0 = uno por CPU)."),
+    pool: str = typer.Option("thread", "--pool", help="Tipo de pool para --jobs: thread o process."),
+    late_imports: bool = typer.Option(False, "--late-imports", help="Incluye imports condicionales y dentro de funciones."),
+    cache: bool = typer.Option(False, "--cache/--no-cache", help="Cachés en <ruta>/.ascii-arch/ (escaneo incremental y respuestas de --ai). Desactivadas por defecto: escriben dentro del proyecto escaneado."),
+    gitignore: bool = typer.Option(True, "--gitignore/--no-gitignore", help="Respeta .gitignore / .ignore al recorrer el árbol."),
     graph: bool = typer.Option(True, "--graph/--no-graph", help="Mostrar dibujo ASCII."),
-    explain: bool = typer.Option(False, "--explain", "-e", help="Reporte de texto local."),
+    explain: bool = typer.Option(False, "--explain", "-e", help="Reporte local: fan-in/out, ciclos, capas, huérfanos y hubs."),
+    as_json: bool = typer.Option(False, "--json", help="Con --explain: el análisis local en JSON (sin encabezados)."),
     ai: bool = typer.Option(False, "--ai", help="Análisis IA (n8n)."),
-    style: str = typer.Option("pro", "--style", "-s", help="Personalidad: pro, hacker, soviet, ramsay, jarvis, eli5, doom.")
+    style: str = typer.Option("pro", "--style", "-s", help="Personalidad: pro, hacker, soviet, ramsay, jarvis, eli5, doom (varias: pro,jarvis,doom)."),
+    ai_jobs: int = typer.Option(4, "--ai-jobs", help="Peticiones simultáneas al Narrador con varios --style."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignora la respuesta de --ai en caché y vuelve a llamar al webhook."),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Muestra la respuesta de --ai a medida que llega (SSE / NDJSON / chunked)."),
+    send_docs: bool = typer.Option(False, "--docs/--no-docs", help="Con --ai, envía también la documentación del proyecto (README, docs/...)."),
+    docs_budget: int = typer.Option(DEFAULT_BUDGET, "--docs-budget", help="Caracteres de documentación enviados con --ai --docs."),
+    payload_budget: int = typer.Option(DEFAULT_PAYLOAD_BUDGET, "--payload-budget", help="Caracteres de topología (compacta) enviados con --ai; si no cabe se resumen carpetas (0 = sin límite)."),
+    rules: Optional[str] = typer.Option(None, "--rules", "-r", help="JSON con reglas de formas (substring/suffix/extension/regex)."),
+    compact: bool = typer.Option(False, "--compact", "-c", help="Compacta el layout (reduce el área del canvas)."),
+    cycles: str = typer.Option("keep", "--cycles", help="Ciclos: keep, report (los lista) o collapse (los condensa)."),
+    page: Optional[int] = typer.Option(None, "--page", "-p", help="Renderiza solo esta página del diagrama (1-based)."),
+    page_size: Optional[str] = typer.Option(None, "--page-size", help="Pagina el diagrama en tiles ANCHOxALTO (ej: 100x40)."),
+    max_nodes: Optional[int] = typer.Option(None, "--max-nodes", help="Agrupa el dibujo en como mucho N nodos (super-nodos con aristas sumadas)."),
+    cluster_by: str = typer.Option("folder", "--cluster", help="Agrupado para --max-nodes: folder (carpetas) o community (comunidades del grafo)."),
+    watch: bool = typer.Option(False, "--watch", "-w", help="Observa el árbol y redibuja el diagrama al guardar.")
 ):
     """
     🕵️ ESCÁNER CONTEXTUAL con Personalidad.
     """
-    scanner = ProjectScanner()
+    from ascii_architect.classifier import load_rules
+    from ascii_architect.clustering import cluster
+    from ascii_architect.ignore import IGNORE_FILES
+    from ascii_architect.pager import parse_page_size
+    from ascii_architect.router import Router
+    from ascii_architect.scanner import ProjectScanner
+
+    if cycles not in Router.CYCLE_MODES:
+        typer.secho(f"❌ Error: modo de ciclos desconocido '{cycles}' (usa {', '.join(Router.CYCLE_MODES)}).", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    # En --watch la caché vive siempre en memoria (cada guardado solo re-analiza lo cambiado);
+    # al disco solo va con --cache
+    scanner = ProjectScanner(jobs=jobs, pool=pool, late_imports=late_imports, cache=cache, gitignore=gitignore,
+                             memory_cache=watch)
+
+    if watch:
+        root = str(Path(path).resolve())
+        router = Router(use_neural_engine=False, rules=load_rules(rules) if rules else None, compact=compact, cycles=cycles)
+        size = parse_page_size(page_size) if page_size else None
+
+        def frame(changes):
+            # changes=None -> verificación completa; si no, solo lo que el watcher reportó.
+            # Un .gitignore / .ignore cambiado puede afectar a todo su subárbol: completa.
+            if changes and any(Path(changed).name in IGNORE_FILES for changed in changes):
+                changes = None
+            try:
+                topology = scanner.scan(root, max_depth=depth, changed=changes)
+                if max_nodes and topology:
+                    topology, _ = cluster(topology, max_nodes, cluster_by)
+                text = router.render(topology, page=page, page_size=size) if topology else "❌ No se encontraron archivos."
+            except Exception as e:
+                text = f"❌ Error: {e}"
+            return _frame_header(path) + text
+
+        try:
+            _run_watch(frame, root, depth)
+        finally:
+            scanner.save_cache()
+        return
     
     if graph:
         typer.secho(f"🔍 Escaneando '{path}'...", fg=typer.colors.YELLOW)
     
-    flow_string = scanner.scan(path, max_depth=depth)
+    topology = scanner.scan(path, max_depth=depth)
+    if graph and scanner.last_cache_stats:
+        stats = scanner.last_cache_stats
+        typer.secho(f"♻️  Caché: {stats['hits'] + stats['checked']} sin cambios, {stats['parsed']} re-analizados.", fg=typer.colors.BLUE)
     
-    if not flow_string:
+    if not topology:
         typer.secho("❌ No se encontraron archivos.", fg=typer.colors.RED)
         return
 
     # 1. DIBUJO
     if graph:
-        router = Router(use_neural_engine=False) 
-        router.process(flow_string)
+        router = Router(use_neural_engine=False, rules=load_rules(rules) if rules else None, compact=compact, cycles=cycles)
+        drawing = topology
+        if max_nodes:
+            # El dibujo usa el grafo agrupado; los reportes, el completo
+            drawing, groups = cluster(topology, max_nodes, cluster_by)
+            if groups:
+                typer.secho(f"🗂️  Agrupado ({cluster_by}): {topology.node_count} nodos -> {drawing.node_count} "
+                            f"({len(groups)} super-nodos).", fg=typer.colors.BLUE)
+        router.process(drawing, page=page, page_size=parse_page_size(page_size) if page_size else None)
+
+    from ascii_architect.analysis import analyze
+    from ascii_architect.narrator import Narrator
+    from ascii_architect.narrator_cache import NarratorCache
 
-    narrator = Narrator()
+    # El pool de conexiones se dimensiona con --ai-jobs: cada petición en paralelo reutiliza la suya
+    narrator = Narrator(cache=NarratorCache(Path(path).resolve()) if cache else None, payload_budget=payload_budget,
+                        pool_size=max(1, ai_jobs))
 
     # 2. LOCAL
-    if explain:
+    if explain and as_json:
+        import json
+        print(json.dumps(analyze(topology), ensure_ascii=False, indent=2))
+    elif explain:
         typer.secho("\n📄 REPORTE LOCAL:", fg=typer.colors.CYAN, bold=True)
-        print(narrator.explain(flow_string, use_ai=False))
+        print(narrator.explain(topology, use_ai=False))
 
     # 3. IA CON PERSONALIDAD
     if ai:
-        # Recuperamos contexto (Docs) si quieres enviarlos también
-        # docs = scanner.get_docs_content(path) 
-        # flow_string = flow_string + "\n" + docs 
+        # Contexto (Docs): solo el prefijo que cabe en el presupuesto, leído en paralelo
+        docs = scanner.get_docs_content(path, budget=docs_budget) if send_docs and docs_budget > 0 else None
         
-        typer.secho(f"\n🤖 ANÁLISIS IA (Estilo: {style.upper()}):", fg=typer.colors.MAGENTA, bold=True)
-        print(narrator.explain(flow_string, use_ai=True, style=style))
+        styles = list(dict.fromkeys(s.strip() for s in style.split(",") if s.strip())) or ["pro"]
+        if len(styles) > 1:
+            # Un solo escaneo, N personalidades en paralelo; cada una se imprime al llegar
+            import asyncio
+            asyncio.run(_narrate_styles(narrator, topology, styles, docs, refresh, ai_jobs))
+        elif stream:
+            typer.secho(f"\n🤖 ANÁLISIS IA (Estilo: {styles[0].upper()}):", fg=typer.colors.MAGENTA, bold=True)
+            for fragment in narrator.explain_stream(topology, style=styles[0], context=docs, refresh=refresh):
+                sys.stdout.write(fragment)
+                sys.stdout.flush()
+            print()
+        else:
+            typer.secho(f"\n🤖 ANÁLISIS IA (Estilo: {styles[0].upper()}):", fg=typer.colors.MAGENTA, bold=True)
+            print(narrator.explain(topology, use_ai=True, style=styles[0], context=docs, refresh=refresh))
+        stats = narrator.transport.metrics.snapshot()
+        if stats['attempts']:
+            typer.secho(f"📶 Narrador: {stats['attempts']} intentos ({stats['retries']} reintentos), "
+                        f"latencia {stats['latency_ms']['max']} ms{' (primer byte)' if stream and len(styles) == 1 else ''}.", fg=typer.colors.BLUE)
+        sent = narrator.last_payload
+        if sent:
+            summary = f", {len(sent['summarized'])} carpetas resumidas" if sent['summarized'] else ""
+            typer.secho(f"🗜️  Topología enviada: {sent['raw']:,} → {sent['compact']:,} caracteres "
+                        f"(-{100 - 100 * sent['compact'] // max(1, sent['raw'])}%){summary}.", fg=typer.colors.BLUE)
 
-if __name__ == "__main__":
-    app()
+@app.command()
+def batch(
+    source: str = typer.Argument("-", help="JSONL con un spec por línea: {\"id\", \"layout\", \"compact\", \"cycles\", \"page\", \"page_size\"} (- = stdin)."),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="JSONL de resultados (por defecto stdout)."),
+    jobs: int = typer.Option(0, "--jobs", "-j", help="Procesos (0 = uno por CPU, 1 = sin pool)."),
+    order: str = typer.Option("input", "--order", help="Orden de salida: input (el de entrada) o completed (según terminan)."),
+    rules: Optional[str] = typer.Option(None, "--rules", "-r", help="JSON con reglas de formas para todo el lote."),
+    compact: bool = typer.Option(False, "--compact", "-c", help="Compacta los layouts (salvo que el spec diga 'compact')."),
+):
+    """
+    📦 LOTE: renderiza muchos flujos en un pool de procesos y emite JSONL.
+    Un spec roto no corta el lote (sale con ok=false); el código de salida es 1 si falló alguno.
+    """
+    import json
+    from ascii_architect.batch import BATCH_ORDERS, read_specs, run_batch
 
+    if order not in BATCH_ORDERS:
+        typer.secho(f"❌ Error: orden desconocido '{order}' (usa {', '.join(BATCH_ORDERS)}).", fg=typer.colors.RED, err=True)
+        raise typer.Exit(2)
+    started = time.perf_counter()
+    ok = failed = 0
+    src = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    out = sys.stdout if output is None else open(output, "w", encoding="utf-8")
+    try:
+        for result in run_batch(read_specs(src), jobs=jobs, order=order, rules=rules, compact=compact):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            if result["ok"]:
+                ok += 1
+            else:
+                failed += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    color = typer.colors.YELLOW if failed else typer.colors.GREEN
+    typer.secho(f"📦 Lote: {ok} diagramas, {failed} errores en {time.perf_counter() - started:.2f}s.", fg=color, err=True)
+    if failed:
+        raise typer.Exit(1)
 
-# ... imports ...
 
 @app.command()
-def scan(
-    path: str = typer.Argument(".", help="Ruta a analizar"),
-    depth: int = typer.Option(1, "--depth", "-d", help="Profundidad de escaneo."),
-    graph: bool = typer.Option(True, "--graph/--no-graph", help="Mostrar dibujo ASCII."),
-    explain: bool = typer.Option(False, "--explain", "-e", help="Reporte de texto local."),
-    ai: bool = typer.Option(False, "--ai", help="Análisis IA (n8n)."),
-    style: str = typer.Option("pro", "--style", "-s", help="Personalidad: pro, hacker, soviet, ramsay, jarvis, eli5, doom.")
+def http(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interfaz de escucha (por defecto solo local)."),
+    port: int = typer.Option(8765, "--port", help="Puerto (0 = uno libre)."),
+    workers: int = typer.Option(0, "--workers", help="Procesos pre-forkeados (0 = uno por CPU)."),
+    root: str = typer.Option(".", "--root", help="Carpeta que /scan puede leer (y nada fuera de ella)."),
+    rules: Optional[str] = typer.Option(None, "--rules", "-r", help="JSON con reglas de formas."),
+    max_body: int = typer.Option(256 * 1024, "--max-body", help="Bytes máximos por petición (413 si se pasa)."),
+    scan_nodes: int = typer.Option(150, "--scan-nodes", help="Nodos máximos del dibujo de /scan (se agrupa)."),
+    cache: bool = typer.Option(False, "--cache/--no-cache", help="Caché de escaneo en .ascii-arch/ dentro de --root."),
+    max_requests: int = typer.Option(10_000, "--max-requests", help="Peticiones por worker antes de reciclarlo (0 = nunca)."),
 ):
     """
-    🕵️ ESCÁNER CONTEXTUAL con Personalidad.
+    🌐 SERVICIO HTTP: POST /flow, POST /scan, GET /health, GET /metrics (JSON).
     """
-    scanner = ProjectScanner()
-    
-    if graph:
-        typer.secho(f"🔍 Escaneando '{path}'...", fg=typer.colors.YELLOW)
-    
-    flow_string = scanner.scan(path, max_depth=depth)
-    
-    if not flow_string:
-        typer.secho("❌ No se encontraron archivos.", fg=typer.colors.RED)
-        return
-
-    # 1. DIBUJO
-    if graph:
-        router = Router(use_neural_engine=False) 
-        router.process(flow_string)
+    from ascii_architect.http_service import serve
 
-    narrator = Narrator()
+    def ready(bound_host, bound_port):
+        typer.secho(f"🌐 Escuchando en http://{bound_host}:{bound_port} ({workers or 'un worker por CPU'}"
+                    f"{' workers' if workers else ''}). Ctrl+C para salir.", fg=typer.colors.GREEN)
 
-    # 2. LOCAL
-    if explain:
-        typer.secho("\n📄 REPORTE LOCAL:", fg=typer.colors.CYAN, bold=True)
-        print(narrator.explain(flow_string, use_ai=False))
+    try:
+        serve(host, port, workers, ready=ready, max_requests=max_requests, root=root, rules=rules, max_body=max_body,
+              scan_nodes=scan_nodes, cache=cache)
+    except (OSError, ValueError) as e:
+        typer.secho(f"❌ Error: {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
 
-    # 3. IA CON PERSONALIDAD
-    if ai:
-        # Recuperamos contexto (Docs) si quieres enviarlos también
-        # docs = scanner.get_docs_content(path) 
-        # flow_string = flow_string + "\n" + docs 
-        
-        typer.secho(f"\n🤖 ANÁLISIS IA (Estilo: {style.upper()}):", fg=typer.colors.MAGENTA, bold=True)
-        print(narrator.explain(flow_string, use_ai=True, style=style))
 
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    app()
+
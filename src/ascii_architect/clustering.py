@@ -0,0 +1,291 @@
+"""ASCII Architect - Agrupado de grafos grandes
+Etapa entre el ProjectScanner y el Router: condensa un ScanGraph en como mucho
+`max_nodes` nodos para que el dibujo siga siendo legible (y el layout acotado).
+
+- folder: jerárquico por carpeta. Se parte de un único grupo (la raíz) y se divide
+  siempre el grupo más grande (en sus subcarpetas, o en sus nodos si ya no tiene) mientras
+  quepa en el presupuesto. O(V · profundidad + C log C).
+- community: comunidades del grafo por modularidad (movimiento local de Louvain, O(E)
+  por pasada, pocas pasadas) repetido sobre el grafo condensado. Si siguen sobrando, las
+  más pequeñas se funden con su vecina más conectada (y las aisladas, en 'otros').
+
+Cada grupo de más de un nodo pasa a ser un super-nodo ('api/* [12]', 'router.py [+7]');
+las aristas entre grupos se suman en una sola cuyo peso es el número de aristas originales.
+"""
+import heapq
+
+from ascii_architect.graph import EDGE_KINDS, ScanGraph
+
+CLUSTER_METHODS = ("folder", "community")
+MAX_MOVING_ROUNDS = 10
+CONTAINS_KIND = EDGE_KINDS.index("contains")
+
+
+def _node_parts(graph: ScanGraph) -> list:
+    """Componentes de la carpeta de cada nodo. Sin carpeta (flujos manuales): la de la etiqueta o la raíz."""
+    parts = []
+    for label, folder in zip(graph.labels, graph.folders):
+        if folder is None:
+            folder = label.rpartition("/")[0] if "/" in label and " " not in label else ""
+        parts.append(folder.split("/") if folder else [])
+    return parts
+
+
+def _folder_label(folder: str, size: int, subtree: bool) -> str:
+    return f"{folder or 'ROOT'}/{'**' if subtree else '*'} [{size}]"
+
+
+def folder_groups(graph: ScanGraph, max_nodes: int) -> list:
+    """
+    Divide el grafo por carpetas en como mucho max_nodes grupos.
+    Devuelve [(etiqueta, [nodos])]: 'api/** [n]' si el grupo incluye subcarpetas,
+    'api/* [n]' si son solo los archivos de la carpeta; None en los grupos de un nodo.
+    """
+    parts = _node_parts(graph)
+    # Grado (aristas que no son 'contains'): al no caber todos, se separan primero los hubs
+    degree = [0] * graph.node_count
+    for a, b, kind, weight in zip(graph.src, graph.dst, graph.kinds, graph.weights):
+        if kind != CONTAINS_KIND:
+            degree[a] += weight
+            degree[b] += weight
+    # Heap: (-tamaño, desempate, carpeta, nivel, nodos). nivel=None: nodos que viven justo
+    # en esa carpeta (solo se pueden separar uno a uno)
+    heap = [(-graph.node_count, 0, "", 0, list(range(graph.node_count)))]
+    pushed = 1
+    groups = []
+    count = 1
+    while heap:
+        _, _, folder, level, members = heapq.heappop(heap)
+        if len(members) == 1:
+            groups.append((None, members))
+            continue
+
+        if level is None:
+            split = [(folder, None, [node]) for node in members]
+        else:
+            children = {}
+            here = []
+            for node in members:
+                if len(parts[node]) > level:
+                    children.setdefault("/".join(parts[node][:level + 1]), []).append(node)
+                else:
+                    here.append(node)
+            split = [(sub, level + 1, nodes) for sub, nodes in children.items()]
+            if here:
+                split.append((folder, None, here))
+
+        # Un solo hijo (todo bajo la misma subcarpeta): bajar de nivel no cuesta nodos
+        room = max_nodes - count
+        if len(split) - 1 > room:
+            if room < 1:
+                groups.append((_folder_label(folder, len(members), level is not None), members))
+                continue
+            # No caben todos: se separan los hijos más grandes (a igual tamaño, los más
+            # conectados) y el resto queda como un grupo de la carpeta
+            split.sort(key=lambda item: (-len(item[2]), -sum(degree[node] for node in item[2]), min(item[2])))
+            rest = sorted(node for _, _, nodes in split[room:] for node in nodes)
+            subtree = any(sub_level is not None for _, sub_level, _ in split[room:])
+            groups.append((_folder_label(folder, len(rest), subtree), rest))
+            split = split[:room]
+            count += room
+        else:
+            count += len(split) - 1
+        for sub, sub_level, nodes in split:
+            heapq.heappush(heap, (-len(nodes), pushed, sub, sub_level, nodes))
+            pushed += 1
+    return groups
+
+
+def _adjacency(node_count: int, src, dst, weights) -> list:
+    """Vecinos no dirigidos con peso: [{vecino: peso}] (sin auto-bucles)."""
+    adjacency = [{} for _ in range(node_count)]
+    for a, b, w in zip(src, dst, weights):
+        if a != b:
+            adjacency[a][b] = adjacency[a].get(b, 0) + w
+            adjacency[b][a] = adjacency[b].get(a, 0) + w
+    return adjacency
+
+
+def local_moving(adjacency: list, degree: list) -> list:
+    """
+    Fase de movimiento local de Louvain: cada nodo pasa a la comunidad vecina que más sube
+    la modularidad (w_in - tot·k/2m) y se repite hasta que casi nadie se mueve. A diferencia
+    de la propagación de etiquetas, penaliza unirse a los hubs (no se forma una comunidad
+    gigante alrededor de 'os.py'). Determinista: orden de ids y solo mejoras estrictas.
+    """
+    two_m = sum(degree) or 1
+    community = list(range(len(adjacency)))
+    total = list(degree)   # Suma de grados de cada comunidad
+    for _ in range(MAX_MOVING_ROUNDS):
+        moved = 0
+        for node, neighbours in enumerate(adjacency):
+            if not neighbours:
+                continue
+            current, k = community[node], degree[node]
+            links = {}
+            for other, w in neighbours.items():
+                links[community[other]] = links.get(community[other], 0) + w
+            total[current] -= k
+            best, best_gain = current, links.get(current, 0) - total[current] * k / two_m
+            for c, w in links.items():
+                gain = w - total[c] * k / two_m
+                if gain > best_gain + 1e-9:
+                    best, best_gain = c, gain
+            total[best] += k
+            if best != current:
+                community[node] = best
+                moved += 1
+        # Las últimas pasadas apenas mueven nodos: se corta al bajar del 1%
+        if moved <= len(adjacency) // 100:
+            break
+    return community
+
+
+def _merge_small(adjacency: list, sizes: list, max_nodes: int) -> list:
+    """
+    Fusiona las comunidades más pequeñas con su vecina más conectada hasta que haya
+    max_nodes (union-find). Devuelve la raíz de cada comunidad.
+    """
+    parent = list(range(len(adjacency)))
+
+    def find(c):
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    count = len(adjacency)
+    for c in sorted(range(len(adjacency)), key=lambda c: (sizes[c], c)):
+        if count <= max_nodes:
+            break
+        root = find(c)
+        links = {}
+        for other, w in adjacency[c].items():
+            other = find(other)
+            if other != root:
+                links[other] = links.get(other, 0) + w
+        if not links:
+            continue
+        target = max(links, key=lambda other: (links[other], -other))
+        if sizes[target] < sizes[root]:
+            root, target = target, root
+        parent[root] = target
+        sizes[target] += sizes[root]
+        count -= 1
+    return [find(c) for c in range(len(adjacency))]
+
+
+def community_groups(graph: ScanGraph, max_nodes: int) -> list:
+    """
+    Comunidades del grafo (Louvain: movimiento local + condensación, repetido mientras
+    haya más comunidades que max_nodes y siga habiendo mejora). Si aún sobran, las más
+    pequeñas se funden con su vecina más conectada y, las aisladas, en un grupo 'otros'.
+    Devuelve [(etiqueta, [nodos])]: cada comunidad se nombra por su nodo más conectado
+    ('router.py [+7]'); None en los grupos de un nodo.
+    """
+    count = graph.node_count
+    community = list(range(count))
+    adjacency = _adjacency(count, graph.src, graph.dst, graph.weights)
+    degree = node_degree = [sum(neighbours.values()) for neighbours in adjacency]
+    sizes = [1] * count
+
+    while count > max_nodes:
+        moved = local_moving(adjacency, degree)
+        renumber = {}
+        for c in moved:
+            renumber.setdefault(c, len(renumber))
+        if len(renumber) == count:
+            break   # Sin mejora posible: se pasa a las fusiones forzadas
+        community = [renumber[moved[c]] for c in community]
+        # Grafo de comunidades: aristas sumadas; el grado de cada comunidad incluye sus aristas internas
+        merged = [{} for _ in range(len(renumber))]
+        new_degree = [0] * len(renumber)
+        new_sizes = [0] * len(renumber)
+        for c, neighbours in enumerate(adjacency):
+            a = renumber[moved[c]]
+            new_degree[a] += degree[c]
+            new_sizes[a] += sizes[c]
+            for other, w in neighbours.items():
+                b = renumber[moved[other]]
+                if a != b:
+                    merged[a][b] = merged[a].get(b, 0) + w
+        adjacency, degree, sizes, count = merged, new_degree, new_sizes, len(renumber)
+
+    if count > max_nodes:
+        roots = _merge_small(adjacency, sizes, max_nodes)
+        community = [roots[c] for c in community]
+
+    members = {}
+    for node, c in enumerate(community):
+        members.setdefault(c, []).append(node)
+    communities = sorted(members.values(), key=lambda nodes: (-len(nodes), nodes[0]))
+    rest = []
+    if len(communities) > max_nodes:
+        # Componentes sueltas que no se pudieron fundir con nadie: un solo grupo
+        rest = sorted(node for nodes in communities[max_nodes - 1:] for node in nodes)
+        communities = communities[:max_nodes - 1]
+
+    groups = []
+    for nodes in communities:
+        if len(nodes) == 1:
+            groups.append((None, nodes))
+        else:
+            hub = max(nodes, key=lambda node: (node_degree[node], -node))
+            groups.append((f"{graph.labels[hub]} [+{len(nodes) - 1}]", nodes))
+    if rest:
+        groups.append((f"otros [{len(rest)}]" if len(rest) > 1 else None, rest))
+    return groups
+
+
+def collapse(graph: ScanGraph, groups: list) -> ScanGraph:
+    """
+    Un super-nodo por grupo [(etiqueta, [nodos])] (etiqueta None: el nodo se queda tal
+    cual); las aristas entre grupos se suman (peso) y las internas desaparecen.
+    """
+    cluster = [0] * graph.node_count
+    result = ScanGraph()
+    for index, (label, members) in enumerate(groups):
+        for node in members:
+            cluster[node] = index
+        if label is None:
+            result.node(graph.labels[members[0]], graph.folders[members[0]])
+        else:
+            result.node(label)
+
+    # Agregación en orden de inserción; el tipo es el de la primera arista del par
+    merged = {}
+    for a, b, kind, w in zip(graph.src, graph.dst, graph.kinds, graph.weights):
+        a, b = cluster[a], cluster[b]
+        if a == b:
+            continue
+        entry = merged.get((a, b))
+        if entry is None:
+            merged[(a, b)] = [kind, w]
+        else:
+            entry[1] += w
+    labels = result.labels
+    for (a, b), (kind, w) in merged.items():
+        result.add_edge(labels[a], labels[b], EDGE_KINDS[kind], weight=w)
+    return result
+
+
+def cluster(graph: ScanGraph, max_nodes: int, method: str = "folder"):
+    """
+    Condensa el grafo en como mucho max_nodes nodos (si ya cabe, se devuelve tal cual).
+
+    Returns:
+        (grafo, grupos) con grupos = [(etiqueta_super_nodo, número_de_nodos)] de los
+        super-nodos creados.
+    """
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"Método de agrupado desconocido: '{method}' (usa {', '.join(CLUSTER_METHODS)})")
+    if max_nodes < 1:
+        raise ValueError("--max-nodes debe ser al menos 1.")
+    if graph.node_count <= max_nodes:
+        return graph, []
+
+    groups = folder_groups(graph, max_nodes) if method == "folder" else community_groups(graph, max_nodes)
+    groups.sort(key=lambda group: min(group[1]))   # Orden estable: el de aparición en el escaneo
+    result = collapse(graph, groups)
+    summary = [(label, len(members)) for label, members in groups if label is not None]
+    return result, summary
@@ -0,0 +1,231 @@
+"""ASCII Architect - Topología compacta para el Narrador
+El string 'a -> b ; c -> d' repite el nombre completo de cada archivo en cada arista e
+incluye las aristas triviales '[DIR] -> archivo'. Aquí se codifica el ScanGraph así:
+
+    @ascii_architect: 0=cli.py 1=narrator.py 2=** [12]
+    import: 0>1,2 1>2x3
+    contains: 14 implícitas (cada archivo está listado en su carpeta)
+
+- Tabla de nodos internada: cada nombre aparece una vez, agrupado por carpeta (sin
+  repetir el prefijo) y con un id corto en base 36.
+- Listas de adyacencia por tipo de arista ('origen>destino,destino'; 'xN' = N aristas).
+- 'contains' se resume con su cuenta: la tabla de carpetas ya dice qué hay en cada una.
+  En los grafos leídos de un string (sin carpetas) la carpeta de un archivo sale de la
+  ruta de su etiqueta o de la única 'X [DIR]' que lo contiene; si lo contienen varias,
+  esas aristas 'contains' se listan tal cual.
+- Presupuesto de caracteres: si no cabe, se resumen primero las carpetas menos
+  importantes (menos aristas que no son 'contains') en un nodo '** [n]', empezando por
+  las más profundas. Si ni así cabe, se recorta el final con una nota.
+"""
+from ascii_architect.clustering import collapse
+from ascii_architect.graph import EDGE_KINDS, ScanGraph
+
+DEFAULT_PAYLOAD_BUDGET = 16_000    # Caracteres (~4000 tokens)
+IMPLIED_KIND = EDGE_KINDS.index("contains")
+DIR_SUFFIX = " [DIR]"
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+LEGEND = ("TOPOLOGÍA COMPACTA: '@carpeta: id=archivo ...' (ROOT = raíz, '** [n]' = n archivos "
+          "resumidos); aristas por tipo 'origen>destino,destino' ('xN' = N aristas).")
+TRUNCATED = "\n... [RECORTADO: {} caracteres fuera del presupuesto]"
+
+
+def short_id(n: int) -> str:
+    """0 -> '0', 35 -> 'z', 36 -> '10'."""
+    digits = ""
+    while True:
+        n, rest = divmod(n, 36)
+        digits = DIGITS[rest] + digits
+        if not n:
+            return digits
+
+
+def _dir_folder(label: str) -> str:
+    """'api [DIR]' -> 'api' ('ROOT [DIR]' -> '')."""
+    name = label[:-len(DIR_SUFFIX)]
+    return "" if name == "ROOT" else name
+
+
+def _containers(graph: ScanGraph) -> dict:
+    """Nodo -> orígenes de sus aristas 'contains'."""
+    containers = {}
+    for a, b, kind in zip(graph.src, graph.dst, graph.kinds):
+        if kind == IMPLIED_KIND:
+            containers.setdefault(b, set()).add(a)
+    return containers
+
+
+def _folders(graph: ScanGraph, containers: dict = None) -> list:
+    """
+    Carpeta de cada nodo. Si el grafo no la sabe (leído de un string): la ruta de la
+    etiqueta, la de 'X [DIR]' o la de la única carpeta que lo contiene; si no, la raíz.
+    """
+    containers = _containers(graph) if containers is None else containers
+    folders = []
+    for node, folder in enumerate(graph.folders):
+        if folder is None:
+            label = graph.labels[node]
+            sources = containers.get(node, ())
+            if "/" in label and " " not in label:
+                folder = label.rpartition("/")[0]
+            elif label.endswith(DIR_SUFFIX):
+                folder = _dir_folder(label)
+            elif len(sources) == 1:
+                folder = _dir_folder(graph.labels[next(iter(sources))])
+            else:
+                folder = ""
+        folders.append(folder)
+    return folders
+
+
+def encode(graph: ScanGraph) -> str:
+    """Codificación compacta sin presupuesto (determinista: mismo grafo, mismo texto)."""
+    containers = _containers(graph)
+    folders = _folders(graph, containers)
+    implied = 0
+    linked = set()
+    explicit = []   # 'contains' de archivos que están en varias carpetas: la tabla no lo dice
+    for i, (a, b, kind, weight) in enumerate(zip(graph.src, graph.dst, graph.kinds, graph.weights)):
+        if kind == IMPLIED_KIND and len(containers[b]) == 1:
+            implied += weight
+            linked.add(b)
+        else:
+            if kind == IMPLIED_KIND:
+                explicit.append(i)
+            linked.add(a)
+            linked.add(b)
+    # Los nodos que solo salen en 'contains' como origen ('X [DIR]') sobran: su carpeta ya está en la tabla
+    implied_sources = _implied_sources(graph)
+    nodes = [i for i in range(graph.node_count) if i in linked or i not in implied_sources]
+
+    by_folder = {}
+    for node in nodes:
+        by_folder.setdefault(folders[node], []).append(node)
+    ids = {}
+    lines = [LEGEND]
+    for folder in sorted(by_folder):
+        prefix = f"{folder}/" if folder else ""
+        entries = []
+        for node in sorted(by_folder[folder], key=lambda i: graph.labels[i]):
+            ids[node] = short_id(len(ids))
+            label = graph.labels[node]
+            entries.append(f"{ids[node]}={label[len(prefix):] if prefix and label.startswith(prefix) else label}")
+        lines.append(f"@{folder or 'ROOT'}: {' '.join(entries)}")
+
+    for code, kind in enumerate(EDGE_KINDS):
+        adjacency = {}
+        edges = explicit if code == IMPLIED_KIND else range(len(graph))
+        for i in edges:
+            if graph.kinds[i] == code:
+                weight = graph.weights[i]
+                adjacency.setdefault(ids[graph.src[i]], []).append(ids[graph.dst[i]] + (f"x{weight}" if weight > 1 else ""))
+        if adjacency:
+            lines.append(f"{kind}: " + " ".join(f"{src}>{','.join(dsts)}" for src, dsts in adjacency.items()))
+    if implied:
+        lines.append(f"contains: {implied} implícitas (cada archivo está listado en su carpeta)")
+    return "\n".join(lines)
+
+
+def _implied_sources(graph: ScanGraph) -> set:
+    """Nodos que solo aparecen como origen de aristas 'contains'."""
+    sources = {a for a, k in zip(graph.src, graph.kinds) if k == IMPLIED_KIND}
+    for a, b, k in zip(graph.src, graph.dst, graph.kinds):
+        if k != IMPLIED_KIND:
+            sources.discard(a)
+        sources.discard(b)
+    return sources
+
+
+def _summarize(graph: ScanGraph, groups: list, sizes: dict) -> ScanGraph:
+    """
+    Cada carpeta de groups [(carpeta, [nodos])] pasa a ser un nodo '<carpeta>/** [n]',
+    con n = archivos originales (sizes: etiqueta de super-nodo -> archivos; se actualiza).
+    """
+    implied_sources = _implied_sources(graph)   # Los 'X [DIR]' no cuentan como archivos
+    grouped = set()
+    collapsed = []
+    for folder, members in groups:
+        grouped.update(members)
+        files = sum(sizes.get(graph.labels[node], 1) for node in members if node not in implied_sources)
+        label = f"{folder}/** [{files}]"
+        sizes[label] = files
+        collapsed.append((label, members))
+    homes = {label: folder for (folder, _), (label, _) in zip(groups, collapsed)}
+    collapsed.extend((None, [node]) for node in range(graph.node_count) if node not in grouped)
+    collapsed.sort(key=lambda group: min(group[1]))
+    result = collapse(graph, collapsed)
+    for label, folder in homes.items():
+        # El super-nodo vive en su carpeta: en la tabla sale como '** [n]'
+        result.folders[result.node(label)] = folder
+    return result
+
+
+def _candidates(graph: ScanGraph, level: int) -> list:
+    """
+    Carpetas de profundidad `level` (y todo lo que cuelga de ellas) ordenadas de menos
+    a más importantes: aristas que no son 'contains', luego tamaño.
+    """
+    members = {}
+    for node, folder in enumerate(_folders(graph)):
+        parts = folder.split("/")
+        if parts[0] and len(parts) >= level:
+            members.setdefault("/".join(parts[:level]), []).append(node)
+    members = {folder: nodes for folder, nodes in members.items() if len(nodes) > 1}
+    if not members:
+        return []
+    owner = {node: folder for folder, nodes in members.items() for node in nodes}
+    score = dict.fromkeys(members, 0)
+    for a, b, kind, weight in zip(graph.src, graph.dst, graph.kinds, graph.weights):
+        if kind == IMPLIED_KIND:
+            continue
+        for folder in {owner.get(a), owner.get(b)}:
+            if folder is not None:
+                score[folder] += weight
+    return sorted(members.items(), key=lambda item: (score[item[0]], len(item[1]), item[0]))
+
+
+def compact_topology(graph: ScanGraph, budget: int = DEFAULT_PAYLOAD_BUDGET):
+    """
+    Topología compacta dentro de `budget` caracteres (0 o None: sin límite).
+
+    Returns:
+        (texto, reporte) con reporte = {'raw': caracteres del string clásico,
+        'compact': caracteres enviados, 'summarized': [carpetas resumidas],
+        'truncated': caracteres recortados}.
+    """
+    report = {"raw": len(graph.to_topology()), "summarized": [], "truncated": 0}
+    text = encode(graph)
+    sizes = {}
+    if budget and len(text) > budget:
+        depth = max((folder.count("/") + 1 for folder in _folders(graph) if folder), default=0)
+        for level in range(depth, 0, -1):
+            candidates = _candidates(graph, level)
+            if not candidates:
+                continue
+            # Búsqueda binaria del menor número de carpetas (las menos importantes) que hay que resumir
+            low, high, best = 1, len(candidates), None
+            while low <= high:
+                mid = (low + high) // 2
+                attempt = encode(_summarize(graph, candidates[:mid], dict(sizes)))
+                if len(attempt) <= budget:
+                    best, high = (mid, attempt), mid - 1
+                else:
+                    low = mid + 1
+            if best is not None:
+                report["summarized"].extend(folder for folder, _ in candidates[:best[0]])
+                text = best[1]
+                break
+            # Ni resumiendo todas las de este nivel: se resumen y se sube un nivel
+            report["summarized"].extend(folder for folder, _ in candidates)
+            graph = _summarize(graph, candidates, sizes)
+            text = encode(graph)
+        if len(text) > budget:
+            cut = text.rfind("\n", 0, max(0, budget - len(TRUNCATED) - 12))
+            cut = cut if cut > 0 else max(0, budget - len(TRUNCATED) - 12)
+            report["truncated"] = len(text) - cut
+            text = text[:cut] + TRUNCATED.format(len(text) - cut)
+    # Una carpeta resumida dentro de otra que también se resumió no aporta nada al reporte
+    summarized = set(report["summarized"])
+    report["summarized"] = [folder for folder in report["summarized"]
+                            if not any(folder.startswith(f"{other}/") for other in summarized)]
+    report["compact"] = len(text)
+    return text, report
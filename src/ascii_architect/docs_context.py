@@ -0,0 +1,122 @@
+"""ASCII Architect - Contexto de documentación para la IA
+Carga los archivos de CONTEXT_FILES (raíz y docs/) con un presupuesto global de caracteres.
+
+- Solo se lee el prefijo que puede entrar en el presupuesto (como mucho 4 bytes por
+  carácter UTF-8): un README generado de 50 MB cuesta lo mismo que uno de 3 KB.
+- Los candidatos se leen en paralelo (hilos; es I/O) con un timeout global: un disco de
+  red lento no bloquea el escaneo, el archivo que no llega se omite.
+- El presupuesto se reparte por prioridad: orden de CONTEXT_FILES, la raíz antes que docs/.
+- Caché en memoria por huella (ruta, mtime_ns, tamaño), solo dentro de un mismo loader:
+  un ProjectScanner que se reutiliza no vuelve a leer lo que no cambió. No se persiste:
+  cada 'ascii-arch scan --ai' lee de nuevo los prefijos (acotados por el presupuesto).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+CONTEXT_FILES = [
+    "README.md",
+    "IA-context.md",
+    "ROADMAP.txt",
+    "ARCHITECTURE.md",
+    "CONTRIBUTING.md",
+    "pyproject.toml"
+]
+SEARCH_DIRS = ("", "docs")
+
+DEFAULT_BUDGET = 12_000        # Caracteres en total (~3000 tokens)
+PER_FILE_LIMIT = 3_000         # Ningún archivo se come todo el presupuesto
+DEFAULT_TIMEOUT = 2.0          # Segundos para todas las lecturas
+MAX_BYTES_PER_CHAR = 4
+TRUNCATED = "\n... [TRUNCADO POR EXCESO DE LONGITUD]"
+
+
+def read_prefix(path: str, limit: int):
+    """
+    Primeros `limit` caracteres del archivo sin leerlo entero.
+    Devuelve (texto, truncado) o None si no se puede leer.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = f.read(limit * MAX_BYTES_PER_CHAR)
+    except OSError:
+        return None
+    # Saltos de línea universales, como open(..., 'r')
+    text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+    truncated = len(text) > limit or size > len(data)
+    return text[:limit], truncated
+
+
+class DocsContextLoader:
+    def __init__(self, files=CONTEXT_FILES, budget: int = DEFAULT_BUDGET, per_file: int = PER_FILE_LIMIT,
+                 timeout: float = DEFAULT_TIMEOUT, workers: int = 4):
+        self.files = list(files)
+        self.budget = budget
+        self.per_file = per_file
+        self.timeout = timeout
+        self.workers = workers
+        self._cache = {}    # ruta -> ((ruta, mtime_ns, tamaño), (texto, truncado))
+
+    def candidates(self, root) -> list:
+        """[(nombre, ruta, huella)] por prioridad; solo los que existen (un stat por candidato)."""
+        found = []
+        for sub in SEARCH_DIRS:
+            base = os.path.join(root, sub) if sub else root
+            for name in self.files:
+                path = os.path.join(base, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if st.st_size:
+                    found.append((name, path, (path, st.st_mtime_ns, st.st_size)))
+        return found
+
+    def _read_all(self, found: list) -> dict:
+        """Lee en paralelo lo que no está en caché; lo que no termina a tiempo se omite."""
+        results = {}
+        pending = []
+        for _, path, fingerprint in found:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == fingerprint:
+                results[fingerprint] = cached[1]
+            else:
+                pending.append(fingerprint)
+        if not pending:
+            return results
+
+        pool = ThreadPoolExecutor(max_workers=min(self.workers, len(pending)))
+        try:
+            futures = {pool.submit(read_prefix, fingerprint[0], self.per_file): fingerprint
+                       for fingerprint in pending}
+            done, _ = wait(futures, timeout=self.timeout)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    fingerprint = futures[future]
+                    results[fingerprint] = result
+                    self._cache[fingerprint[0]] = (fingerprint, result)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def load(self, root) -> str:
+        """Bloques '--- CONTENIDO DE <archivo> ---' dentro del presupuesto global."""
+        root = os.path.abspath(root)
+        found = self.candidates(root)
+        texts = self._read_all(found)
+
+        parts = []
+        remaining = self.budget
+        for name, _, fingerprint in found:
+            if remaining <= 0:
+                break
+            if fingerprint not in texts:
+                continue
+            text, truncated = texts[fingerprint]
+            if len(text) > remaining:
+                text, truncated = text[:remaining], True
+            remaining -= len(text)
+            parts.append(f"\n--- CONTENIDO DE {name} ---\n{text}{TRUNCATED if truncated else ''}\n"
+                         "--------------------------------\n")
+        return "\n".join(parts)
@@ -0,0 +1,308 @@
+"""ASCII Architect - Extractores de dependencias
+Lectura de imports por streaming y con lectura acotada, un extractor por lenguaje.
+Todos tienen la firma (ruta, late=False, source=None) -> [ImportRef].
+
+- Python: el archivo pasa por el tokenizer línea a línea y la lectura se corta en cuanto
+  termina la región de imports (primer def/class de nivel superior). Docstrings y
+  strings nunca se confunden con imports. Los bloques try/except/else/finally e
+  'if TYPE_CHECKING:' de nivel superior cuentan como cabecera (imports opcionales).
+- JS/TS: import/export ... from, import() y require(), sin comentarios.
+- Go: import simple o en bloque; la lectura se corta en la primera declaración.
+- Rust: 'mod x;' (como 'self::x') y árboles 'use a::{b, c::d}' expandidos.
+
+Sin late, todos leen como máximo MAX_HEADER_LINES líneas.
+"""
+import io
+import re
+import tokenize
+from itertools import islice
+from token import COMMENT, DEDENT, ENCODING, INDENT, NAME, NEWLINE, NL, OP
+from typing import NamedTuple
+
+# Cota de lectura en modo cabecera: módulos sin def/class (tablas de datos gigantes)
+MAX_HEADER_LINES = 1000
+
+# Sentencias compuestas que pueden llevar un import en la misma línea ("try: import x")
+COMPOUND_KEYWORDS = {"if", "elif", "else", "try", "except", "finally", "with", "for", "while"}
+# Continuaciones de un try / if: heredan si su bloque es de cabecera
+CLAUSE_KEYWORDS = {"elif", "else", "except", "finally"}
+TYPE_CHECKING_TESTS = {"TYPE_CHECKING", "typing.TYPE_CHECKING"}
+
+
+class ImportRef(NamedTuple):
+    module: str           # Nombre con puntos ('a.b'); vacío en 'from . import x'
+    names: tuple = ()     # Nombres de 'from m import a, b' (vacío en 'import m')
+    level: int = 0        # Nivel relativo: 'from ..a import b' -> 2
+
+
+def _dotted(tokens: list, i: int):
+    """Lee 'a.b.c' desde la posición i. Devuelve (nombre, siguiente_posición)."""
+    parts = []
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.type == NAME and tok.string not in ("import", "as") and (not parts or parts[-1] == "."):
+            parts.append(tok.string)
+        elif tok.type == OP and tok.string == "." and parts and parts[-1] != ".":
+            parts.append(".")
+        else:
+            break
+        i += 1
+    return "".join(parts), i
+
+
+def _parse_import(tokens: list) -> list:
+    """Sentencia import/from (tokens sin comentarios) -> [ImportRef]."""
+    refs = []
+    head = tokens[0].string
+
+    if head == "import":
+        i = 1
+        while i < len(tokens):
+            name, i = _dotted(tokens, i)
+            if name:
+                refs.append(ImportRef(name))
+            # Saltar alias ('as x') hasta la siguiente coma
+            while i < len(tokens) and not (tokens[i].type == OP and tokens[i].string == ","):
+                i += 1
+            i += 1
+        return refs
+
+    # from [.]*modulo import (a as b, c)
+    i, level = 1, 0
+    while i < len(tokens) and tokens[i].type == OP and tokens[i].string in (".", "..."):
+        level += len(tokens[i].string)
+        i += 1
+    module, i = _dotted(tokens, i)
+    if i >= len(tokens) or tokens[i].string != "import":
+        return refs
+
+    names = []
+    expect_name = True
+    for tok in tokens[i + 1:]:
+        if tok.type == NAME and tok.string == "as":
+            expect_name = False
+        elif tok.type == OP and tok.string == ",":
+            expect_name = True
+        elif expect_name and (tok.type == NAME or tok.string == "*"):
+            names.append(tok.string)
+            expect_name = False
+    refs.append(ImportRef(module, tuple(names), level))
+    return refs
+
+
+def _statements(line_tokens: list, late: bool):
+    """Divide una línea lógica en sentencias ('a; b') y localiza imports tras 'if x:'."""
+    segment = []
+    for tok in line_tokens + [None]:
+        if tok is None or (tok.type == OP and tok.string == ";"):
+            if segment:
+                if late and segment[0].type == NAME and segment[0].string in COMPOUND_KEYWORDS:
+                    for j, t in enumerate(segment):
+                        if t.type == OP and t.string == ":" and j + 1 < len(segment):
+                            segment = segment[j + 1:]
+                            break
+                yield segment
+            segment = []
+        else:
+            segment.append(tok)
+
+
+def _header_clause(tokens: list, chained: bool) -> bool:
+    """¿La línea abre un bloque de cabecera? try, 'if TYPE_CHECKING' o una cláusula de uno de ellos."""
+    keyword = tokens[0].string
+    if keyword == "try":
+        return True
+    if keyword == "if":
+        colon = next((j for j, t in enumerate(tokens) if t.type == OP and t.string == ":"), len(tokens))
+        return "".join(t.string for t in tokens[1:colon]) in TYPE_CHECKING_TESTS
+    return keyword in CLAUSE_KEYWORDS and chained
+
+
+def extract_python_imports(file_path, late: bool = False, source: bytes = None) -> list:
+    """
+    Imports de un archivo .py como [ImportRef], en orden de aparición.
+
+    Modo por defecto: solo imports de nivel superior (incluidos los de bloques try/except
+    e 'if TYPE_CHECKING:' de nivel superior), y la lectura se detiene en el primer 'def',
+    'class' o decorador de nivel superior (fin de la región de imports), o tras
+    MAX_HEADER_LINES líneas.
+    late=True: recorre todo el archivo e incluye imports condicionales, dentro de
+    funciones o tardíos.
+    source: contenido ya leído (la caché de escaneo lo lee para calcular el hash).
+    """
+    refs = []
+    depth = 0
+    line_tokens = []
+    blocks = []         # Por bloque abierto: True si es de cabecera (try/except, if TYPE_CHECKING)
+    outside = 0         # Bloques abiertos que no son de cabecera
+    chain = {}          # Profundidad -> el último try / if de ese nivel era de cabecera
+    opens = False       # La línea anterior abre un bloque de cabecera
+    try:
+        with (io.BytesIO(source) if source is not None else open(file_path, "rb")) as f:
+            for tok in tokenize.tokenize(f.readline):
+                ttype = tok.type
+                if ttype in (ENCODING, COMMENT, NL):
+                    continue
+                if ttype == INDENT:
+                    depth += 1
+                    blocks.append(opens)
+                    outside += not opens
+                    continue
+                if ttype == DEDENT:
+                    depth -= 1
+                    outside -= not blocks.pop()
+                    continue
+                if ttype != NEWLINE:
+                    if not late and tok.start[0] > MAX_HEADER_LINES:
+                        break
+                    line_tokens.append(tok)
+                    continue
+
+                # Fin de una línea lógica
+                tokens, line_tokens = line_tokens, []
+                if not tokens:
+                    continue
+                first = tokens[0]
+                if depth == 0 and not late and (first.string in ("def", "class", "async", "@")):
+                    break
+                header = _header_clause(tokens, chain.get(depth, False))
+                if first.string in COMPOUND_KEYWORDS:
+                    chain[depth] = header
+                opens = header and tokens[-1].type == OP and tokens[-1].string == ":"
+                if outside and not late:
+                    continue
+                # 'try: import x' en una línea: el import cuenta si el bloque es de cabecera
+                for statement in _statements(tokens, late or header):
+                    if statement[0].type == NAME and statement[0].string in ("import", "from"):
+                        refs.extend(_parse_import(statement))
+    except (OSError, SyntaxError, tokenize.TokenError, UnicodeDecodeError):
+        pass
+    return refs
+
+
+def _read_lines(file_path, late: bool, source: bytes = None) -> list:
+    """Líneas de texto del archivo; sin late, solo las primeras MAX_HEADER_LINES."""
+    try:
+        raw = io.BytesIO(source) if source is not None else open(file_path, "rb")
+        with io.TextIOWrapper(raw, encoding="utf-8", errors="replace") as f:
+            return list(f) if late else list(islice(f, MAX_HEADER_LINES))
+    except OSError:
+        return []
+
+
+# Comentarios fuera de strings (los strings se conservan: ahí están los módulos)
+_C_LIKE_TOKENS = re.compile(
+    r"//[^\n]*|/\*.*?\*/|'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"|`(?:\\.|[^`\\])*`",
+    re.DOTALL,
+)
+
+
+def _strip_comments(text: str) -> str:
+    return _C_LIKE_TOKENS.sub(lambda m: " " if m.group(0)[0] == "/" else m.group(0), text)
+
+
+_JS_STATIC = re.compile(
+    r"""(?:^|(?<=[;}]))\s*(?:import|export)\s+(?:type\s+)?(?:[\w*{}\s,$]+?\s+from\s*)?['"]([^'"\n]+)['"]""", re.MULTILINE)
+_JS_DYNAMIC = re.compile(r"""\b(?:require|import)\s*\(\s*['"]([^'"\n]+)['"]\s*\)""")
+
+
+def extract_js_imports(file_path, late: bool = False, source: bytes = None) -> list:
+    """'import x from "m"', 'export * from "m"', 'import("m")' y 'require("m")' -> [ImportRef('m')]."""
+    text = _strip_comments("".join(_read_lines(file_path, late, source)))
+    found = sorted((m.start(1), m.group(1)) for regex in (_JS_STATIC, _JS_DYNAMIC) for m in regex.finditer(text))
+    return [ImportRef(spec) for _, spec in found]
+
+
+_GO_DECLARATIONS = ("func", "type", "var", "const")
+_GO_SPEC = re.compile(r'^(?:[\w.]+\s+)?"([^"]+)"')
+
+
+def extract_go_imports(file_path, late: bool = False, source: bytes = None) -> list:
+    """
+    'import "a"' e 'import ( alias "b" ... )'. Go exige los imports antes de cualquier
+    declaración, así que la lectura termina en el primer func/type/var/const.
+    """
+    refs = []
+    in_block = False
+    for line in _read_lines(file_path, late, source):
+        line = line.split("//", 1)[0].strip()
+        if not line:
+            continue
+        if in_block:
+            if line.startswith(")"):
+                in_block = False
+                continue
+            m = _GO_SPEC.match(line)
+            if m:
+                refs.append(ImportRef(m.group(1)))
+        elif line.startswith("import"):
+            rest = line[6:].strip()
+            if rest.startswith("("):
+                in_block = True
+                m = _GO_SPEC.match(rest[1:].strip())
+                if m:
+                    refs.append(ImportRef(m.group(1)))
+            else:
+                m = _GO_SPEC.match(rest)
+                if m:
+                    refs.append(ImportRef(m.group(1)))
+        elif line.split(None, 1)[0] in _GO_DECLARATIONS:
+            break
+    return refs
+
+
+def go_module_path(file_path) -> str:
+    """Ruta del módulo declarada en go.mod ('module github.com/org/repo'), o ''."""
+    for line in _read_lines(file_path, False):
+        parts = line.split("//", 1)[0].split()
+        if len(parts) >= 2 and parts[0] == "module":
+            return parts[1].strip('"`')
+    return ""
+
+
+_RUST_ITEM = re.compile(
+    r"(?:^|(?<=[;{}]))\s*(?:#\[[^\]]*\]\s*)*(?:pub(?:\([^)]*\))?\s+)?(?:(mod)\s+(\w+)\s*;|use\s+([^;]+);)",
+    re.MULTILINE)
+
+
+def _split_top_level(text: str) -> list:
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += (ch == "{") - (ch == "}")
+        current.append(ch)
+    parts.append("".join(current))
+    return [p for p in parts if p]
+
+
+def _expand_use(tree: str) -> list:
+    """'crate::a::{b, c::{d, self}}' -> ['crate::a::b', 'crate::a::c::d', 'crate::a::c']."""
+    brace = tree.find("{")
+    if brace == -1:
+        return [tree] if tree else []
+    prefix = tree[:brace]
+    paths = []
+    for part in _split_top_level(tree[brace + 1:tree.rfind("}")]):
+        for sub in _expand_use(part):
+            paths.append(prefix.rstrip(":") if sub == "self" else prefix + sub)
+    return paths
+
+
+def extract_rust_imports(file_path, late: bool = False, source: bytes = None) -> list:
+    """'mod x;' -> ImportRef('self::x'); 'use a::{b, c}' -> ImportRef('a::b'), ImportRef('a::c')."""
+    text = _strip_comments("".join(_read_lines(file_path, late, source)))
+    refs = []
+    for m in _RUST_ITEM.finditer(text):
+        if m.group(1):
+            refs.append(ImportRef(f"self::{m.group(2)}"))
+            continue
+        tree = re.sub(r"\s+as\s+\w+", "", m.group(3))
+        tree = re.sub(r"\s+", "", tree).lstrip(":")
+        for path in _expand_use(tree):
+            path = path[:-3] if path.endswith("::*") else path
+            if path:
+                refs.append(ImportRef(path))
+    return refs
@@ -0,0 +1,277 @@
+"""ASCII Architect - Grafos
+Utilidades de grafo sobre el flujo parseado (filas 'A -> B -> C').
+
+- tarjan_scc: componentes fuertemente conexas en O(V + E), iterativo (sin recursión,
+  así los escaneos grandes no revientan la pila).
+- find_cycles / collapse_cycles: detecta ciclos y los condensa en nodos compuestos
+  antes del layout.
+- ScanGraph: salida estructurada del scanner (tabla de nodos internada + arrays de
+  aristas con tipo). El string 'a -> b ; c -> d' queda solo como serializador.
+"""
+from array import array
+
+# Tipos de arista del scanner (índice = código guardado en ScanGraph.kinds)
+EDGE_KINDS = ("import", "contains", "builds", "orchestrates", "manifest", "infra", "data")
+
+
+def grid_edges(grid: list) -> list:
+    """Aristas (origen, destino) implícitas en cada fila del grid."""
+    edges = []
+    for row in grid:
+        for a, b in zip(row, row[1:]):
+            edges.append((a, b))
+    return edges
+
+
+def index_graph(edges: list):
+    """Interna las etiquetas: devuelve (labels, adjacency) con ids enteros."""
+    ids = {}
+    labels = []
+    adjacency = []
+    for a, b in edges:
+        for label in (a, b):
+            if label not in ids:
+                ids[label] = len(labels)
+                labels.append(label)
+                adjacency.append([])
+        adjacency[ids[a]].append(ids[b])
+    return labels, adjacency
+
+
+def tarjan_scc(adjacency: list) -> list:
+    """
+    Tarjan iterativo. Devuelve la lista de componentes (listas de ids) en orden
+    topológico inverso (sumideros primero).
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        # Pila de trabajo: (nodo, posición del siguiente vecino a visitar)
+        work = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            node, pos = work[-1]
+            neighbors = adjacency[node]
+            if pos < len(neighbors):
+                work[-1] = (node, pos + 1)
+                nxt = neighbors[pos]
+                if index[nxt] == -1:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = True
+                    work.append((nxt, 0))
+                elif on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def find_cycles(edges: list) -> list:
+    """Ciclos = SCCs con más de un nodo o con auto-bucle. Devuelve listas de etiquetas."""
+    labels, adjacency = index_graph(edges)
+    cycles = []
+    for component in tarjan_scc(adjacency):
+        if len(component) > 1 or component[0] in adjacency[component[0]]:
+            cycles.append(sorted(labels[i] for i in component))
+    cycles.sort()
+    return cycles
+
+
+def composite_label(members: list) -> str:
+    """Etiqueta del nodo compuesto que sustituye a un ciclo."""
+    if len(members) <= 3:
+        return " + ".join(members) + " [CYCLE]"
+    return f"{members[0]} + {members[1]} +{len(members) - 2} [CYCLE]"
+
+
+def collapse_cycles(grid: list):
+    """
+    Condensa cada ciclo en un nodo compuesto.
+
+    Las aristas internas del ciclo se convierten en auto-bucles y desaparecen; las filas
+    que quedan duplicadas (o reducidas a un nodo que ya aparece en otra fila) se eliminan.
+    Todo en tiempo lineal sobre el número de etiquetas del grid.
+
+    Returns:
+        (nuevo_grid, ciclos)
+    """
+    cycles = find_cycles(grid_edges(grid))
+    if not cycles:
+        return grid, cycles
+
+    replacement = {}
+    for members in cycles:
+        label = composite_label(members)
+        for member in members:
+            replacement[member] = label
+
+    new_grid = []
+    seen_rows = set()
+    appearances = {}
+    for row in grid:
+        changed = any(label in replacement for label in row)
+        mapped = []
+        for label in row:
+            label = replacement.get(label, label)
+            if not mapped or mapped[-1] != label:
+                mapped.append(label)
+        key = tuple(mapped)
+        if changed and key in seen_rows:
+            continue
+        seen_rows.add(key)
+        new_grid.append((mapped, changed))
+        for label in mapped:
+            appearances[label] = appearances.get(label, 0) + 1
+
+    # Filas de un solo nodo compuesto que ya aparece en otra fila: redundantes
+    result = []
+    for mapped, changed in new_grid:
+        if changed and len(mapped) == 1 and appearances[mapped[0]] > 1:
+            appearances[mapped[0]] -= 1
+            continue
+        result.append(mapped)
+
+    return result, cycles
+
+
+def _infer_kind(src: str, dst: str) -> str:
+    """Tipo de una arista leída de un string de topología (mismas reglas que el scanner)."""
+    if dst.endswith("[App]"):
+        return "orchestrates"
+    if src == "Terraform":
+        return "infra"
+    if src.endswith("[DIR]"):
+        if dst == "Dockerfile":
+            return "builds"
+        if dst in ("Cargo.toml", "package.json", "go.mod", "pom.xml"):
+            return "manifest"
+        if dst.endswith((".sql", ".db", ".sqlite")):
+            return "data"
+        return "contains"
+    return "import"
+
+
+class ScanGraph:
+    """
+    Grafo compacto: cada etiqueta se guarda una vez (ids enteros) y las aristas son
+    arrays paralelos (origen, destino, tipo, peso). Las aristas repetidas (mismo par) se
+    ignoran; el peso solo pasa de 1 en los grafos agrupados (clustering.py).
+    """
+    __slots__ = ('labels', 'folders', '_ids', 'src', 'dst', 'kinds', 'weights', '_pairs', '_order')
+
+    def __init__(self):
+        self.labels = []
+        self.folders = []      # Carpeta relativa de cada nodo (None si no se conoce)
+        self._ids = {}
+        self.src = array('I')
+        self.dst = array('I')
+        self.kinds = array('B')
+        self.weights = array('I')   # Aristas originales que representa cada una (clustering)
+        self._pairs = set()
+        self._order = None          # Orden canónico de las aristas (cacheado hasta el próximo add_edge)
+
+    def node(self, label: str, folder: str = None) -> int:
+        """Id del nodo (lo crea si no existe). La carpeta se fija la primera vez que se conoce."""
+        node_id = self._ids.get(label)
+        if node_id is None:
+            node_id = self._ids[label] = len(self.labels)
+            self.labels.append(label)
+            self.folders.append(folder)
+        elif folder is not None and self.folders[node_id] is None:
+            self.folders[node_id] = folder
+        return node_id
+
+    def add_edge(self, src: str, dst: str, kind: str = "import", weight: int = 1,
+                 src_folder: str = None, dst_folder: str = None):
+        a, b = self.node(src, src_folder), self.node(dst, dst_folder)
+        key = (a << 32) | b
+        if key in self._pairs:
+            return
+        self._pairs.add(key)
+        self._order = None
+        self.src.append(a)
+        self.dst.append(b)
+        self.kinds.append(EDGE_KINDS.index(kind))
+        self.weights.append(weight)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def __bool__(self) -> bool:
+        return bool(self.labels)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.labels)
+
+    def edges(self):
+        """Itera (origen, destino, tipo) en orden de inserción."""
+        labels = self.labels
+        for a, b, k in zip(self.src, self.dst, self.kinds):
+            yield labels[a], labels[b], EDGE_KINDS[k]
+
+    def sorted_edges(self) -> list:
+        """(origen, destino, tipo) en el orden canónico: por (origen, destino), como el string serializado."""
+        labels, src, dst = self.labels, self.src, self.dst
+        if self._order is None:
+            self._order = sorted(range(len(src)), key=lambda i: (labels[src[i]], labels[dst[i]]))
+        order = self._order
+        return [(labels[src[i]], labels[dst[i]], EDGE_KINDS[self.kinds[i]]) for i in order]
+
+    def pair_weights(self) -> dict:
+        """{(origen, destino): peso} de las aristas agregadas (peso > 1); vacío si no hay."""
+        labels = self.labels
+        return {(labels[a], labels[b]): w for a, b, w in zip(self.src, self.dst, self.weights) if w > 1}
+
+    def rows(self) -> list:
+        """Filas [origen, destino] para el Router, en el orden canónico; los nodos sin aristas van al final."""
+        rows = [[a, b] for a, b, _ in self.sorted_edges()]
+        linked = set(self.src) | set(self.dst)
+        if len(linked) < len(self.labels):
+            rows.extend([label] for i, label in sorted(enumerate(self.labels), key=lambda item: item[1])
+                        if i not in linked)
+        return rows
+
+    def to_topology(self) -> str:
+        """Serializa a 'a -> b ; c -> d' (ordenado, como la salida histórica del scanner)."""
+        return " ; ".join(" -> ".join(row) for row in self.rows())
+
+    @classmethod
+    def from_topology(cls, text: str) -> "ScanGraph":
+        """Parsea un string de topología; las cadenas 'a -> b -> c' dan una arista por tramo."""
+        graph = cls()
+        for row in text.split(";"):
+            labels = [label.strip() for label in row.split("->") if label.strip()]
+            if len(labels) == 1:
+                graph.node(labels[0])
+            for a, b in zip(labels, labels[1:]):
+                graph.add_edge(a, b, _infer_kind(a, b))
+        return graph
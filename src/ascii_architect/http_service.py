@@ -0,0 +1,331 @@
+"""ASCII Architect - Servicio HTTP local de render
+'ascii-arch http': diagramas por HTTP sin lanzar la CLI. Solo biblioteca estándar.
+
+Endpoints (JSON):
+    POST /flow    {"layout": "A -> B", "compact", "cycles", "page", "page_size"}
+                  (o el flujo en texto plano con Content-Type: text/plain)
+    POST /scan    {"path": "src", "depth": 2, "max_nodes": 150, "cluster": "folder", "explain": false}
+                  path es relativo a --root; no se puede salir de ahí.
+    GET  /health  estado del worker.
+    GET  /metrics peticiones, errores, throughput y latencias (p50/p95/p99) de todos los workers.
+
+- Pre-fork: el proceso padre abre el socket y crea N workers (os.fork) que hacen accept
+  sobre él; si uno muere, el padre lo reemplaza. Cada worker atiende una petición a la
+  vez con SU Router y SU ProjectScanner, que quedan calientes (reglas compiladas, caché
+  de formas) entre peticiones. Sin fork (Windows): un solo proceso.
+- Memoria acotada: las cachés calientes son LRU con tamaño fijo y, además, cada worker
+  se recicla tras `max_requests` peticiones (sale y el padre crea otro desde la copia
+  limpia del servicio). Sin fork no se recicla.
+- Límites: cuerpo como mucho `max_body` bytes (413), flujos de como mucho
+  MAX_FLOW_NODES nodos (413), scans agrupados en `max_nodes` nodos y timeout de socket
+  por conexión (un cliente lento no retiene al worker).
+- Métricas en memoria compartida (una fila por worker, sin locks: cada worker solo
+  escribe la suya); latencias en un histograma de buckets fijos.
+"""
+import json
+import os
+import signal
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from multiprocessing import RawArray
+from pathlib import Path
+
+from ascii_architect.batch import make_router, render_spec
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BODY = 256 * 1024
+DEFAULT_SCAN_NODES = 150
+MAX_FLOW_NODES = 2_000
+DEFAULT_MAX_REQUESTS = 10_000     # Peticiones por worker antes de reciclarlo (0 = nunca)
+MAX_SCAN_DEPTH = 8
+SOCKET_TIMEOUT = 15.0
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+ENDPOINTS = ("/flow", "/scan", "/health", "/metrics")
+
+# Fila de métricas por worker: contadores, una cuenta por endpoint y el histograma
+COUNTERS = ("requests", "errors", "bytes_out", "busy_seconds")
+ROW = len(COUNTERS) + len(ENDPOINTS) + 1 + len(LATENCY_BUCKETS_MS)
+
+
+class SharedMetrics:
+    """Contadores de todos los workers en memoria compartida (se crea antes del fork)."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.values = RawArray("d", workers * ROW)
+        self.started = time.time()
+
+    def record(self, slot: int, endpoint: str, status: int, size: int, seconds: float):
+        base = slot * ROW
+        values = self.values
+        values[base] += 1
+        if status >= 400:
+            values[base + 1] += 1
+        values[base + 2] += size
+        values[base + 3] += seconds
+        index = ENDPOINTS.index(endpoint) if endpoint in ENDPOINTS else len(ENDPOINTS)
+        values[base + len(COUNTERS) + index] += 1
+        ms = seconds * 1000
+        bucket = next(i for i, limit in enumerate(LATENCY_BUCKETS_MS) if ms <= limit)
+        values[base + len(COUNTERS) + len(ENDPOINTS) + 1 + bucket] += 1
+
+    def snapshot(self) -> dict:
+        totals = [0.0] * ROW
+        for slot in range(self.workers):
+            row = self.values[slot * ROW:(slot + 1) * ROW]
+            totals = [a + b for a, b in zip(totals, row)]
+        counters = dict(zip(COUNTERS, totals))
+        by_endpoint = dict(zip(ENDPOINTS + ("other",), map(int, totals[len(COUNTERS):len(COUNTERS) + len(ENDPOINTS) + 1])))
+        histogram = totals[len(COUNTERS) + len(ENDPOINTS) + 1:]
+        requests = int(counters["requests"])
+
+        def percentile(p):
+            if not requests:
+                return None
+            seen = 0
+            for limit, count in zip(LATENCY_BUCKETS_MS, histogram):
+                seen += count
+                if seen >= p * requests:
+                    return limit if limit != float("inf") else f">{LATENCY_BUCKETS_MS[-2]}"
+            return None
+
+        uptime = time.time() - self.started
+        return {
+            "workers": self.workers,
+            "uptime_s": round(uptime, 1),
+            "requests": requests,
+            "errors": int(counters["errors"]),
+            "bytes_out": int(counters["bytes_out"]),
+            "throughput_rps": round(requests / uptime, 2) if uptime > 0 else 0.0,
+            "busy_ratio": round(counters["busy_seconds"] / (uptime * self.workers), 3) if uptime > 0 else 0.0,
+            "endpoints": by_endpoint,
+            # Cota superior del bucket (ms) donde cae el percentil
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def flow_nodes(layout: str) -> int:
+    """Nodos del flujo tal y como los parsea Router.layout (filas ';', nodos '->', sin vacíos)."""
+    return sum(1 for row in layout.split(";") for node in row.split("->") if node.strip())
+
+
+class RenderService:
+    """Estado caliente de un worker: Router, scanner y límites."""
+
+    def __init__(self, root, rules: str = None, max_body: int = DEFAULT_MAX_BODY,
+                 scan_nodes: int = DEFAULT_SCAN_NODES, cache: bool = False):
+        from ascii_architect.scanner import ProjectScanner
+
+        self.root = Path(root).resolve()
+        self.max_body = max_body
+        self.scan_nodes = scan_nodes
+        self.router = make_router(rules)
+        self.scanner = ProjectScanner(cache=cache)
+
+    def flow(self, spec) -> tuple:
+        if isinstance(spec, dict) and isinstance(spec.get("layout"), str):
+            layout = spec["layout"]
+            if flow_nodes(layout) > MAX_FLOW_NODES:
+                raise HttpError(413, f"flujo demasiado grande (máx. {MAX_FLOW_NODES} nodos)")
+        result = render_spec(1, spec, self.router)
+        result.pop("line", None)
+        return (200 if result["ok"] else 400), result
+
+    def scan(self, spec) -> tuple:
+        from ascii_architect.analysis import analyze
+        from ascii_architect.clustering import CLUSTER_METHODS, cluster
+
+        if not isinstance(spec, dict):
+            raise HttpError(400, "el cuerpo debe ser un objeto JSON")
+        target = (self.root / str(spec.get("path", "."))).resolve()
+        if target != self.root and self.root not in target.parents:
+            raise HttpError(403, "la ruta está fuera de --root")
+        if not target.is_dir():
+            raise HttpError(404, f"no existe la carpeta '{spec.get('path', '.')}'")
+        depth = spec.get("depth", 1)
+        max_nodes = spec.get("max_nodes", self.scan_nodes)
+        method = spec.get("cluster", "folder")
+        if not isinstance(depth, int) or not 0 <= depth <= MAX_SCAN_DEPTH:
+            raise HttpError(400, f"'depth' debe ser un entero entre 0 y {MAX_SCAN_DEPTH}")
+        if not isinstance(max_nodes, int) or not 1 <= max_nodes <= self.scan_nodes:
+            raise HttpError(400, f"'max_nodes' debe ser un entero entre 1 y {self.scan_nodes}")
+        if method not in CLUSTER_METHODS:
+            raise HttpError(400, f"'cluster' debe ser {' o '.join(CLUSTER_METHODS)}")
+
+        graph = self.scanner.scan(str(target), max_depth=depth)
+        if not graph:
+            return 404, {"ok": False, "error": "No se encontraron archivos."}
+        drawing, groups = cluster(graph, max_nodes, method)
+        self.router.cycles = "keep"
+        result = {"ok": True, "nodes": graph.node_count, "edges": len(graph),
+                  "diagram": self.router.render(drawing)}
+        if groups:
+            result["clustered"] = {"nodes": drawing.node_count, "groups": len(groups)}
+        if spec.get("explain"):
+            result["analysis"] = analyze(graph)
+        return 200, result
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "ascii-arch"
+    timeout = SOCKET_TIMEOUT     # Lecturas y escrituras del socket
+
+    def log_message(self, format, *args):
+        pass    # Sin una línea por petición: /metrics da los números
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def _body(self):
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            raise HttpError(411, "falta Content-Length")
+        if int(length) > self.server.service.max_body:
+            raise HttpError(413, f"cuerpo demasiado grande (máx. {self.server.service.max_body} bytes)")
+        raw = self.rfile.read(int(length))
+        if self.headers.get("Content-Type", "").split(";")[0].strip() == "text/plain":
+            return {"layout": raw.decode("utf-8", errors="replace")}
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            raise HttpError(400, f"JSON inválido: {e}")
+
+    def _handle(self, method: str):
+        started = time.perf_counter()
+        endpoint = self.path.split("?")[0]
+        service = self.server.service
+        try:
+            if endpoint not in ENDPOINTS:
+                raise HttpError(404, f"no existe {endpoint} (usa {', '.join(ENDPOINTS)})")
+            if (method == "GET") != (endpoint in ("/health", "/metrics")):
+                raise HttpError(405, f"{method} no admitido en {endpoint}")
+            if endpoint == "/health":
+                status, body = 200, {"status": "ok", "worker": os.getpid(), "workers": self.server.metrics.workers}
+            elif endpoint == "/metrics":
+                status, body = 200, self.server.metrics.snapshot()
+            elif endpoint == "/flow":
+                status, body = service.flow(self._body())
+            else:
+                status, body = service.scan(self._body())
+        except HttpError as e:
+            status, body = e.status, {"ok": False, "error": str(e)}
+        except Exception as e:
+            status, body = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if status >= 400:
+            self.close_connection = True    # Puede quedar cuerpo sin leer (413)
+        size = self._send(status, body)
+        self.server.metrics.record(self.server.slot, endpoint, status, size, time.perf_counter() - started)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def _run_worker(sock: socket.socket, slot: int, metrics: SharedMetrics, service: RenderService,
+                max_requests: int = 0):
+    """Atiende peticiones hasta Ctrl+C / SIGTERM o, con max_requests, hasta haber servido esas."""
+    server = HTTPServer(sock.getsockname()[:2], RenderHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock      # El socket compartido del padre (ya en listen)
+    server.service = service
+    server.metrics = metrics
+    server.slot = slot
+    try:
+        if not max_requests:
+            server.serve_forever(poll_interval=0.5)
+            return
+        server.timeout = 0.5
+        served = metrics.values[slot * ROW]     # El contador de la fila es acumulado por slot
+        while metrics.values[slot * ROW] - served < max_requests:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 0, ready=None,
+          max_requests: int = DEFAULT_MAX_REQUESTS, **options):
+    """
+    Arranca el servicio (bloquea hasta Ctrl+C / SIGTERM).
+
+    Args:
+        workers: procesos (0 = uno por CPU). Sin os.fork se usa uno.
+        ready: callback(host, port) cuando el socket ya escucha (port=0 elige uno libre).
+        max_requests: peticiones por worker antes de reciclarlo (0 = nunca; sin fork se ignora).
+        options: los de RenderService (root, rules, max_body, scan_nodes, cache).
+    """
+    workers = workers or os.cpu_count() or 1
+    if not hasattr(os, "fork"):
+        workers = 1
+    sock = socket.create_server((host, port), backlog=128)
+    # No bloqueante: todos los workers esperan en select(); el que no gana el accept sigue esperando
+    sock.setblocking(False)
+    metrics = SharedMetrics(workers)
+    # Se crea antes del fork: los errores (reglas, --root) salen aquí y cada worker hereda
+    # su copia ya caliente (módulos importados, reglas compiladas)
+    service = RenderService(**options)
+    if ready:
+        ready(*sock.getsockname()[:2])
+
+    if workers == 1:
+        try:
+            _run_worker(sock, 0, metrics, service)
+        finally:
+            sock.close()
+        return
+
+    children = {}
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _run_worker(sock, slot, metrics, service, max_requests)
+            finally:
+                os._exit(0)
+        children[pid] = slot
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    for slot in range(workers):
+        spawn(slot)
+    try:
+        while not stopping:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid and pid in children:
+                spawn(children.pop(pid))     # Worker caído o reciclado: otro en su lugar (mismas métricas)
+            else:
+                time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        sock.close()
@@ -0,0 +1,174 @@
+"""ASCII Architect - Reglas de .gitignore
+Carga .gitignore / .ignore por carpeta y compila cada archivo en UNA regex.
+
+Las reglas de un archivo se unen en una alternancia en orden inverso, con un grupo con
+nombre por regla: el primer alternativo que casa es la ÚLTIMA regla del archivo, y
+m.lastgroup dice cuál fue (y si era una negación '!'). Hay dos regexes por archivo: una
+para directorios y otra para archivos (las reglas 'dir/' solo entran en la primera).
+
+Precedencia como en git: la carpeta más profunda manda; dentro de una carpeta, .ignore
+manda sobre .gitignore. Los directorios ignorados se podan antes de descender (como en
+git, un archivo no se puede re-incluir si su carpeta está excluida).
+"""
+import os
+import re
+
+IGNORE_FILES = (".gitignore", ".ignore")
+
+
+def _translate(pattern: str) -> str:
+    """Glob de gitignore (sin '!' ni '/' final) -> regex sobre la ruta relativa."""
+    anchored = "/" in pattern
+    if pattern.startswith("/"):
+        pattern = pattern[1:]
+
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                if at_start and pattern.startswith("**/", i):
+                    out.append("(?:.*/)?")     # '**/x' y 'a/**/x'
+                    i += 3
+                    continue
+                if at_start and i + 2 == n:
+                    out.append(".*")           # 'a/**'
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            # Como fnmatch: un ']' justo después de '[' o '[!' es literal, no cierra la clase
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                out.append(re.escape(c))       # '[' sin cerrar: literal
+            else:
+                body = pattern[i + 1:end]
+                negated = body[:1] in ("!", "^")
+                if negated:
+                    body = body[1:]
+                body = "".join("\\" + ch if ch in "\\[]^&~|" else ch for ch in body)
+                out.append("[" + ("^" if negated else "") + body + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+
+    body = "".join(out)
+    return body if anchored else "(?:.*/)?" + body
+
+
+def parse_lines(lines) -> list:
+    """Líneas de un .gitignore -> [(regex, negada, solo_directorios)]."""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        # Espacios finales se ignoran salvo que estén escapados
+        while line.endswith(" ") and not line.endswith("\\ "):
+            line = line[:-1]
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        regex = _translate(line)
+        try:
+            re.compile(regex)
+        except re.error:
+            # Una línea rara no puede tumbar el escaneo: se toma como nombre literal
+            regex = ("" if "/" in line else "(?:.*/)?") + re.escape(line.lstrip("/"))
+        rules.append((regex, negated, dir_only))
+    return rules
+
+
+def _compile(rules: list):
+    """Alternancia en orden inverso -> (regex, {grupo: negada})."""
+    if not rules:
+        return None, {}
+    parts = []
+    negations = {}
+    for index in range(len(rules) - 1, -1, -1):
+        regex, negated, _ = rules[index]
+        name = f"r{index}"
+        negations[name] = negated
+        parts.append(f"(?P<{name}>{regex})")
+    return re.compile(r"(?:" + "|".join(parts) + r")\Z", re.DOTALL), negations
+
+
+class IgnoreRules:
+    """Reglas de una carpeta (base = ruta relativa a la raíz del escaneo, '' en la raíz)."""
+    __slots__ = ('base', 'dir_regex', 'dir_negations', 'file_regex', 'file_negations')
+
+    def __init__(self, base: str, rules: list):
+        self.base = base
+        self.dir_regex, self.dir_negations = _compile(rules)
+        self.file_regex, self.file_negations = _compile([r for r in rules if not r[2]])
+
+    def match(self, rel_path: str, is_dir: bool):
+        """True (ignorado), False (re-incluido con '!') o None (ninguna regla aplica)."""
+        if self.base:
+            rel_path = rel_path[len(self.base) + 1:]
+        regex, negations = ((self.dir_regex, self.dir_negations) if is_dir
+                            else (self.file_regex, self.file_negations))
+        if regex is None:
+            return None
+        m = regex.match(rel_path)
+        if m is None:
+            return None
+        return not negations[m.lastgroup]
+
+
+def load_rules(dir_path: str, base: str, names) -> IgnoreRules:
+    """
+    Reglas de los archivos de ignore presentes en `names` (listado de la carpeta).
+    Devuelve None si no hay ninguno (o ninguna regla).
+    """
+    rules = []
+    for file_name in IGNORE_FILES:
+        if file_name not in names:
+            continue
+        try:
+            with open(os.path.join(dir_path, file_name), "r", encoding="utf-8", errors="ignore") as f:
+                rules.extend(parse_lines(f))
+        except OSError:
+            continue
+    return IgnoreRules(base, rules) if rules else None
+
+
+def load_exclude(root: str) -> IgnoreRules:
+    """Reglas locales del repo (.git/info/exclude), con la menor precedencia."""
+    try:
+        with open(os.path.join(root, ".git", "info", "exclude"), "r", encoding="utf-8", errors="ignore") as f:
+            rules = parse_lines(f)
+    except OSError:
+        return None
+    return IgnoreRules("", rules) if rules else None
+
+
+def is_ignored(chain: tuple, rel_path: str, is_dir: bool) -> bool:
+    """Consulta las reglas de la carpeta más profunda a la raíz; la primera que opina decide."""
+    for rules in reversed(chain):
+        verdict = rules.match(rel_path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
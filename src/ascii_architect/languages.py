@@ -0,0 +1,49 @@
+"""ASCII Architect - Registro de lenguajes
+Una sola tabla extensión -> Language(extract, resolve) para todo el pipeline del scanner
+(pool de workers, caché e índice de módulos).
+
+- extract(ruta, late=False, source=None) -> [ImportRef]. Debe ser una función de módulo
+  (el pool de procesos la envía por pickle).
+- resolve(indice, ref, ruta_relativa) -> [rutas del escaneo] ('carpeta/' para paquetes).
+
+Un plugin solo tiene que llamar a register_language() con sus extensiones.
+"""
+import os
+from typing import Callable, NamedTuple
+
+from ascii_architect.extractors import (extract_go_imports, extract_js_imports, extract_python_imports,
+                                        extract_rust_imports)
+from ascii_architect.module_index import JS_EXTENSIONS, ModuleIndex
+
+
+class Language(NamedTuple):
+    name: str
+    extract: Callable
+    resolve: Callable
+
+
+LANGUAGES = {}
+
+
+def register_language(extensions, language: Language):
+    for ext in extensions:
+        LANGUAGES[ext] = language
+
+
+def language_for(file_name: str):
+    """Language del archivo según su extensión, o None si no se analizan sus imports."""
+    return LANGUAGES.get(os.path.splitext(file_name)[1])
+
+
+def extract_imports(file_path, late: bool = False, source: bytes = None) -> list:
+    """Despacha al extractor del lenguaje (punto de entrada común del pool y la caché)."""
+    language = language_for(str(file_path))
+    if language is None:
+        return []
+    return language.extract(file_path, late=late, source=source)
+
+
+register_language([".py"], Language("python", extract_python_imports, ModuleIndex.resolve))
+register_language(JS_EXTENSIONS, Language("javascript", extract_js_imports, ModuleIndex.resolve_js))
+register_language([".go"], Language("go", extract_go_imports, ModuleIndex.resolve_go))
+register_language([".rs"], Language("rust", extract_rust_imports, ModuleIndex.resolve_rust))
@@ -0,0 +1,108 @@
+"""ASCII Architect - Layout
+Cálculo de coordenadas (X, Y) de los nodos del grid. Trabaja sobre filas de NodeRecord
+y escribe node.x / node.y en sitio.
+
+- grid_layout: layout clásico, ancho de columna = máximo de todas las filas.
+- compact_layout: pasada de compactación. Resuelve el camino más largo sobre los
+  grafos de restricciones horizontal y vertical, preservando el orden y la separación
+  mínima, para que una etiqueta ancha no infle todas las filas.
+"""
+
+MARGIN = 2
+
+
+def _row_tops(rows: list, gap_y: int):
+    """Restricción vertical (cadena): top(r) >= top(r-1) + alto(r-1) + gap_y."""
+    heights = [max((node.h for node in row), default=0) for row in rows]
+    tops = []
+    curr_y = MARGIN
+    for h in heights:
+        tops.append(curr_y)
+        curr_y += h + gap_y
+    return tops, heights, curr_y
+
+
+def extent(rows: list):
+    """
+    Tamaño que ocupan los nodos ya colocados: caja envolvente + MARGIN (sin huecos al
+    final). Es la medida común para comparar layouts (área ahorrada al compactar).
+    """
+    right = bottom = 0
+    for row in rows:
+        for node in row:
+            right = max(right, node.x + node.w)
+            bottom = max(bottom, node.y + node.h)
+    return right + MARGIN, bottom + MARGIN
+
+
+def grid_layout(rows: list, gap_x: int = 6, gap_y: int = 4):
+    """
+    Layout clásico en columnas alineadas.
+
+    Args:
+        rows: filas del grid (listas de NodeRecord, pueden estar vacías).
+    Returns:
+        (ancho_canvas, alto_canvas), con holgura extra a la derecha y abajo (para medir
+        el área ocupada usa extent()).
+    """
+    col_widths = []
+    for row in rows:
+        for c, node in enumerate(row):
+            if c == len(col_widths):
+                col_widths.append(node.w)
+            elif node.w > col_widths[c]:
+                col_widths[c] = node.w
+
+    x_positions = []
+    curr_x = MARGIN
+    for w in col_widths:
+        x_positions.append(curr_x)
+        curr_x += w + gap_x
+
+    tops, heights, curr_y = _row_tops(rows, gap_y)
+    for r, row in enumerate(rows):
+        for c, node in enumerate(row):
+            # Centrado vertical en su fila
+            node.x = x_positions[c]
+            node.y = tops[r] + (heights[r] - node.h) // 2
+
+    return curr_x + 5, curr_y + 5
+
+
+def compact_layout(rows: list, gap_x: int = 4, gap_y: int = 3):
+    """
+    Compactación longest-path.
+
+    Restricciones horizontales (arista u -> v con peso ancho(u) + gap_x):
+      - (r, c-1) -> (r, c): orden dentro de la fila.
+      - (r±1, c-1) -> (r, c): la columna c de filas vecinas queda a la derecha de la
+        columna c-1, así los codos de las flechas verticales no se cruzan.
+    Como todas las aristas van de la columna c-1 a la c, basta recorrer columnas en
+    orden: O(nodos).
+
+    Returns:
+        (ancho_canvas, alto_canvas)
+    """
+    columns = []
+    for r, row in enumerate(rows):
+        for c in range(len(row)):
+            if c == len(columns):
+                columns.append([])
+            columns[c].append(r)
+
+    for c, column_rows in enumerate(columns):
+        for r in column_rows:
+            x = MARGIN
+            if c > 0:
+                for pr in (r - 1, r, r + 1):
+                    if 0 <= pr < len(rows) and c - 1 < len(rows[pr]):
+                        prev = rows[pr][c - 1]
+                        x = max(x, prev.x + prev.w + gap_x)
+            rows[r][c].x = x
+
+    tops, heights, _ = _row_tops(rows, gap_y)
+    for r, row in enumerate(rows):
+        for node in row:
+            node.y = tops[r] + (heights[r] - node.h) // 2
+
+    return extent(rows)
@@ -0,0 +1,208 @@
+"""ASCII Architect - Índice de módulos
+Mapea nombres con puntos a archivos del escaneo para resolver imports sin comparar
+cada import contra cada archivo.
+
+- Cada archivo 'a/b/c.py' se registra con todos sus sufijos: 'a.b.c', 'b.c' y 'c'.
+  Así funcionan los layouts 'src/' ('src.pkg.mod' y 'pkg.mod'), los paquetes con
+  __init__.py ('a/b/__init__.py' -> 'a.b') y los imports por nombre corto.
+- Los imports relativos ('from ..a import b') se resuelven por ruta desde la carpeta
+  del archivo que importa.
+- Si un nombre apunta a varios archivos, gana el más cercano al que importa.
+- Si la raíz del escaneo es un paquete (tiene __init__.py), sus nombres se registran
+  también con el prefijo del paquete ('ascii_architect.router' al escanear el paquete).
+
+Otros lenguajes (ver languages.py):
+- JS/TS: solo especificadores relativos ('./x' -> x.ts, x.js, x/index.ts, ...).
+- Go: el import apunta a un paquete (carpeta) bajo algún 'module' de go.mod.
+- Rust: rutas 'crate::', 'self::' y 'super::' -> a.rs o a/mod.rs (el prefijo más largo).
+"""
+import os
+import posixpath
+
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+
+
+def _common_depth(a: list, b: list) -> int:
+    depth = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        depth += 1
+    return depth
+
+
+def package_prefix(root) -> list:
+    """Paquetes que contienen a la raíz: /x/src/pkg/sub -> ['pkg', 'sub'] si ambos tienen __init__.py."""
+    prefix = []
+    path = os.path.abspath(root)
+    while os.path.isfile(os.path.join(path, "__init__.py")):
+        path, name = os.path.split(path)
+        if not name:
+            break
+        prefix.insert(0, name)
+    return prefix
+
+
+class ModuleIndex:
+    def __init__(self, prefix: list = ()):
+        self.prefix = list(prefix)
+        self.files = set()     # Rutas relativas ('pkg/mod.py')
+        self.names = {}        # 'pkg.mod' -> [rutas]
+        self.basenames = {}    # 'mod.py' -> cantidad (etiquetas ambiguas)
+        self.dirs = set()      # Carpetas con archivos fuente
+        self.go_modules = []   # [(ruta_modulo, carpeta)], la ruta más larga primero
+
+    def add(self, rel_path: str):
+        self.files.add(rel_path)
+        folder, _, base = rel_path.rpartition("/")
+        self.dirs.add(folder)
+        self.basenames[base] = self.basenames.get(base, 0) + 1
+        if not base.endswith(".py"):
+            return
+
+        parts = self.prefix + rel_path[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts.pop()
+        for i in range(len(parts)):
+            self.names.setdefault(".".join(parts[i:]), []).append(rel_path)
+
+    def add_go_module(self, rel_dir: str, module_path: str):
+        if module_path:
+            self.go_modules.append((module_path, rel_dir))
+            self.go_modules.sort(key=lambda item: -len(item[0]))
+
+    def label(self, rel_path: str) -> str:
+        """
+        Nombre de archivo; la ruta relativa solo si el nombre se repite en el escaneo.
+        Las carpetas (destinos de Go, terminan en '/') se etiquetan como los nodos '[DIR]'.
+        """
+        if rel_path.endswith("/"):
+            return f"{rel_path[:-1].rpartition('/')[2] or 'ROOT'} [DIR]"
+        base = rel_path.rpartition("/")[2]
+        return base if self.basenames.get(base, 0) <= 1 else rel_path
+
+    def _lookup(self, name: str, importer: str):
+        candidates = self.names.get(name)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        origin = importer.split("/")[:-1]
+        # Más carpetas en común con el importador; a igualdad, la ruta más corta
+        return min(candidates, key=lambda c: (-_common_depth(origin, c.split("/")[:-1]), c.count("/"), c))
+
+    def _lookup_path(self, parts: list):
+        """Archivo de un módulo dado como ruta: 'a/b.py' o 'a/b/__init__.py'."""
+        if not parts:
+            return None
+        path = "/".join(parts)
+        for candidate in (path + ".py", path + "/__init__.py"):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def resolve(self, ref, importer: str) -> list:
+        """
+        Archivos del escaneo a los que apunta un import.
+        ref: ImportRef o [modulo, nombres, nivel]; importer: ruta relativa del que importa.
+        """
+        module, names, level = ref
+        targets = []
+
+        if level:
+            base = importer.split("/")[:-1]
+            if level - 1 > len(base):
+                return targets
+            base = base[:len(base) - (level - 1)]
+            module_parts = base + (module.split(".") if module else [])
+            for name in names:
+                target = self._lookup_path(module_parts + [name])
+                if target:
+                    targets.append(target)
+            if not targets:
+                target = self._lookup_path(module_parts)
+                if target:
+                    targets.append(target)
+        else:
+            for name in names:
+                target = self._lookup(f"{module}.{name}", importer)
+                if target:
+                    targets.append(target)
+            if not targets:
+                # 'import a.b.c': el prefijo más largo que exista en el escaneo
+                parts = module.split(".")
+                for end in range(len(parts), 0, -1):
+                    target = self._lookup(".".join(parts[:end]), importer)
+                    if target:
+                        targets.append(target)
+                        break
+
+        return [t for t in targets if t != importer]
+
+    def resolve_js(self, ref, importer: str) -> list:
+        """Solo especificadores relativos: los paquetes npm no son archivos del escaneo."""
+        spec = ref[0]
+        if not spec.startswith("."):
+            return []
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+        if base.startswith(".."):
+            return []
+        stem, ext = posixpath.splitext(base)
+        candidates = [base]
+        if ext in JS_EXTENSIONS:
+            # TS con salida ESM importa './x.js' aunque el archivo sea x.ts
+            candidates.extend(stem + e for e in JS_EXTENSIONS)
+        candidates.extend(base + e for e in JS_EXTENSIONS)
+        candidates.extend(f"{base}/index{e}" for e in JS_EXTENSIONS)
+        for candidate in candidates:
+            if candidate in self.files and candidate != importer:
+                return [candidate]
+        return []
+
+    def resolve_go(self, ref, importer: str) -> list:
+        """Import path bajo un módulo de go.mod -> carpeta del paquete ('api/')."""
+        path = ref[0]
+        for module, rel_dir in self.go_modules:
+            if path == module or path.startswith(module + "/"):
+                sub = path[len(module) + 1:]
+                target = f"{rel_dir}/{sub}" if rel_dir and sub else rel_dir or sub
+                if target in self.dirs and target != importer.rpartition("/")[0]:
+                    return [target + "/"]
+                return []
+        return []
+
+    def _rust_crate_root(self, folders: list) -> list:
+        """Carpeta con lib.rs o main.rs más cercana (hacia arriba)."""
+        for end in range(len(folders), -1, -1):
+            prefix = "/".join(folders[:end])
+            prefix = prefix + "/" if prefix else ""
+            if prefix + "lib.rs" in self.files or prefix + "main.rs" in self.files:
+                return folders[:end]
+        return folders
+
+    def resolve_rust(self, ref, importer: str) -> list:
+        """'crate::a::b::Item' -> a/b.rs, a/b/mod.rs o a.rs (el prefijo más largo que exista)."""
+        segments = ref[0].split("::")
+        folders = importer.split("/")[:-1]
+        stem = importer.rpartition("/")[2][:-3]
+        # Carpeta de los submódulos del archivo: foo.rs -> foo/, mod.rs/lib.rs/main.rs -> su carpeta
+        module_dir = folders if stem in ("lib", "main", "mod") else folders + [stem]
+
+        head, rest = segments[0], segments[1:]
+        if head == "self":
+            base = module_dir
+        elif head == "super":
+            base = module_dir[:-1]
+            while rest and rest[0] == "super":
+                base, rest = base[:-1], rest[1:]
+        elif head == "crate":
+            base = self._rust_crate_root(folders)
+        else:
+            return []   # crate externo (std, dependencias)
+
+        for end in range(len(rest), 0, -1):
+            path = "/".join(base + rest[:end])
+            for candidate in (path + ".rs", path + "/mod.rs"):
+                if candidate in self.files and candidate != importer:
+                    return [candidate]
+        return []
@@ -1,10 +1,34 @@
-import requests
 import json
 
+from ascii_architect.analysis import analyze, format_report
+from ascii_architect.compact_topology import DEFAULT_PAYLOAD_BUDGET, compact_topology
+from ascii_architect.graph import ScanGraph
+from ascii_architect.narrator_cache import NarratorCache, cache_key
+from ascii_architect.streaming import STREAM_ACCEPT, iter_fragments
+
 class Narrator:
-    def __init__(self):
+    def __init__(self, transport: "NarratorTransport" = None, cache: NarratorCache = None,
+                 payload_budget: int = DEFAULT_PAYLOAD_BUDGET, compact: bool = True, pool_size: int = 4):
         # URL de PRODUCCIÓN (Asegúrate de que n8n esté activo)
         self.webhook_url = "http://localhost:5678/webhook/explain"
+        # Sesión keep-alive + reintentos + circuit breaker (métricas en transport.metrics).
+        # Se crea al primer uso: el modo local no carga requests
+        self._transport = transport
+        self.pool_size = pool_size   # Conexiones keep-alive del transporte propio
+        # Respuestas ya pagadas (None = sin caché)
+        self.cache = cache
+        # Topología compacta (tabla de nodos + adyacencias) con presupuesto de caracteres;
+        # compact=False envía el string clásico 'a -> b ; c -> d'
+        self.payload_budget = payload_budget
+        self.compact = compact
+        self.last_payload = None   # Reporte de compresión de la última petición
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            from ascii_architect.transport import NarratorTransport
+            self._transport = NarratorTransport(self.webhook_url, pool_size=self.pool_size)
+        return self._transport
 
     # DICCIONARIO DE PERSONALIDADES
     PROMPTS = {
@@ -19,102 +43,139 @@ class Narrator:
         "doom": "Eres el Doom Slayer. El código está infestado de demonios (bugs). Describe la arquitectura como un campo de batalla. Rip and Tear."
     }
 
-    def explain(self, topology_text: str, use_ai: bool = False, style: str = "pro") -> str:
-        if not topology_text: return "Nada que explicar."
+    def explain(self, topology, use_ai: bool = False, style: str = "pro", context: str = None,
+                refresh: bool = False) -> str:
+        """
+        topology: ScanGraph del scanner o string 'a -> b ; c -> d'.
+        context: documentación del proyecto (get_docs_content) para el modo IA.
+        refresh: ignora la respuesta en caché (la nueva sí se guarda).
+        """
+        if not topology: return "Nada que explicar."
+        graph = topology if isinstance(topology, ScanGraph) else ScanGraph.from_topology(topology)
 
-        # MODO LOCAL (Texto plano, ignora el estilo)
+        # MODO LOCAL (análisis del grafo sin IA, ignora el estilo)
         if not use_ai:
-            lines = topology_text.split(" ; ")
-            report = []
-            for l in lines:
-                if "->" in l:
-                    a, b = l.split("->")
-                    if "[DIR]" in a: report.append(f"📂 Carpeta '{a.replace('[DIR]','').strip()}' contiene '{b.strip()}'")
-                    elif ".py" in b: report.append(f"🐍 '{a.strip()}' importa '{b.strip()}'")
-                    else: report.append(f"🔗 '{a.strip()}' conecta con '{b.strip()}'")
-            return "\n".join(report)
-
-        # MODO IA (N8N) - Aquí inyectamos la personalidad
-        persona_prompt = self.PROMPTS.get(style, self.PROMPTS["pro"])
-        
-        # Construimos el prompt final combinando la personalidad + los datos
-        full_prompt = f"{persona_prompt}\n\nAnaliza la siguiente topología de archivos y explícame qué hace este proyecto:\n"
+            return format_report(analyze(graph))
 
-        payload = {
-            "text": topology_text,
-            "prompt": full_prompt 
-        }
-        
+        # MODO IA (N8N) - Aquí inyectamos la personalidad (requests se carga solo aquí)
+        from ascii_architect.transport import TransportError
+        payload = self._payload(graph, style, context)
+        key = cache_key(graph, payload["prompt"], context, self._encoding())
+        cached = self._cached(key, refresh)
+        if cached is not None:
+            return cached
         try:
             print(f"📡 Llamando al Narrador (Modo: {style.upper()})...")
-            resp = requests.post(self.webhook_url, json=payload, timeout=45)
-            if resp.status_code == 200:
-                try: 
-                    d = resp.json()
-                    # Intenta sacar el texto limpio
-                    return d.get('text', d.get('output', str(d)))
-                except: return resp.text
-            return f"Error n8n: {resp.status_code}"
-        except Exception as e:
-            return f"Error conexión: {e}"
-
-
-            import requests
-import json
+            resp = self.transport.post(payload)
+        except TransportError as e:
+            return self._error(e)
+        try: 
+            d = resp.json()
+            # Intenta sacar el texto limpio
+            text = d.get('text', d.get('output', str(d)))
+        except: text = resp.text
+        self._store(key, text, style)
+        return text
 
-class Narrator:
-    def __init__(self):
-        # URL de PRODUCCIÓN (Asegúrate de que n8n esté activo)
-        self.webhook_url = "http://localhost:5678/webhook/explain"
+    def explain_stream(self, topology, style: str = "pro", context: str = None, refresh: bool = False):
+        """
+        Modo IA en streaming: genera los fragmentos de texto a medida que llegan (SSE,
+        NDJSON o chunked). Si el webhook responde con el JSON único de siempre, sale un
+        solo fragmento. Los errores se generan como texto, igual que en explain().
+        Una respuesta en caché sale entera como un solo fragmento; solo se guardan los
+        streams completos.
+        """
+        if not topology:
+            yield "Nada que explicar."
+            return
+        import requests
+        from ascii_architect.transport import TransportError
 
-    # DICCIONARIO DE PERSONALIDADES
-    PROMPTS = {
-        "pro": "Actúa como un Arquitecto de Software Senior. Sé técnico, breve, formal y céntrate en patrones de diseño.",
-        "hacker": "Eres un Hacker de Sombrero Negro experto en ingeniería inversa. Analiza esto como una red objetivo. Usa jerga: 'vector de ataque', 'payload', 'matrix'. Sé críptico.",
-        "soviet": "Eres un Ingeniero en Jefe de la Unión Soviética (1980). Valoras la eficiencia y el hormigón. Odias el desperdicio capitalista. Llama al usuario 'Camarada'.",
-        "eli5": "Eres una maestra de jardín de infantes muy dulce. Explica este código con analogías de juguetes, legos y animales. Usa emojis 🌟.",
-        "ramsay": "Eres el Chef Gordon Ramsay revisando código desastroso (Kitchen Nightmares). Insulta el diseño. Grita si ves dependencias circulares. Usa frases como 'IT'S RAW!', 'DONKEY'.",
-        "jarvis": "Eres J.A.R.V.I.S., la IA de Tony Stark. Analiza con elegancia británica. Sé servicial, preciso y llama al usuario 'Señor'.",
-        "corporate": "Eres un Manager corporativo que ama las buzzwords. Usa palabras como 'Sinergia', 'Holístico', 'Paradigma', 'ROI'. Vende humo.",
-        "medieval": "Eres un Mago anciano en una torre. El código son pergaminos, las carpetas reinos y los scripts magia arcana. Habla con solemnidad.",
-        "doom": "Eres el Doom Slayer. El código está infestado de demonios (bugs). Describe la arquitectura como un campo de batalla. Rip and Tear."
-    }
+        graph = topology if isinstance(topology, ScanGraph) else ScanGraph.from_topology(topology)
+        payload = self._payload(graph, style, context)
+        key = cache_key(graph, payload["prompt"], context, self._encoding())
+        cached = self._cached(key, refresh)
+        if cached is not None:
+            yield cached
+            return
+        payload["stream"] = True
+        try:
+            print(f"📡 Llamando al Narrador (Modo: {style.upper()}, streaming)...")
+            resp = self.transport.post(payload, stream=True, headers={"Accept": STREAM_ACCEPT})
+        except TransportError as e:
+            yield self._error(e)
+            return
+        fragments = []
+        try:
+            for fragment in iter_fragments(resp):
+                fragments.append(fragment)
+                yield fragment
+        except requests.RequestException as e:
+            yield f"\n⚠️ Stream interrumpido: {e}"
+            return
+        finally:
+            resp.close()
+        self._store(key, "".join(fragments), style)
 
-    def explain(self, topology_text: str, use_ai: bool = False, style: str = "pro") -> str:
-        if not topology_text: return "Nada que explicar."
+    async def explain_styles(self, topology, styles: list, context: str = None, refresh: bool = False,
+                             limit: int = 4):
+        """
+        Varias personalidades sobre la misma topología, en paralelo (como mucho `limit`
+        peticiones a la vez, y nunca más que el pool del transporte: una conexión de más
+        se abre y se descarta al volver, sin keep-alive). Genera (estilo, texto) en orden de llegada: el tiempo total
+        es el de la petición más lenta, no la suma.
 
-        # MODO LOCAL (Texto plano, ignora el estilo)
-        if not use_ai:
-            lines = topology_text.split(" ; ")
-            report = []
-            for l in lines:
-                if "->" in l:
-                    a, b = l.split("->")
-                    if "[DIR]" in a: report.append(f"📂 Carpeta '{a.replace('[DIR]','').strip()}' contiene '{b.strip()}'")
-                    elif ".py" in b: report.append(f"🐍 '{a.strip()}' importa '{b.strip()}'")
-                    else: report.append(f"🔗 '{a.strip()}' conecta con '{b.strip()}'")
-            return "\n".join(report)
-
-        # MODO IA (N8N) - Aquí inyectamos la personalidad
+        Cada petición es el explain() de siempre (sesión keep-alive, reintentos, caché)
+        en un hilo: el transporte es síncrono y el bucle de asyncio solo orquesta.
+        """
+        import asyncio
+
+        transport = self.transport   # Se crea aquí, no a la vez en varios hilos
+        semaphore = asyncio.Semaphore(max(1, min(limit, getattr(transport, "pool_size", limit))))
+
+        async def run(style):
+            async with semaphore:
+                text = await asyncio.to_thread(self.explain, topology, True, style, context, refresh)
+            return style, text
+
+        for done in asyncio.as_completed([run(style) for style in styles]):
+            yield await done
+
+    def _cached(self, key: str, refresh: bool):
+        if self.cache is None or refresh:
+            return None
+        text = self.cache.get(key)
+        if text is not None:
+            print("♻️  Narrador: respuesta en caché (usa --refresh para pedir otra).")
+        return text
+
+    def _store(self, key: str, text: str, style: str):
+        if self.cache is not None and text:
+            self.cache.put(key, text, style)
+
+    def _encoding(self) -> str:
+        """Parte de la clave de caché: el mismo grafo codificado de otra forma es otro payload."""
+        return f"compact:{self.payload_budget or 0}" if self.compact else "raw"
+
+    def _payload(self, graph: ScanGraph, style: str, context: str = None) -> dict:
         persona_prompt = self.PROMPTS.get(style, self.PROMPTS["pro"])
         
         # Construimos el prompt final combinando la personalidad + los datos
         full_prompt = f"{persona_prompt}\n\nAnaliza la siguiente topología de archivos y explícame qué hace este proyecto:\n"
 
+        if self.compact:
+            text, self.last_payload = compact_topology(graph, self.payload_budget)
+        else:
+            text = graph.to_topology()
+            self.last_payload = {"raw": len(text), "compact": len(text), "summarized": [], "truncated": 0}
         payload = {
-            "text": topology_text,
+            "text": text,
             "prompt": full_prompt 
         }
-        
-        try:
-            print(f"📡 Llamando al Narrador (Modo: {style.upper()})...")
-            resp = requests.post(self.webhook_url, json=payload, timeout=45)
-            if resp.status_code == 200:
-                try: 
-                    d = resp.json()
-                    # Intenta sacar el texto limpio
-                    return d.get('text', d.get('output', str(d)))
-                except: return resp.text
-            return f"Error n8n: {resp.status_code}"
-        except Exception as e:
-            return f"Error conexión: {e}"
\ No newline at end of file
+        if context:
+            payload["context"] = context
+        return payload
+
+    @staticmethod
+    def _error(e) -> str:
+        return f"Error n8n: {e.status}" if e.status else f"Error conexión: {e}"
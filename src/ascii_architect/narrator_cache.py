@@ -0,0 +1,125 @@
+"""ASCII Architect - Caché de análisis del Narrador
+Guarda las respuestas del webhook en '<raíz>/.ascii-arch/narrator/' (un JSON por
+entrada) para no volver a pagar la llamada externa si el proyecto no cambió.
+
+- Clave por contenido: hash de (grafo en orden canónico, codificación del payload,
+  prompt de la personalidad, contexto de docs). Se calcula sobre el ScanGraph y no sobre
+  el texto enviado: el mismo grafo leído en otro orden da la misma clave. Cualquier
+  cambio en el árbol, el estilo o los docs da otra.
+- TTL: las entradas caducan a los `ttl` segundos (el LLM o el prompt pueden mejorar).
+- Tamaño acotado: como mucho `max_entries` archivos; al pasarse se borran los menos
+  usados (cada acierto actualiza el mtime de la entrada).
+- Solo se guardan respuestas correctas, nunca los textos de error.
+- Opt-in, como la caché de escaneo ('ascii-arch scan --ai --cache').
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from ascii_architect.graph import ScanGraph
+from ascii_architect.scan_cache import CACHE_DIR
+
+NARRATOR_DIR = "narrator"
+CACHE_VERSION = 2
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 128
+
+
+def normalize_topology(text: str) -> str:
+    """Filas sin espacios sobrantes y en orden: el mismo grafo da siempre la misma clave."""
+    rows = []
+    for row in text.split(";"):
+        labels = [label.strip() for label in row.split("->")]
+        labels = [label for label in labels if label]
+        if labels:
+            rows.append(" -> ".join(labels))
+    return " ; ".join(sorted(rows))
+
+
+def graph_signature(graph: ScanGraph) -> str:
+    """
+    El grafo sin depender del orden de inserción: aristas en orden canónico (con tipo y
+    peso), nodos sueltos y carpetas conocidas (cambian la topología compacta).
+    """
+    weights = graph.pair_weights()
+    parts = [f"{a} -> {b} [{kind}x{weights.get((a, b), 1)}]" for a, b, kind in graph.sorted_edges()]
+    parts.extend(row[0] for row in graph.rows() if len(row) == 1)
+    parts.extend(sorted(f"{label} @{folder}" for label, folder in zip(graph.labels, graph.folders)
+                        if folder is not None))
+    return "\n".join(parts)
+
+
+def cache_key(topology, prompt: str, context: str = None, encoding: str = "") -> str:
+    """
+    topology: ScanGraph (lo normal) o string 'a -> b ; c -> d'.
+    encoding: cómo se codifica la topología en el payload (compacta y presupuesto, o cruda).
+    """
+    canonical = graph_signature(topology) if isinstance(topology, ScanGraph) else normalize_topology(topology)
+    data = json.dumps([CACHE_VERSION, canonical, encoding, prompt, context or ""],
+                      ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class NarratorCache:
+    def __init__(self, root, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            root: raíz del proyecto (la caché vive en root/.ascii-arch/narrator/).
+            ttl: segundos de validez de una respuesta.
+            max_entries: respuestas guardadas como mucho.
+        """
+        self.path = Path(root) / CACHE_DIR / NARRATOR_DIR
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, key: str):
+        """Respuesta guardada o None (no existe, caducó o está corrupta)."""
+        entry_path = self.path / f"{key}.json"
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or time.time() - entry.get("created", 0) > self.ttl:
+            return None
+        try:
+            os.utime(entry_path)   # LRU: el acierto cuenta como uso
+        except OSError:
+            pass
+        return entry.get("text")
+
+    def put(self, key: str, text: str, style: str = None):
+        """Escritura atómica (tmp + replace) y desalojo de las entradas menos usadas."""
+        entry_path = self.path / f"{key}.json"
+        tmp = entry_path.with_suffix(".tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "style": style, "text": text}, f, ensure_ascii=False)
+            os.replace(tmp, entry_path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,8 +1,12 @@
 import os
 import re
 import sys
-import torch
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
+try:
+    import torch
+    from transformers import GPT2LMHeadModel, GPT2Tokenizer
+except ImportError as e:
+    # Dependencias del extra 'neural' (el Router solo importa este módulo con --neural)
+    raise ImportError("el motor neuronal necesita torch y transformers: pip install \".[neural]\"") from e
 from pathlib import Path
 
 # Detectar dónde está instalado el archivo y buscar modelos relativos
@@ -0,0 +1,152 @@
+"""ASCII Architect - Paginación
+Divide un diagrama ya posicionado en páginas (tiles) de tamaño fijo.
+
+Los cortes se buscan en los canales libres entre nodos (ninguna caja queda partida
+salvo que sea más grande que la página). Las flechas que cruzan un borde reciben un
+marcador 'pN' con la página donde continúan. Sólo se rasteriza la página pedida.
+"""
+from bisect import bisect_right
+
+DEFAULT_PAGE_SIZE = (100, 40)
+
+
+def parse_page_size(text: str) -> tuple:
+    """'120x40' -> (120, 40)."""
+    try:
+        w, h = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Tamaño de página inválido: '{text}' (usa ANCHOxALTO, ej: 100x40)")
+    if w < 10 or h < 5:
+        raise ValueError("La página mínima es 10x5.")
+    return w, h
+
+
+def _cuts(intervals: list, total: int, size: int) -> list:
+    """
+    Cortes sobre un eje. Un corte c es válido si ningún intervalo [a, b) cumple a < c < b.
+    Greedy (O(n log n)): para cada página buscamos el canal libre que contiene el límite
+    (o el anterior, si el límite cae dentro de un nodo) y cortamos por su centro, así la
+    flecha que lo cruza queda repartida entre ambas páginas.
+    """
+    blocks = []
+    for a, b in sorted(intervals):
+        if blocks and a < blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], b)
+        else:
+            blocks.append([a, b])
+
+    cuts = [0]
+    i = 0
+    while total - cuts[-1] > size:
+        start = cuts[-1]
+        limit = start + size
+        while i < len(blocks) and blocks[i][1] <= limit:
+            i += 1
+        gap_start = max(blocks[i - 1][1], start) if i > 0 else start
+        gap_end = blocks[i][0] if i < len(blocks) else total
+        cut = min(limit, (gap_start + gap_end + 1) // 2)
+        if cut <= start:
+            # Nodo más grande que la página: no queda otra que partirlo
+            cut = limit
+        cuts.append(cut)
+    cuts.append(total)
+    return cuts
+
+
+class Pagination:
+    def __init__(self, x_cuts: list, y_cuts: list):
+        self.x_cuts = x_cuts
+        self.y_cuts = y_cuts
+        self.cols = len(x_cuts) - 1
+        self.rows = len(y_cuts) - 1
+
+    @property
+    def count(self) -> int:
+        return self.cols * self.rows
+
+    def rect(self, number: int) -> tuple:
+        """Página (1-based, orden fila a fila) -> (x0, y0, ancho, alto)."""
+        if not 1 <= number <= self.count:
+            raise ValueError(f"Página {number} fuera de rango (1-{self.count}).")
+        py, px = divmod(number - 1, self.cols)
+        x0, y0 = self.x_cuts[px], self.y_cuts[py]
+        return x0, y0, self.x_cuts[px + 1] - x0, self.y_cuts[py + 1] - y0
+
+    def page_at(self, x: int, y: int) -> int:
+        px = min(max(bisect_right(self.x_cuts, x) - 1, 0), self.cols - 1)
+        py = min(max(bisect_right(self.y_cuts, y) - 1, 0), self.rows - 1)
+        return py * self.cols + px + 1
+
+
+def paginate(diagram, page_w: int, page_h: int) -> Pagination:
+    """
+    Calcula los cortes de página a partir de las cajas del diagrama (sin rasterizar).
+    El área paginada llega hasta el último nodo: los márgenes finales no generan páginas vacías.
+    """
+    x_intervals = []
+    y_intervals = []
+    for node in diagram.nodes:
+        x_intervals.append((node.x, node.x + node.w))
+        y_intervals.append((node.y, node.y + node.h))
+    width = max((b for _, b in x_intervals), default=diagram.width)
+    height = max((b for _, b in y_intervals), default=diagram.height)
+    return Pagination(_cuts(x_intervals, width, page_w), _cuts(y_intervals, height, page_h))
+
+
+def _crossings(a: int, b: int, lo: int, hi: int):
+    """Segmento a -> b sobre un eje vs. página [lo, hi). Devuelve (entrada, salida) o None."""
+    entry = exit_ = None
+    if b > a:
+        if a < lo <= b: entry = lo
+        if a <= hi - 1 < b: exit_ = hi - 1
+    elif b < a:
+        if b <= hi - 1 < a: entry = hi - 1
+        if b < lo <= a: exit_ = lo
+    return entry, exit_
+
+
+def connector_markers(diagram, pagination: Pagination, number: int) -> list:
+    """
+    Marcadores 'pN' para las flechas que entran o salen de la página.
+    Devuelve [(x, y, texto)] en coordenadas absolutas del diagrama.
+    """
+    x0, y0, w, h = pagination.rect(number)
+    x1, y1 = x0 + w, y0 + h
+    markers = []
+
+    nodes = diagram.nodes
+    for edge in diagram.edges:
+        src, dst = nodes[edge.src], nodes[edge.dst]
+        src_page = pagination.page_at(src.x, src.y)
+        dst_page = pagination.page_at(dst.x, dst.y)
+        if src_page == dst_page == number:
+            continue
+        points = diagram.edge_path(edge)
+
+        # La punta queda junto al borde del destino: extendemos un paso hasta la caja
+        (px, py), (lx, ly) = points[-2], points[-1]
+        if ly == py and lx != px:
+            tail = (lx + (1 if lx > px else -1), ly)
+        else:
+            tail = (lx, ly + 1)
+        path = points + [tail]
+
+        for (ax, ay), (bx, by) in zip(path, path[1:]):
+            if ay == by and y0 <= ay < y1:
+                entry, exit_ = _crossings(ax, bx, x0, x1)
+                if entry is not None:
+                    text = f"p{src_page}"
+                    start = entry if entry == x0 else entry - len(text) + 1
+                    markers.append((start, ay, text))
+                if exit_ is not None:
+                    text = f"p{dst_page}"
+                    start = exit_ - len(text) + 1 if exit_ == x1 - 1 else exit_
+                    markers.append((start, ay, text))
+            elif ax == bx and x0 <= ax < x1:
+                entry, exit_ = _crossings(ay, by, y0, y1)
+                if entry is not None:
+                    markers.append((ax, entry, f"p{src_page}"))
+                if exit_ is not None:
+                    markers.append((ax, exit_, f"p{dst_page}"))
+
+    return markers
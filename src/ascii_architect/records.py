@@ -0,0 +1,80 @@
+"""ASCII Architect - Registros compactos del Router
+Nodos, anchors, aristas y diagrama como clases con __slots__ (sin __dict__ por instancia).
+En grafos grandes los dict-de-dicts dominaban la memoria; aquí cada nodo es un objeto fijo
+y las polilíneas de las flechas se calculan bajo demanda a partir de los anchors.
+"""
+
+
+class NodeRecord:
+    __slots__ = ('label', 'shape', 'art', 'w', 'h', 'row', 'col', 'x', 'y')
+
+    def __init__(self, label: str, shape: str, art: str, w: int, h: int, row: int, col: int):
+        self.label = label
+        self.shape = shape
+        self.art = art      # Compartido entre nodos con la misma etiqueta y forma
+        self.w = w
+        self.h = h
+        self.row = row
+        self.col = col
+        self.x = 0
+        self.y = 0
+
+
+class Anchors:
+    """Puntos de conexión N, S, E, W guardados como enteros (las tuplas se crean al pedirlas)."""
+    __slots__ = ('x', 'y', 'cx', 'cy', 'right', 'bottom')
+
+    def __init__(self, x: int, y: int, w: int, h: int):
+        self.x = x
+        self.y = y
+        self.cx = x + w // 2
+        self.cy = y + h // 2
+        self.right = x + w - 1
+        self.bottom = y + h - 1
+
+    @property
+    def n(self): return (self.cx, self.y)
+
+    @property
+    def s(self): return (self.cx, self.bottom)
+
+    @property
+    def e(self): return (self.right, self.cy)
+
+    @property
+    def w(self): return (self.x, self.cy)
+
+
+class EdgeRecord:
+    """Flecha entre dos nodos (ids). kind: 'h' (derecha) o 'v' (abajo)."""
+    __slots__ = ('src', 'dst', 'kind', 'weight')
+
+    def __init__(self, src: int, dst: int, kind: str, weight: int = 1):
+        self.src = src
+        self.dst = dst
+        self.kind = kind
+        self.weight = weight
+
+
+class Diagram:
+    """Diagrama posicionado y listo para rasterizar (o paginar)."""
+    __slots__ = ('nodes', 'anchors', 'edges', 'width', 'height')
+
+    def __init__(self, nodes: list, anchors: list, edges: list, width: int, height: int):
+        self.nodes = nodes
+        self.anchors = anchors
+        self.edges = edges
+        self.width = width
+        self.height = height
+
+    def edge_path(self, edge: EdgeRecord) -> list:
+        """Polilínea ortogonal de la flecha; el primer punto es el anchor de salida."""
+        a, b = self.anchors[edge.src], self.anchors[edge.dst]
+        if edge.kind == 'h':
+            sx, y = a.e
+            return [(sx, y), (b.x - 1, y)]
+        sx, sy = a.s
+        ex, ey = b.n
+        mid_y = sy + (ey - sy) // 2
+        # Bajar -> Viajar X -> Bajar final
+        return [(sx, sy), (sx, mid_y), (ex, mid_y), (ex, ey)]
@@ -1,11 +1,39 @@
+from functools import lru_cache
+
 from ascii_architect.canvas import Canvas
 from ascii_architect.renderers import BoxRenderer, CylinderRenderer, SoftBoxRenderer, DiamondRenderer
+from ascii_architect.classifier import ShapeClassifier
+from ascii_architect.layout import grid_layout, compact_layout, extent
+from ascii_architect.records import NodeRecord, Anchors, EdgeRecord, Diagram
+from ascii_architect.graph import ScanGraph, grid_edges, find_cycles, collapse_cycles
+from ascii_architect.pager import DEFAULT_PAGE_SIZE, paginate, connector_markers
 # Nota: La importación de NeuralEngine es Lazy (dentro de __init__) para velocidad.
 
 class Router:
-    def __init__(self, use_neural_engine: bool = False):
+    # Separación entre nodos (layout clásico)
+    GAP_X = 6
+    GAP_Y = 4
+    # Separación mínima que respeta la pasada de compactación
+    MIN_GAP_X = 4
+    MIN_GAP_Y = 3
+    # Tratamiento de ciclos antes del layout
+    CYCLE_MODES = ("keep", "report", "collapse")
+    # Formas cacheadas como mucho (LRU): un Router reutilizado por un worker no crece sin límite
+    SHAPE_CACHE_SIZE = 4096
+
+    def __init__(self, use_neural_engine: bool = False, rules=None, compact: bool = False, cycles: str = "keep",
+                 shape_cache_size: int = SHAPE_CACHE_SIZE):
+        if cycles not in self.CYCLE_MODES:
+            raise ValueError(f"Modo de ciclos desconocido: '{cycles}' (usa {', '.join(self.CYCLE_MODES)})")
         self.use_neural_engine = use_neural_engine
+        self.compact = compact
+        self.cycles = cycles
+        self.last_compaction = None # Reporte de la última compactación (área ahorrada)
+        self.last_cycles = [] # Ciclos (SCCs) detectados en el último flujo
+        self.last_pages = None # Paginación del último render (si se pidió)
         self.neural_engine = None
+        # Tabla de reglas -> autómata compilado (None = reglas por defecto)
+        self.classifier = ShapeClassifier(rules)
         
         if self.use_neural_engine:
             try:
@@ -18,11 +46,15 @@ class Router:
                 self.use_neural_engine = False
 
         self.paper = Canvas(width=1, height=1)
+        # (etiqueta, forma) -> (art, w, h), compartido entre nodos repetidos
+        self._shape_cache = lru_cache(maxsize=shape_cache_size)(self._build_shape)
 
     def _get_node_shape(self, node_text: str, shape_type: str):
-        """Fabrica el ASCII para un nodo específico."""
+        """Fabrica el ASCII para un nodo específico. Devuelve (art, w, h), cacheado por etiqueta (LRU)."""
+        return self._shape_cache(node_text.strip(), shape_type)
+
+    def _build_shape(self, clean_text: str, shape_type: str):
         art = None
-        clean_text = node_text.strip()
 
         # 1. Intento con IA
         if self.use_neural_engine and self.neural_engine:
@@ -48,130 +80,218 @@ class Router:
         h = len(lines)
         w = max(len(l) for l in lines) if lines else 0
         
-        return {'art': art, 'w': w, 'h': h, 'type': shape_type}
-
-    def _get_anchors(self, x, y, w, h):
-        """Calcula puntos de conexión N, S, E, W."""
-        cx = x + w // 2
-        cy = y + h // 2
-        return {
-            'n': (cx, y), 
-            's': (cx, y + h - 1), 
-            'e': (x + w - 1, cy), 
-            'w': (x, cy)
-        }
-
-    def process(self, layout_str: str):
+        return art, w, h
+
+    def process(self, layout_str: str, compact: bool = None, page: int = None, page_size: tuple = None):
         """
-        [MAIN LOOP] Calcula el grid, estampa formas y dibuja flechas.
+        [MAIN LOOP] Calcula el grid, estampa formas, dibuja flechas e imprime.
         """
         mode = "NEURAL MODE" if self.use_neural_engine else "TEMPLATE MODE"
-        print(f"🔄 Processing Flow: {layout_str[:60]}... [{mode}]")
+        if isinstance(layout_str, ScanGraph):
+            print(f"🔄 Processing Graph: {layout_str.node_count} nodos, {len(layout_str)} aristas [{mode}]")
+        else:
+            print(f"🔄 Processing Flow: {layout_str[:60]}... [{mode}]")
+
+        diagram = self.render(layout_str, compact=compact, page=page, page_size=page_size)
+        if diagram is None: return
+
+        if self.last_cycles:
+            action = "condensados" if self.cycles == "collapse" else "detectados"
+            print(f"🔁 Ciclos {action}: {len(self.last_cycles)}")
+            for members in self.last_cycles:
+                print(f"   - {' <-> '.join(members)}")
+
+        if self.last_compaction:
+            stats = self.last_compaction
+            print(f"📐 Compactación: {stats['before'][0]}x{stats['before'][1]} -> "
+                  f"{stats['after'][0]}x{stats['after'][1]} "
+                  f"(área ahorrada: {stats['saved']} celdas, {stats['ratio']:.0%})")
+
+        if self.last_pages:
+            print(f"📄 Diagrama paginado: {self.last_pages.count} páginas "
+                  f"({self.last_pages.cols} x {self.last_pages.rows})")
+
+        # PRINT FINAL (IMPORTANTE)
+        print("\n" + "="*60)
+        print(diagram)
+        print("="*60 + "\n")
+        return diagram
+
+    def render(self, layout_str: str, compact: bool = None, page: int = None, page_size: tuple = None) -> str:
+        """
+        Calcula el grid, estampa formas y dibuja flechas. Devuelve el diagrama sin imprimirlo.
+
+        Con page / page_size se pagina el diagrama y SOLO se rasterizan las páginas pedidas
+        (page=None -> todas, una detrás de otra).
+        """
+        self.last_pages = None
+        diagram = self.layout(layout_str, compact=compact)
+        if diagram is None: return None
+
+        if page is None and page_size is None:
+            return self.rasterize(diagram).render()
+
+        self.last_pages = paginate(diagram, *(page_size or DEFAULT_PAGE_SIZE))
+        if page is not None:
+            return self.render_page(diagram, self.last_pages, page)
+
+        total = self.last_pages.count
+        return "\n\n".join(f"--- Página {n}/{total} ---\n" + self.render_page(diagram, self.last_pages, n)
+                            for n in range(1, total + 1))
+
+    def render_page(self, diagram: Diagram, pagination, number: int) -> str:
+        """Rasteriza una sola página y añade los marcadores de conexión fuera de página."""
+        x0, y0, w, h = pagination.rect(number)
+        self.rasterize(diagram, viewport=(x0, y0, w, h))
+        for x, y, text in connector_markers(diagram, pagination, number):
+            x = min(max(x, x0), x0 + w - len(text))
+            for i, ch in enumerate(text):
+                self.paper.put_char(x + i, y, ch)
+        return self.paper.render()
+
+    def layout(self, layout_str: str, compact: bool = None):
+        """
+        Parsea, clasifica, mide y posiciona. Devuelve un Diagram SIN rasterizar
+        (nodos, anchors y aristas como registros con __slots__).
+        layout_str: string de flujo 'A -> B ; C' o un ScanGraph (se usa sin re-parsear).
+        """
+        compact = self.compact if compact is None else compact
+        self.last_compaction = None
 
         # 1. Parsing Básico (Rows ; Cols ->)
-        rows = layout_str.split(';')
-        grid = [[node.strip() for node in r.split('->') if node.strip()] for r in rows]
+        weights = {}
+        if isinstance(layout_str, ScanGraph):
+            grid = layout_str.rows()
+            weights = layout_str.pair_weights() # Aristas agregadas (clustering): peso en la flecha
+        else:
+            rows = layout_str.split(';')
+            grid = [[node.strip() for node in r.split('->') if node.strip()] for r in rows]
         
-        if not grid: return
+        if not grid: return None
 
-        # 2. Calcular Dimensiones del Grid
-        num_rows = len(grid)
-        col_widths = {} # Ancho máximo por columna
-        row_heights = {} # Alto máximo por fila
-        
-        node_data_map = {} # Guardamos los objetos nodo generados
+        # 1b. Ciclos (Tarjan, lineal): reportar o condensar en nodos compuestos
+        self.last_cycles = []
+        if self.cycles == "collapse":
+            grid, self.last_cycles = collapse_cycles(grid)
+        elif self.cycles == "report":
+            self.last_cycles = find_cycles(grid_edges(grid))
 
-        # Pre-generar nodos para medir tamaños
+        # 2. Pre-generar nodos para medir tamaños (id = orden fila a fila)
+        nodes = []
+        node_rows = []
         for r_idx, row in enumerate(grid):
-            current_row_h = 0
+            node_row = []
             for c_idx, node_text in enumerate(row):
-                # Detectar tipo
-                u_text = node_text.upper()
-                stype = "BOX"
-                if any(k in u_text for k in ["DB", "SQL", "DATA"]): stype = "CYLINDER"
-                elif any(k in u_text for k in ["?", "IF", "DECISION"]): stype = "DIAMOND"
-                elif any(k in u_text for k in ["START", "END", "USER", "[DIR]"]): stype = "SOFTBOX"
+                # Detectar tipo (una sola pasada del clasificador, cacheada)
+                stype = self.classifier.classify(node_text)
                 
                 # Generar forma
-                node_obj = self._get_node_shape(node_text, stype)
-                node_data_map[(r_idx, c_idx)] = node_obj
-                
-                # Actualizar maximos
-                col_widths[c_idx] = max(col_widths.get(c_idx, 0), node_obj['w'])
-                current_row_h = max(current_row_h, node_obj['h'])
-            row_heights[r_idx] = current_row_h
+                art, w, h = self._get_node_shape(node_text, stype)
+                node = NodeRecord(node_text, stype, art, w, h, r_idx, c_idx)
+                nodes.append(node)
+                node_row.append(node)
+            node_rows.append(node_row)
 
         # 3. Calcular Coordenadas (X, Y) con Gaps
-        GAP_X = 6
-        GAP_Y = 4
-        
-        x_positions = {}
-        curr_x = 2
-        for c in sorted(col_widths.keys()):
-            x_positions[c] = curr_x
-            curr_x += col_widths[c] + GAP_X
-            
-        y_positions = {}
-        curr_y = 2
-        for r in sorted(row_heights.keys()):
-            y_positions[r] = curr_y
-            curr_y += row_heights[r] + GAP_Y
-
-        # 4. Canvas Final
-        self.paper = Canvas(curr_x + 5, curr_y + 5)
-
-        # 5. Estampar y Guardar Anchors
-        node_anchors = {}
-        
-        for (r, c), node in node_data_map.items():
-            # Centrado vertical en su fila
-            final_x = x_positions[c]
-            row_h = row_heights[r]
-            final_y = y_positions[r] + (row_h - node['h']) // 2
-            
-            self.paper.stamp(final_x, final_y, node['art'])
-            node_anchors[(r,c)] = self._get_anchors(final_x, final_y, node['w'], node['h'])
-
-        # 6. Rutear Flechas
-        for (r, c), anchors in node_anchors.items():
-            # Flecha Horizontal (Derecha)
-            if (r, c+1) in node_anchors:
-                target = node_anchors[(r, c+1)]
-                self._draw_h_arrow(anchors['e'], target['w'])
-            
-            # Flecha Vertical (Abajo)
-            # Solo si estamos en la ultima columna de la fila actual O explícito
-            # Simplificación: Conectar con el nodo directamente abajo si existe
-            if (r+1, c) in node_anchors:
-                target = node_anchors[(r+1, c)]
-                self._draw_v_arrow(anchors['s'], target['n'])
-
-        # 7. PRINT FINAL (IMPORTANTE)
-        print("\n" + "="*60)
-        print(self.paper.render())
-        print("="*60 + "\n")
+        width, height = grid_layout(node_rows, self.GAP_X, self.GAP_Y)
 
-    def _draw_h_arrow(self, start, end):
-        y = start[1]
-        for x in range(start[0] + 1, end[0]):
-            self.paper.put_char(x, y, "-")
-        self.paper.put_char(end[0]-1, y, ">")
+        if compact:
+            # Ambos layouts se miden igual (caja envolvente + margen), no con la holgura del canvas
+            g_width, g_height = extent(node_rows)
+            grid_area = g_width * g_height
+            c_width, c_height = compact_layout(node_rows, self.MIN_GAP_X, self.MIN_GAP_Y)
+            saved = grid_area - c_width * c_height
+            self.last_compaction = {
+                'before': (g_width, g_height),
+                'after': (c_width, c_height),
+                'saved': saved,
+                'ratio': saved / grid_area if grid_area else 0.0,
+            }
+            width, height = c_width, c_height
 
-    def _draw_v_arrow(self, start, end):
-        sx, sy = start
-        ex, ey = end
-        mid_y = sy + (ey - sy) // 2
-        
-        # Bajar
-        for y in range(sy + 1, mid_y): self.paper.put_char(sx, y, "|")
-        self.paper.put_char(sx, mid_y, "+")
-        
-        # Viajar X
-        step = 1 if ex > sx else -1
-        if sx != ex:
-            for x in range(sx + step, ex, step): self.paper.put_char(x, mid_y, "-")
-            self.paper.put_char(ex, mid_y, "+")
-            
-        # Bajar final
-        for y in range(mid_y + 1, ey): self.paper.put_char(ex, y, "|")
-        self.paper.put_char(ex, ey, "v")
\ No newline at end of file
+        # 4. Anchors
+        anchors = [Anchors(node.x, node.y, node.w, node.h) for node in nodes]
+
+        # 5. Rutear Flechas
+        edges = []
+        row_start = 0
+        for r, node_row in enumerate(node_rows):
+            next_start = row_start + len(node_row)
+            next_len = len(node_rows[r+1]) if r + 1 < len(node_rows) else 0
+            for c in range(len(node_row)):
+                node_id = row_start + c
+                # Flecha Horizontal (Derecha)
+                if c + 1 < len(node_row):
+                    weight = weights.get((node_row[c].label, node_row[c + 1].label), 1) if weights else 1
+                    edges.append(EdgeRecord(node_id, node_id + 1, 'h', weight))
+                
+                # Flecha Vertical (Abajo)
+                # Solo si estamos en la ultima columna de la fila actual O explícito
+                # Simplificación: Conectar con el nodo directamente abajo si existe
+                if c < next_len:
+                    edges.append(EdgeRecord(node_id, next_start + c, 'v'))
+            row_start = next_start
+
+        return Diagram(nodes, anchors, edges, width, height)
+
+    def rasterize(self, diagram: Diagram, viewport: tuple = None) -> Canvas:
+        """
+        Estampa nodos y flechas en un Canvas. Con viewport=(x0, y0, ancho, alto) solo se
+        dibuja lo que intersecta esa ventana.
+        """
+        x0, y0, w, h = viewport or (0, 0, diagram.width, diagram.height)
+        x1, y1 = x0 + w, y0 + h
+        self.paper = Canvas(w, h, origin_x=x0, origin_y=y0)
+
+        for node in diagram.nodes:
+            if node.x < x1 and node.x + node.w > x0 and node.y < y1 and node.y + node.h > y0:
+                self.paper.stamp(node.x, node.y, node.art)
+
+        for edge in diagram.edges:
+            points = diagram.edge_path(edge)
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            if min(xs) < x1 and max(xs) >= x0 and min(ys) < y1 and max(ys) >= y0:
+                self._draw_path(points)
+                if edge.weight > 1:
+                    self._draw_weight(points, edge.weight)
+
+        return self.paper
+
+    def _draw_weight(self, points, weight: int):
+        """Escribe el peso de una arista agregada en medio del tramo horizontal ('--12->'), si cabe."""
+        (sx, y), (ex, _) = points[0], points[-1]
+        text = str(weight)
+        room = ex - sx - 1
+        if len(text) + 2 > room:
+            return
+        start = sx + 1 + (room - len(text)) // 2
+        for i, ch in enumerate(text):
+            self.paper.put_char(start + i, y, ch)
+
+    def _draw_path(self, points):
+        """
+        Dibuja una flecha ortogonal: '-' y '|' en los tramos, '+' en los codos y la punta
+        ('>' o 'v') en el último punto. Los tramos se recortan a la ventana del Canvas.
+        """
+        paper = self.paper
+        lo_x, hi_x = paper.origin_x, paper.origin_x + paper.width
+        lo_y, hi_y = paper.origin_y, paper.origin_y + paper.height
+
+        for (ax, ay), (bx, by) in zip(points, points[1:]):
+            if ay == by and ax != bx:
+                step = 1 if bx > ax else -1
+                a, b = ax + step, bx
+                if step > 0:
+                    rng = range(max(a, lo_x), min(b, hi_x))
+                else:
+                    rng = range(min(a, hi_x - 1), max(b, lo_x - 1), -1)
+                for x in rng: paper.put_char(x, ay, "-")
+            elif ax == bx and ay != by:
+                for y in range(max(ay + 1, lo_y), min(by, hi_y)): paper.put_char(ax, y, "|")
+
+        for x, y in points[1:-1]:
+            paper.put_char(x, y, "+")
+
+        (px, py), (lx, ly) = points[-2], points[-1]
+        paper.put_char(lx, ly, ">" if ly == py and lx != px else "v")
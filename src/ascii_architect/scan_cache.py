@@ -0,0 +1,195 @@
+"""ASCII Architect - Caché de escaneo persistente
+Guarda en '<raíz>/.ascii-arch/scan.cache' (JSON) lo necesario para que un re-escaneo
+solo vuelva a leer lo que cambió:
+
+- Por directorio: (mtime_ns, archivos, subdirectorios). Si el mtime del directorio no
+  cambió, su listado es el mismo y no hace falta volver a listarlo.
+- Por archivo fuente (.py, .js, .go, .rs, ...): (mtime_ns, tamaño, hash del contenido, imports extraídos). Si el stat
+  coincide se reutilizan los imports; si no, se relee y solo se re-parsea cuando el hash
+  es distinto (un 'touch' no cuesta un parseo).
+
+Las entradas de archivos/directorios borrados o renombrados se purgan al guardar.
+Es opt-in ('ascii-arch scan --cache'): por defecto no se escribe nada en el proyecto.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from ascii_architect.languages import extract_imports
+
+CACHE_DIR = ".ascii-arch"
+CACHE_FILE = "scan.cache"
+CACHE_VERSION = 2     # 2: imports de try/except e if TYPE_CHECKING en modo cabecera
+
+# Granularidad de mtime más gruesa que toleramos (FAT: 2 s). Ver ScanCache._fresh.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _scan_file(path: str, known_hash: str = None, late: bool = False):
+    """
+    Stat + lectura + hash + extracción de un archivo.
+    Devuelve (mtime_ns, tamaño, hash, refs); refs es None si el hash coincide con known_hash.
+    """
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+    except OSError:
+        return None
+    digest = content_hash(data)
+    if digest == known_hash:
+        return st.st_mtime_ns, st.st_size, digest, None
+    return st.st_mtime_ns, st.st_size, digest, extract_imports(path, late=late, source=data)
+
+
+def read_changed_chunk(items: list, late: bool = False) -> list:
+    """Unidad de trabajo del pool: [(ruta, hash_conocido)] -> [_scan_file(...)]."""
+    return [_scan_file(path, known, late) for path, known in items]
+
+
+class ScanCache:
+    def __init__(self, root, mode: str = "header"):
+        """
+        Args:
+            root: raíz del escaneo (la caché vive en root/.ascii-arch/).
+            mode: modo del extractor; si cambia, los imports guardados no valen.
+        """
+        self.root = Path(root)
+        self.path = self.root / CACHE_DIR / CACHE_FILE
+        self.mode = mode
+        self.dirs = {}      # rel_dir -> [mtime_ns, [archivos], [subdirs]]
+        self.files = {}     # rel_path -> [mtime_ns, tamaño, hash, [[modulo, [nombres], nivel]]]
+        self.started_at = time.time_ns()
+        self.prev_started_at = 0   # Inicio del escaneo que escribió la caché
+        self.changed = None   # Rutas que el watcher dio por cambiadas (None = verificar todo)
+        self.visited = set()
+        self.seen = set()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self, changed: set = None):
+        """
+        Prepara un nuevo escaneo reutilizando la caché en memoria (modo --watch).
+        changed: rutas absolutas que cambiaron desde el escaneo anterior; el resto se da
+        por bueno sin hacer stat.
+        """
+        self.prev_started_at = self.started_at
+        self.started_at = time.time_ns()
+        self.changed = changed
+        self.visited = set()
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+
+    def trusted(self, path: str) -> bool:
+        """True si el watcher garantiza que path no cambió (no hace falta ni el stat)."""
+        return self.changed is not None and path not in self.changed
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return self
+        self.dirs = data.get("dirs", {})
+        self.prev_started_at = data.get("started_at", 0)
+        # Los listados no dependen del modo del extractor; los imports sí
+        if data.get("mode") == self.mode:
+            self.files = data.get("files", {})
+        else:
+            self.dirty = True
+        return self
+
+    def _fresh(self, cached_mtime: int, mtime_ns: int) -> bool:
+        """
+        Mismo mtime y claramente anterior al escaneo que lo guardó. Una edición en el mismo
+        'tick' que la lectura no movería el mtime: esas entradas ('racy') se verifican por hash.
+        """
+        return cached_mtime == mtime_ns and mtime_ns < self.prev_started_at - RACY_WINDOW_NS
+
+    def listing(self, rel_dir: str, mtime_ns: int = None):
+        """(archivos, subdirs) guardados si el directorio no cambió; si no, None. mtime_ns=None: de confianza."""
+        self.visited.add(rel_dir)
+        entry = self.dirs.get(rel_dir)
+        if entry is not None and (mtime_ns is None or self._fresh(entry[0], mtime_ns)):
+            return entry[1], entry[2]
+        return None
+
+    def store_listing(self, rel_dir: str, mtime_ns: int, files: list, subdirs: list):
+        self.dirs[rel_dir] = [mtime_ns, files, subdirs]
+        self.dirty = True
+
+    def lookup(self, rel_path: str, st=None):
+        """
+        Imports guardados si el stat coincide (st=None: de confianza); si no, None. Se
+        devuelven como listas [modulo, nombres, nivel] (mismo orden de campos que ImportRef).
+        """
+        self.seen.add(rel_path)
+        entry = self.files.get(rel_path)
+        if entry is not None and (st is None or (entry[1] == st.st_size and self._fresh(entry[0], st.st_mtime_ns))):
+            self.hits += 1
+            return entry[3]
+        return None
+
+    def known_hash(self, rel_path: str):
+        entry = self.files.get(rel_path)
+        return entry[2] if entry is not None else None
+
+    def store(self, rel_path: str, result) -> list:
+        """Guarda un resultado de _scan_file y devuelve sus imports como listas (los cacheados si refs es None)."""
+        mtime_ns, size, digest, refs = result
+        if refs is None:
+            refs = self.files[rel_path][3]
+        else:
+            self.misses += 1
+            refs = [[r.module, list(r.names), r.level] for r in refs]
+        self.files[rel_path] = [mtime_ns, size, digest, refs]
+        self.dirty = True
+        return refs
+
+    def prune(self):
+        """
+        Purga borrados y renombrados. Un directorio sigue vivo si se visitó en este escaneo
+        o si su padre está vivo y aún lo lista (p. ej. quedó fuera por --depth).
+        """
+        alive = set(self.visited)
+        for rel in sorted(self.dirs, key=lambda r: r.count("/") if r else -1):
+            if rel in alive:
+                continue
+            parent, _, name = rel.rpartition("/")
+            if parent in alive and parent in self.dirs and name in self.dirs[parent][2]:
+                alive.add(rel)
+
+        dirs = {rel: entry for rel, entry in self.dirs.items() if rel in alive}
+        # Archivos de directorios visitados: solo los vistos; de los no visitados: se conservan
+        files = {rel: entry for rel, entry in self.files.items()
+                 if rel in self.seen or (rel.rpartition("/")[0] in alive
+                                         and rel.rpartition("/")[0] not in self.visited)}
+        if len(dirs) != len(self.dirs) or len(files) != len(self.files):
+            self.dirs, self.files = dirs, files
+            self.dirty = True
+
+    def save(self):
+        """Escritura atómica (tmp + replace). Solo si algo cambió; sin permisos, se ignora."""
+        if not self.dirty:
+            return
+        data = {"version": CACHE_VERSION, "mode": self.mode, "started_at": self.started_at,
+                "dirs": self.dirs, "files": self.files}
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass
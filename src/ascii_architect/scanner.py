@@ -1,180 +1,286 @@
 import os
-import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from ascii_architect.docs_context import CONTEXT_FILES, DEFAULT_BUDGET, DocsContextLoader
+from ascii_architect.extractors import go_module_path
+from ascii_architect.graph import ScanGraph
+from ascii_architect.ignore import is_ignored, load_exclude, load_rules as load_ignore_rules
+from ascii_architect.languages import extract_imports, language_for
+from ascii_architect.module_index import ModuleIndex, package_prefix
+from ascii_architect.scan_cache import ScanCache, read_changed_chunk
+
+
+def _read_imports_chunk(paths: list, late: bool = False) -> list:
+    """Unidad de trabajo del pool (función de módulo para poder usar procesos)."""
+    return [extract_imports(path, late=late) for path in paths]
+
+
 class ProjectScanner:
     IGNORE_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build', '.idea', '.vscode', 'research', 'ascii_architect.egg-info'}
     
-    # Archivos que aportan CONTEXTO a la IA (si existen, los leemos)
-    CONTEXT_FILES = [
-        "README.md", 
-        "IA-context.md", 
-        "ROADMAP.txt", 
-        "ARCHITECTURE.md", 
-        "CONTRIBUTING.md",
-        "pyproject.toml"
-    ]
+    # Archivos que aportan CONTEXTO a la IA (si existen, los leemos; el orden es la prioridad)
+    CONTEXT_FILES = CONTEXT_FILES
     
-    def __init__(self):
-        self.allowed_files = set() 
+    POOLS = ("thread", "process")
+
+    def __init__(self, jobs: int = 1, pool: str = "thread", chunk_size: int = 64, late_imports: bool = False,
+                 cache: bool = False, gitignore: bool = True, memory_cache: bool = False):
+        """
+        Args:
+            jobs: workers para extraer imports (1 = serie, 0 = uno por CPU).
+            pool: 'thread' (I/O, discos de red) o 'process' (CPU).
+            chunk_size: archivos por unidad de trabajo.
+            late_imports: incluye imports condicionales / dentro de funciones (lee el archivo entero).
+            cache: usa la caché persistente (.ascii-arch/scan.cache) y solo re-parsea lo que cambió.
+            gitignore: respeta .gitignore / .ignore (y .git/info/exclude) al recorrer el árbol.
+            memory_cache: mantiene la caché en memoria entre escaneos aunque cache=False (modo
+                watch: cada frame solo re-analiza lo que cambió); sin cache no toca el disco.
+        """
+        if pool not in self.POOLS:
+            raise ValueError(f"Pool desconocido: '{pool}' (usa {', '.join(self.POOLS)})")
+        self.modules = ModuleIndex()
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.pool = pool
+        self.chunk_size = max(1, chunk_size)
+        self.late_imports = late_imports
+        self.use_cache = cache
+        self.memory_cache = memory_cache
+        self.gitignore = gitignore
+        self.last_cache_stats = None
+        self._cache = None
+        self._docs = None # DocsContextLoader (caché por huella entre escaneos de este scanner)
 
-    def _find_imports(self, file_path: Path) -> list[str]:
-        """Busca imports SOLO hacia archivos que están en la lista blanca."""
+    def _resolve_imports(self, language, refs: list, rel_path: str) -> list:
+        """
+        Se queda SOLO con los imports hacia archivos del escaneo (rutas relativas), vía el
+        índice de módulos. refs: ImportRef o [modulo, nombres, nivel] tal cual sale de la caché.
+        """
         detected = []
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            patterns = [r'^from\s+(\w+)\s+import', r'^import\s+(\w+)']
-            for line in content.splitlines():
-                for pat in patterns:
-                    match = re.search(pat, line.strip())
-                    if match:
-                        module = match.group(1)
-                        if module in self.allowed_files and module != file_path.stem:
-                            detected.append(module)
-        except:
-            pass
+        for ref in refs:
+            for target in language.resolve(self.modules, ref, rel_path):
+                if target not in detected:
+                    detected.append(target)
         return detected
 
-    def scan(self, root_path: str, max_depth: int = 1) -> str:
-        """Genera la topología (Grafo)."""
-        root = Path(root_path).resolve()
-        if not root.exists(): return "Error -> Path_Not_Found"
-        
-        self.allowed_files.clear()
-        connections = []
+    def _run_chunks(self, func, items: list) -> list:
+        """
+        Aplica func(chunk, late=...) a todos los items, en serie o repartidos en un pool.
+        Executor.map conserva el orden de los chunks: el resultado es idéntico al serial.
+        """
+        if self.jobs <= 1 or len(items) <= self.chunk_size:
+            return func(items, late=self.late_imports)
+
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        executor = ProcessPoolExecutor if self.pool == "process" else ThreadPoolExecutor
+        work = partial(func, late=self.late_imports)
+        results = []
+        with executor(max_workers=self.jobs) as ex:
+            for chunk_result in ex.map(work, chunks):
+                results.extend(chunk_result)
+        return results
 
-        # FASE 1: INDEXADO
-        for root_dir, dirs, files in os.walk(root):
-            rel_path = Path(root_dir).relative_to(root)
-            depth_level = len(rel_path.parts)
-            if str(rel_path) == ".": depth_level = 0
+    def _extract_imports(self, paths: list) -> list:
+        """Lee los imports de todos los archivos (sin caché)."""
+        return self._run_chunks(_read_imports_chunk, paths)
 
-            if depth_level >= max_depth:
-                del dirs[:] 
+    def _extract_cached(self, cache: ScanCache, files: list) -> list:
+        """
+        files: [(ruta_relativa, ruta)]. Un stat por archivo; solo los que cambiaron
+        se leen (y se re-parsean si el hash también cambió), en el mismo pool.
+        """
+        results = [None] * len(files)
+        changed = []
+        for i, (rel, path) in enumerate(files):
+            try:
+                st = None if cache.trusted(path) else os.stat(path)
+            except OSError:
+                results[i] = []
                 continue
-            
-            dirs[:] = [d for d in dirs if d not in self.IGNORE_DIRS and not d.startswith('.')]
-            
-            for f in files:
-                if f.endswith(".py"):
-                    self.allowed_files.add(f.replace(".py", ""))
-
-        # FASE 2: CONEXIÓN
-        for root_dir, dirs, files in os.walk(root):
-            rel_path = Path(root_dir).relative_to(root)
-            depth_level = len(rel_path.parts)
-            if str(rel_path) == ".": depth_level = 0
-
-            if depth_level >= max_depth:
-                del dirs[:]
+            refs = cache.lookup(rel, st)
+            if refs is None:
+                changed.append(i)
+            else:
+                results[i] = refs
+
+        items = [(files[i][1], cache.known_hash(files[i][0])) for i in changed]
+        for i, result in zip(changed, self._run_chunks(read_changed_chunk, items)):
+            results[i] = cache.store(files[i][0], result) if result is not None else []
+        return results
+
+    def _list_dir(self, dir_path: str, rel_dir: str, cache: ScanCache = None):
+        """
+        (archivos, subdirs) de un directorio (nombres; los symlinks a directorios no se
+        siguen). Con caché, un directorio cuyo mtime no cambió no se vuelve a listar.
+        """
+        if cache is not None:
+            mtime_ns = None if cache.trusted(dir_path) else os.stat(dir_path).st_mtime_ns
+            cached = cache.listing(rel_dir, mtime_ns)
+            if cached is not None:
+                return cached
+            if mtime_ns is None:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+
+        files = []
+        dirs = []
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry.name)
+                elif not entry.is_symlink():
+                    dirs.append(entry.name)
+
+        if cache is not None:
+            cache.store_listing(rel_dir, mtime_ns, files, dirs)
+        return files, dirs
+
+    def _walk(self, root: Path, max_depth: int, cache: ScanCache = None) -> list:
+        """
+        Recorrido ÚNICO con os.scandir (iterativo, top-down como os.walk).
+        La poda por profundidad, por IGNORE_DIRS y por .gitignore se hace ANTES de descender.
+
+        Devuelve [(ruta_dir, ruta_relativa, nombre_carpeta, [nombres de archivos])].
+        """
+        listing = []
+        if max_depth <= 0: return listing
+
+        exclude = load_exclude(str(root)) if self.gitignore else None
+        # Cada entrada lleva su cadena de reglas de ignore (de la raíz a la carpeta)
+        stack = [(str(root), "", 0, "ROOT", (exclude,) if exclude else ())]
+        while stack:
+            dir_path, rel_dir, depth, folder_name, chain = stack.pop()
+            try:
+                files, dirs = self._list_dir(dir_path, rel_dir, cache)
+            except OSError:
                 continue
-            
-            dirs[:] = [d for d in dirs if d not in self.IGNORE_DIRS and not d.startswith('.')]
-            folder_name = Path(root_dir).name
-            if str(rel_path) == ".": folder_name = "ROOT"
 
-            for file in files:
-                # 🐍 PYTHON
-                if file.endswith(".py"):
-                    full_path = Path(root_dir) / file
-                    deps = self._find_imports(full_path)
-                    if deps:
-                        for dep in deps: connections.append(f"{file} -> {dep}.py")
-                    else:
-                        connections.append(f"{folder_name} [DIR] -> {file}")
-                
-                # 🐳 DOCKER
-                elif file == "Dockerfile":
-                    # El Dockerfile construye la App
-                    connections.append(f"{folder_name} [DIR] -> Dockerfile")
-                elif file == "docker-compose.yml":
-                    # El compose orquesta todo
-                    connections.append(f"docker-compose.yml -> {folder_name} [App]")
+            if self.gitignore:
+                rules = load_ignore_rules(dir_path, rel_dir, files)
+                if rules is not None:
+                    chain = chain + (rules,)
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            if chain:
+                files = [f for f in files if not is_ignored(chain, prefix + f, False)]
 
-                # 🦀 RUST / JS / GO / ETC
-                elif file in ["Cargo.toml", "package.json", "go.mod", "pom.xml"]:
-                    # Archivos de definición de proyecto = Nodos Centrales
-                    connections.append(f"{folder_name} [DIR] -> {file}")
+            listing.append((dir_path, rel_dir, folder_name, files))
+            if depth + 1 >= max_depth:
+                continue
+            subdirs = [d for d in dirs if d not in self.IGNORE_DIRS and not d.startswith('.')
+                       and not (chain and is_ignored(chain, prefix + d, True))]
+            # Orden inverso en la pila = mismo orden de visita que os.walk
+            for name in reversed(subdirs):
+                stack.append((os.path.join(dir_path, name), prefix + name, depth + 1, name, chain))
 
-                # ☁️ INFRAESTRUCTURA
-                elif file.endswith(".tf"): # Terraform
-                    connections.append(f"Terraform -> {file}")
+        return listing
 
-                # 🗄️ DATOS (Archivos estáticos)
-                elif file.endswith((".sql", ".db", ".sqlite")):
-                    connections.append(f"{folder_name} [DIR] -> {file}")
+    def _open_cache(self, root: Path, changed: set = None) -> ScanCache:
+        """
+        La caché se carga del disco una vez y se reutiliza en memoria mientras la raíz y el
+        modo no cambien. Las pistas del watcher (changed) solo valen sobre la caché en memoria.
+        """
+        mode = "late" if self.late_imports else "header"
+        cache = self._cache
+        if cache is None or cache.root != root or cache.mode != mode:
+            cache = ScanCache(root, mode=mode)
+            if self.use_cache:
+                cache.load()
+        else:
+            cache.begin(changed)
+        self._cache = cache
+        return cache
 
-        if not connections: return ""
-        return " ; ".join(sorted(list(set(connections))))
+    def save_cache(self):
+        """Persiste la caché en memoria (el modo watch solo escribe al salir). Solo con cache=True."""
+        if self._cache is not None and self.use_cache:
+            self._cache.save()
 
-    def get_docs_content(self, root_path: str) -> str:
+    def scan(self, root_path: str, max_depth: int = 1, changed: set = None) -> ScanGraph:
         """
-        Lee el contenido de archivos de documentación clave para dar contexto a la IA.
+        Genera la topología como ScanGraph (vacío y falsy si no hay nada que conectar;
+        graph.to_topology() da el string clásico 'a -> b ; c -> d').
+        changed: rutas absolutas modificadas desde el escaneo anterior (las da el modo
+        watch); con caché, el resto del árbol no se vuelve a verificar.
         """
         root = Path(root_path).resolve()
-        docs_buffer = []
-        
-        print("📚 [Scanner] Buscando documentación para contexto...")
-        
-        # Buscamos en la raíz y en una carpeta docs/ si existe
-        search_paths = [root, root / "docs"]
+        if not root.exists(): return ScanGraph.from_topology("Error -> Path_Not_Found")
         
-        for base_path in search_paths:
-            if not base_path.exists(): continue
-            
-            for file_name in self.CONTEXT_FILES:
-                target_file = base_path / file_name
-                if target_file.exists():
-                    try:
-                        with open(target_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            # Limitamos el tamaño por seguridad (máx 3000 caracteres por archivo)
-                            if len(content) > 3000:
-                                content = content[:3000] + "\n... [TRUNCADO POR EXCESO DE LONGITUD]"
-                            
-                            docs_buffer.append(f"\n--- CONTENIDO DE {file_name} ---")
-                            docs_buffer.append(content)
-                            docs_buffer.append("--------------------------------\n")
-                    except Exception:
-                        pass # Si falla leer uno, seguimos
-        
-        return "\n".join(docs_buffer)
+        graph = ScanGraph()
 
+        cache = self._open_cache(root, changed) if self.use_cache or self.memory_cache else None
 
+        # FASE 1: INDEXADO (un solo recorrido del disco)
+        listing = self._walk(root, max_depth, cache)
+        source_files = [(f"{rel_dir}/{name}" if rel_dir else name, f"{dir_path}{os.sep}{name}")
+                        for dir_path, rel_dir, _, files in listing for name in files if language_for(name)]
+        self.modules = ModuleIndex(package_prefix(root))
+        for rel, _ in source_files:
+            self.modules.add(rel)
+        for dir_path, rel_dir, _, files in listing:
+            if "go.mod" in files:
+                self.modules.add_go_module(rel_dir, go_module_path(os.path.join(dir_path, "go.mod")))
 
-def scan(self, root_path: str, max_depth: int = 1) -> str:
-        # ... (código de inicio igual) ...
+        # FASE 2: EXTRACCIÓN DE IMPORTS (todos los lenguajes, en serie o en pool; con caché solo lo que cambió)
+        if cache is not None:
+            imports = iter(self._extract_cached(cache, source_files))
+            cache.prune()
+            if changed is None and self.use_cache:
+                cache.save()
+            self.last_cache_stats = {"hits": cache.hits, "parsed": cache.misses,
+                                     "checked": len(source_files) - cache.hits - cache.misses}
+        else:
+            imports = iter(self._extract_imports([path for _, path in source_files]))
 
+        # FASE 3: CONEXIÓN (desde memoria, mismo orden que la extracción)
+        label = self.modules.label
+        for _, rel_dir, folder_name, files in listing:
             for file in files:
-                # 🐍 PYTHON
-                if file.endswith(".py"):
-                    full_path = Path(root_dir) / file
-                    deps = self._find_imports(full_path)
+                language = language_for(file)
+                # 🐍 PYTHON / JS / TS / GO / RUST (imports reales)
+                if language:
+                    rel = f"{rel_dir}/{file}" if rel_dir else file
+                    deps = self._resolve_imports(language, next(imports), rel)
                     if deps:
-                        for dep in deps: connections.append(f"{file} -> {dep}.py")
+                        for dep in deps:
+                            graph.add_edge(label(rel), label(dep), "import", src_folder=rel_dir,
+                                           dst_folder=dep[:-1] if dep.endswith("/") else dep.rpartition("/")[0])
                     else:
-                        connections.append(f"{folder_name} [DIR] -> {file}")
+                        graph.add_edge(f"{folder_name} [DIR]", label(rel), "contains", src_folder=rel_dir, dst_folder=rel_dir)
                 
                 # 🐳 DOCKER
                 elif file == "Dockerfile":
                     # El Dockerfile construye la App
-                    connections.append(f"{folder_name} [DIR] -> Dockerfile")
+                    graph.add_edge(f"{folder_name} [DIR]", "Dockerfile", "builds", src_folder=rel_dir, dst_folder=rel_dir)
                 elif file == "docker-compose.yml":
                     # El compose orquesta todo
-                    connections.append(f"docker-compose.yml -> {folder_name} [App]")
+                    graph.add_edge("docker-compose.yml", f"{folder_name} [App]", "orchestrates", src_folder=rel_dir, dst_folder=rel_dir)
 
                 # 🦀 RUST / JS / GO / ETC
                 elif file in ["Cargo.toml", "package.json", "go.mod", "pom.xml"]:
                     # Archivos de definición de proyecto = Nodos Centrales
-                    connections.append(f"{folder_name} [DIR] -> {file}")
+                    graph.add_edge(f"{folder_name} [DIR]", file, "manifest", src_folder=rel_dir, dst_folder=rel_dir)
 
                 # ☁️ INFRAESTRUCTURA
                 elif file.endswith(".tf"): # Terraform
-                    connections.append(f"Terraform -> {file}")
+                    graph.add_edge("Terraform", file, "infra", dst_folder=rel_dir)
 
                 # 🗄️ DATOS (Archivos estáticos)
                 elif file.endswith((".sql", ".db", ".sqlite")):
-                    connections.append(f"{folder_name} [DIR] -> {file}")
+                    graph.add_edge(f"{folder_name} [DIR]", file, "data", src_folder=rel_dir, dst_folder=rel_dir)
+
+        return graph
+
+    def get_docs_content(self, root_path: str, budget: int = DEFAULT_BUDGET) -> str:
+        """
+        Lee el contenido de archivos de documentación clave para dar contexto a la IA
+        (raíz y docs/, con un presupuesto global de caracteres; ver docs_context.py).
+        """
+        print("📚 [Scanner] Buscando documentación para contexto...")
+        if self._docs is None or self._docs.budget != budget:
+            self._docs = DocsContextLoader(self.CONTEXT_FILES, budget=budget)
+        return self._docs.load(Path(root_path).resolve())
 
-        # ... (retorno igual) ...
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""ASCII Architect - Respuestas en streaming del Narrador
+Convierte la respuesta HTTP del webhook en fragmentos de texto a medida que llegan.
+
+Formatos (según Content-Type):
+- text/event-stream (SSE): líneas 'data: ...' por evento; '[DONE]' termina.
+- application/x-ndjson / application/jsonl: un JSON por línea.
+- application/json: respuesta única de siempre (claves 'text' / 'output').
+- Cualquier otro (text/plain chunked): los bytes tal cual, decodificados en UTF-8 sin
+  romper caracteres multibyte entre chunks.
+
+En SSE y NDJSON cada dato puede ser texto plano o un JSON con 'text', 'output',
+'content', 'delta', 'token' o el formato {'choices': [{'delta': {'content': ...}}]}.
+"""
+import codecs
+import json
+
+STREAM_ACCEPT = "text/event-stream, application/x-ndjson, application/json;q=0.9, */*;q=0.5"
+TEXT_KEYS = ("text", "output", "content", "delta", "token")
+
+
+def fragment_text(data) -> str:
+    """Texto de un dato del stream ('' si no trae texto)."""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        for key in TEXT_KEYS:
+            value = data.get(key)
+            if isinstance(value, str):
+                return value
+            if isinstance(value, dict):
+                return fragment_text(value)
+        choices = data.get("choices")
+        if isinstance(choices, list) and choices:
+            return fragment_text(choices[0])
+    return ""
+
+
+def _parse_data(raw: str) -> str:
+    try:
+        return fragment_text(json.loads(raw))
+    except ValueError:
+        return raw
+
+
+def _iter_lines(chunks):
+    """Líneas completas de un iterador de texto ('\\n', '\\r\\n' o '\\r')."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        lines = pending.splitlines(keepends=True)
+        # La última línea sin salto puede seguir en el próximo chunk (y un '\r' final, ser '\r\n')
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        for line in lines:
+            yield line.rstrip("\r\n")
+    if pending:
+        yield pending.rstrip("\r\n")
+
+
+def iter_sse(chunks):
+    """Eventos SSE -> fragmentos (un evento puede tener varias líneas 'data:')."""
+    data = []
+    for line in _iter_lines(chunks):
+        if not line:
+            if data:
+                payload = "\n".join(data)
+                data = []
+                if payload.strip() == "[DONE]":
+                    return
+                text = _parse_data(payload)
+                if text:
+                    yield text
+            continue
+        if line.startswith(":"):
+            continue   # Comentario / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data and "\n".join(data).strip() != "[DONE]":
+        text = _parse_data("\n".join(data))
+        if text:
+            yield text
+
+
+def iter_ndjson(chunks):
+    for line in _iter_lines(chunks):
+        if line.strip():
+            text = _parse_data(line)
+            if text:
+                yield text
+
+
+def _charset(content_type: str) -> str:
+    """charset explícito del Content-Type; si no, UTF-8 (requests asume latin-1 en text/*)."""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            return value.strip().strip('"')
+    return "utf-8"
+
+
+def _iter_decoded(response, chunk_size: int):
+    try:
+        decoder = codecs.getincrementaldecoder(_charset(response.headers.get("Content-Type", "")))(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_fragments(response, chunk_size: int = None):
+    """
+    Fragmentos de texto de una respuesta de requests abierta con stream=True.
+    chunk_size=None entrega cada chunk HTTP en cuanto llega (con un tamaño fijo, urllib3
+    espera a llenarlo).
+    """
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        try:
+            d = response.json()
+        except ValueError:
+            yield response.text
+            return
+        yield d.get('text', d.get('output', str(d))) if isinstance(d, dict) else str(d)
+        return
+
+    chunks = _iter_decoded(response, chunk_size)
+    if content_type == "text/event-stream":
+        yield from iter_sse(chunks)
+    elif content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+        yield from iter_ndjson(chunks)
+    else:
+        yield from chunks
@@ -0,0 +1,232 @@
+"""ASCII Architect - Transporte HTTP del Narrador
+Cliente para el webhook de n8n con:
+
+- Sesión persistente (keep-alive) con pool de conexiones: las llamadas seguidas no
+  repiten el handshake TCP.
+- Timeouts separados: conectar falla rápido (n8n caído); leer espera al LLM.
+- Reintentos acotados con backoff exponencial y jitter completo (uniform(0, base·2^n)),
+  solo ante errores transitorios: conexión, timeout, respuesta cortada y 429/502/503/504
+  (respeta Retry-After). Cualquier RequestException acaba en TransportError.
+- Circuit breaker: tras N fallos seguidos se deja de llamar durante `reset_after`
+  segundos (falla al instante); luego se deja pasar una prueba (half-open).
+- Métricas (peticiones, reintentos, errores, latencias p50/p95) en `metrics.snapshot()`.
+"""
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Fallos transitorios que se reintentan; el resto de RequestException (URL inválida...) no
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError)
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 45.0
+MAX_RETRY_AFTER = 30.0
+LATENCY_SAMPLES = 256
+
+
+class TransportError(Exception):
+    """La petición falló tras los reintentos. status: código HTTP (None si fue de conexión)."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(TransportError):
+    """El circuito está abierto: no se llamó al servidor."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"circuito abierto (reintenta en {retry_in:.0f}s)")
+        self.retry_in = retry_in
+
+
+class TransportMetrics:
+    """Contadores y latencias de las últimas peticiones (thread-safe)."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self._lock = threading.Lock()
+        self.requests = 0       # Llamadas a post()
+        self.attempts = 0       # Intentos HTTP reales (requests + reintentos)
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0       # Cortadas por el circuit breaker
+        self.circuit_opens = 0
+        self.errors = {}        # 'status:503' / 'ConnectTimeout' -> cantidad
+        self.latencies = deque(maxlen=samples)   # Segundos por llamada completa
+
+    def record(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_error(self, kind: str):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ordered = sorted(self.latencies)
+            errors = dict(self.errors)
+            counters = {name: getattr(self, name) for name in
+                        ("requests", "attempts", "retries", "successes", "failures", "rejected", "circuit_opens")}
+
+        def percentile(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1) if ordered else None
+
+        return dict(counters, errors=errors, latency_ms={"p50": percentile(0.5), "p95": percentile(0.95),
+                                                          "max": percentile(1.0)})
+
+
+class CircuitBreaker:
+    """closed -> (N fallos seguidos) -> open -> (reset_after s) -> half-open -> closed/open."""
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.clock() - self.opened_at >= self.reset_after else "open"
+
+    def before_call(self):
+        """Lanza CircuitOpenError si no se debe llamar; en half-open deja pasar una sola prueba."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = self.clock() - self.opened_at
+            if waited < self.reset_after or self._trial:
+                raise CircuitOpenError(max(0.0, self.reset_after - waited))
+            self._trial = True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> bool:
+        """Registra un fallo. True si este fallo abre el circuito."""
+        with self._lock:
+            self.failures += 1
+            reopen = self._trial
+            self._trial = False
+            if reopen or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = self.clock()
+                return True
+            return False
+
+
+class NarratorTransport:
+    def __init__(self, url: str, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, retries: int = 2, backoff: float = 0.5,
+                 max_backoff: float = 8.0, pool_size: int = 4, failure_threshold: int = 5,
+                 reset_after: float = 30.0, sleep=time.sleep, clock=time.monotonic):
+        """
+        Args:
+            url: endpoint del webhook.
+            connect_timeout / read_timeout: segundos para conectar / para recibir respuesta.
+            retries: reintentos como máximo (intentos = retries + 1).
+            backoff / max_backoff: base y techo del backoff exponencial (con jitter).
+            pool_size: conexiones keep-alive que se conservan.
+            failure_threshold / reset_after: fallos seguidos que abren el circuito y
+                segundos que permanece abierto.
+        """
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.clock = clock
+        self.breaker = CircuitBreaker(failure_threshold, reset_after, clock=clock)
+        self.metrics = TransportMetrics()
+        self.pool_size = pool_size   # Techo de peticiones simultáneas que reutilizan conexión
+
+        self.session = requests.Session()
+        # Los reintentos los hace post() (con jitter y métricas), no urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _delay(self, attempt: int, response=None) -> float:
+        """Jitter completo; Retry-After (en segundos) manda si el servidor lo envía."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), MAX_RETRY_AFTER)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def post(self, payload: dict, **kwargs) -> requests.Response:
+        """
+        POST JSON con reintentos. Devuelve la respuesta 2xx o lanza TransportError
+        (CircuitOpenError si el circuito está abierto).
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.metrics.record(rejected=1)
+            raise
+        self.metrics.record(requests=1)
+        started = self.clock()
+        error = None
+        succeeded = False
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.metrics.record(retries=1)
+                self.metrics.record(attempts=1)
+                response = None
+                try:
+                    response = self.session.post(self.url, json=payload, timeout=self.timeout, **kwargs)
+                except requests.RequestException as e:
+                    # Incluye respuestas cortadas o mal formadas (ChunkedEncodingError...)
+                    self.metrics.record_error(type(e).__name__)
+                    error = TransportError(str(e))
+                    if not isinstance(e, RETRY_EXCEPTIONS):
+                        break
+                else:
+                    if response.ok:
+                        succeeded = True
+                        return response
+                    self.metrics.record_error(f"status:{response.status_code}")
+                    error = TransportError(f"HTTP {response.status_code}", status=response.status_code)
+                    response.close()    # Con stream=True la conexión no vuelve al pool hasta cerrarla
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                if attempt < self.retries:
+                    self.sleep(self._delay(attempt, response))
+            raise error
+        finally:
+            # Pase lo que pase (incluso una excepción inesperada) el breaker se entera:
+            # si no, una prueba half-open sin resolver dejaría el circuito abierto para siempre
+            self.metrics.record_latency(self.clock() - started)
+            if succeeded:
+                self.metrics.record(successes=1)
+                self.breaker.success()
+            else:
+                self.metrics.record(failures=1)
+                if error is not None and error.status is not None and error.status < 500 \
+                        and error.status not in RETRY_STATUSES:
+                    self.breaker.success()      # 4xx: el servidor responde, el problema es la petición
+                elif self.breaker.failure():
+                    self.metrics.record(circuit_opens=1)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,274 @@
+"""ASCII Architect - Modo watch
+Observa el árbol (inotify vía ctypes en Linux; polling de stats en el resto) y redibuja
+el diagrama en vivo.
+
+- Los eventos se agrupan (debounce): un 'guardar' de un editor genera varios eventos
+  (truncate, write, rename) y solo provoca un redibujado.
+- En reposo no se consume CPU: inotify bloquea en select() sin timeout.
+- El watcher devuelve las rutas cambiadas; el scanner las usa para no volver a
+  verificar el resto del árbol (solo re-analiza lo que cambió).
+- FrameRenderer compara con el frame anterior y solo reescribe las filas distintas.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import struct
+import sys
+import time
+
+from ascii_architect.ignore import IGNORE_FILES
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_DEBOUNCE = 0.05      # Segundos sin eventos antes de redibujar
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _skip_hidden(name: str) -> bool:
+    """
+    Nombres ignorados (archivos y directorios): ocultos, incluida la caché .ascii-arch/.
+    Salvo .gitignore / .ignore: cambian qué se escanea, así que también redibujan.
+    """
+    return name.startswith('.') and name not in IGNORE_FILES
+
+
+class InotifyWatcher:
+    """Watcher recursivo con inotify (un watch por directorio, hasta max_depth niveles)."""
+
+    def __init__(self, root: str, max_depth: int = 1, skip=_skip_hidden, debounce: float = DEFAULT_DEBOUNCE):
+        name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(name or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify no disponible")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.max_depth = max(1, max_depth)
+        self.skip = skip
+        self.debounce = debounce
+        self.watches = {}   # wd -> (ruta_dir, profundidad)
+        self._add_tree(os.path.abspath(root), 0)
+
+    def _add_tree(self, root: str, depth: int):
+        stack = [(root, depth)]
+        while stack:
+            path, d = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.watches[wd] = (path, d)
+            if d + 1 >= self.max_depth:
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and not self.skip(entry.name):
+                            stack.append((entry.path, d + 1))
+            except OSError:
+                pass
+
+    def _read(self, changed: set) -> bool:
+        """Lee los eventos pendientes en changed. False si la cola del kernel se desbordó."""
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return True
+        complete = True
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                complete = False
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches:
+                continue
+            if name and self.skip(name):
+                continue
+            dir_path, depth = self.watches[wd]
+            changed.add(dir_path)
+            if not name:
+                continue
+            path = os.path.join(dir_path, name)
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                if depth + 1 < self.max_depth:
+                    self._add_tree(path, depth + 1)
+                # Un directorio que entra con contenido: su subárbol no es de fiar
+                if mask & IN_MOVED_TO:
+                    complete = False
+        return complete
+
+    def wait(self, timeout: float = None):
+        """
+        Bloquea hasta el primer evento y agrupa los siguientes hasta `debounce` segundos
+        de calma. Devuelve el set de rutas cambiadas, set() si venció el timeout, o None
+        si hay que verificarlo todo (overflow de la cola).
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        complete = self._read(changed)
+        while select.select([self.fd], [], [], self.debounce)[0]:
+            complete = self._read(changed) and complete
+        return changed if complete else None
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Alternativa portable: compara snapshots de (mtime_ns, tamaño) cada `interval` segundos."""
+
+    def __init__(self, root: str, max_depth: int = 1, skip=_skip_hidden, debounce: float = DEFAULT_DEBOUNCE,
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.max_depth = max(1, max_depth)
+        self.skip = skip
+        self.debounce = debounce
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self) -> dict:
+        state = {}
+        stack = [(self.root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if self.skip(entry.name):
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+                        if entry.is_dir(follow_symlinks=False) and depth + 1 < self.max_depth:
+                            stack.append((entry.path, depth + 1))
+            except OSError:
+                pass
+        return state
+
+    def _diff(self, changed: set) -> bool:
+        """Añade a changed lo que difiere del snapshot anterior. True si hubo diferencias."""
+        current = self._snapshot()
+        found = False
+        for path in current.keys() | self.snapshot.keys():
+            if current.get(path) != self.snapshot.get(path):
+                changed.add(path)
+                changed.add(os.path.dirname(path))
+                found = True
+        self.snapshot = current
+        return found
+
+    def wait(self, timeout: float = None):
+        """Misma interfaz que InotifyWatcher.wait."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not self._diff(changed):
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+        while True:
+            time.sleep(self.debounce)
+            if not self._diff(changed):
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root: str, max_depth: int = 1, skip=_skip_hidden, debounce: float = DEFAULT_DEBOUNCE,
+                 polling: bool = False):
+    """inotify si está disponible; si no (macOS, Windows, límite de watches), polling."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, max_depth=max_depth, skip=skip, debounce=debounce)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, max_depth=max_depth, skip=skip, debounce=debounce)
+
+
+class FrameRenderer:
+    """Dibuja frames completos en la terminal reescribiendo solo las filas que cambiaron."""
+
+    def __init__(self, stream=None, height: int = None):
+        self.stream = stream or sys.stdout
+        self.height = height
+        self.previous = None
+
+    def diff(self, text: str) -> str:
+        """Secuencia ANSI que transforma el frame anterior en `text`."""
+        height = self.height or shutil.get_terminal_size().lines
+        lines = text.split("\n")
+        if len(lines) > height - 1:
+            hidden = len(lines) - (height - 2)
+            lines = lines[:height - 2] + [f"... ({hidden} filas más; usa --page-size)"]
+
+        out = []
+        previous = self.previous
+        if previous is None:
+            # Primer frame: limpiar pantalla y ocultar el cursor
+            out.append("\x1b[?25l\x1b[2J")
+            previous = []
+        for i, line in enumerate(lines):
+            if i >= len(previous) or previous[i] != line:
+                out.append(f"\x1b[{i + 1};1H{line}\x1b[K")
+        for i in range(len(lines), len(previous)):
+            out.append(f"\x1b[{i + 1};1H\x1b[K")
+        out.append(f"\x1b[{len(lines) + 1};1H")
+        self.previous = lines
+        return "".join(out)
+
+    def draw(self, text: str):
+        self.stream.write(self.diff(text))
+        self.stream.flush()
+
+    def close(self):
+        self.stream.write("\x1b[?25h")
+        self.stream.flush()
+
+
+def watch(render, watcher, renderer: FrameRenderer, accept=None):
+    """
+    Bucle principal: render(cambios) -> texto del frame. cambios es None en el primer
+    frame (y tras un overflow); accept(cambios) filtra eventos irrelevantes.
+    Termina con Ctrl+C (KeyboardInterrupt, lo gestiona quien llama).
+    """
+    renderer.draw(render(None))
+    while True:
+        changes = watcher.wait()
+        if changes is not None and (not changes or (accept is not None and not accept(changes))):
+            continue
+        renderer.draw(render(changes))
@@ -0,0 +1,34 @@
+import json
+
+from ascii_architect.analysis import analyze, format_report
+from ascii_architect.graph import ScanGraph
+from ascii_architect.narrator import Narrator
+
+TOPOLOGY = ("cli.py -> router.py ; cli.py -> scanner.py ; router.py -> canvas.py ; scanner.py -> graph.py ; "
+            "router.py -> graph.py ; a.py -> b.py ; b.py -> a.py ; app [DIR] -> lonely.py ; "
+            "app [DIR] -> Dockerfile")
+
+
+def test_rankings_cycles_layers_and_orphans():
+    result = analyze(ScanGraph.from_topology(TOPOLOGY))
+    assert result["fan_in"][0] == {"node": "graph.py", "count": 2}
+    assert result["fan_out"][0] == {"node": "cli.py", "count": 2}
+    assert result["cycles"] == [["a.py", "b.py"]]
+    # graph/canvas (0) <- router/scanner (1) <- cli (2); el ciclo a <-> b comparte capa
+    assert result["layers"]["depth"] == 3
+    assert result["layers"]["longest_chain"] == ["cli.py", "router.py", "canvas.py"]
+    # La carpeta y el Dockerfile son estructura, no módulos
+    assert result["orphans"] == ["lonely.py"]
+    json.dumps(result)
+
+
+def test_hubs_stand_out_from_the_mean():
+    rows = [f"m{i}.py -> core.py" for i in range(12)] + [f"m{i}.py -> m{i + 1}.py" for i in range(11)]
+    result = analyze(ScanGraph.from_topology(" ; ".join(rows)))
+    assert [hub["node"] for hub in result["hubs"]] == ["core.py"]
+
+
+def test_local_explain_is_the_report():
+    text = Narrator().explain(TOPOLOGY, use_ai=False)
+    assert text == format_report(analyze(ScanGraph.from_topology(TOPOLOGY)))
+    assert "🔁 Ciclos de imports: 1" in text and "lonely.py" in text
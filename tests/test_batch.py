@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+from ascii_architect import batch
+from ascii_architect.batch import read_specs, render_spec, run_batch
+from ascii_architect.router import Router
+
+LINES = [
+    json.dumps({"id": "uno", "layout": "A -> B"}),
+    "",
+    "{roto",
+    json.dumps({"id": "ciclo", "layout": "A -> B ; B -> A", "cycles": "report"}),
+    json.dumps({"id": "sin-layout"}),
+    json.dumps({"id": "malo", "layout": "A -> B", "cycles": "nope"}),
+    json.dumps({"id": "paginado", "layout": " ; ".join(f"N{i} -> M{i}" for i in range(12)), "page_size": "40x10"}),
+]
+
+
+def test_bad_specs_do_not_abort_the_batch():
+    results = list(run_batch(read_specs(LINES), jobs=1))
+    assert [(r["id"], r["line"], r["ok"]) for r in results] == [
+        ("uno", 1, True), (None, 3, False), ("ciclo", 4, True), ("sin-layout", 5, False),
+        ("malo", 6, False), ("paginado", 7, True)]
+    assert results[0]["diagram"] == Router().render("A -> B")
+    assert results[1]["error"].startswith("ValueError: JSON inválido")
+    assert results[2]["cycles"] == [["A", "B"]]
+    assert results[5]["pages"] > 1
+
+
+def test_pool_matches_serial_in_input_order():
+    specs = [json.dumps({"id": i, "layout": f"S{i} -> T{i} ; T{i} -> U", "compact": i % 2 == 0}) for i in range(40)]
+    serial = list(run_batch(read_specs(specs + LINES), jobs=1))
+    assert list(run_batch(read_specs(specs + LINES), jobs=2, window=4)) == serial
+
+    completed = list(run_batch(read_specs(specs + LINES), jobs=2, order="completed"))
+    assert sorted(completed, key=lambda r: r["line"]) == serial
+
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError):
+        list(run_batch([], order="random"))
+
+
+def _render_or_die(line, spec, router=None):
+    if isinstance(spec, dict) and spec.get("die"):
+        os._exit(1)     # Simula un worker que se cae (segfault, OOM...)
+    return render_spec(line, spec, router)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="el worker hereda el monkeypatch con fork")
+@pytest.mark.parametrize("order", ["input", "completed"])
+def test_dead_worker_only_fails_the_specs_in_flight(monkeypatch, order):
+    monkeypatch.setattr(batch, "render_spec", _render_or_die)
+    specs = [json.dumps({"id": i, "layout": f"S{i} -> T{i}", "die": i == 5}) for i in range(20)]
+    results = list(run_batch(read_specs(specs), jobs=2, window=4, order=order))
+    assert sorted(r["line"] for r in results) == list(range(1, 21))
+    failed = [r for r in results if not r["ok"]]
+    assert 6 in [r["line"] for r in failed] and len(failed) <= 4    # Como mucho la ventana en vuelo
+    assert all("BrokenProcessPool" in r["error"] for r in failed)
+    assert [r["ok"] for r in results if r["line"] > 16] == [True] * 4   # El resto, en el pool nuevo
@@ -0,0 +1,75 @@
+import pytest
+
+from ascii_architect.classifier import ShapeClassifier, ShapeRule, load_rules
+
+
+def test_default_rules_match_legacy_keywords():
+    clf = ShapeClassifier()
+    assert clf.classify("Postgres DB") == "CYLINDER"
+    assert clf.classify("database.sql") == "CYLINDER"
+    assert clf.classify("Is valid?") == "DIAMOND"
+    assert clf.classify("src [DIR]") == "SOFTBOX"
+    assert clf.classify("user") == "SOFTBOX"
+    assert clf.classify("router.py") == "BOX"
+    # DATA (CYLINDER) gana a USER (SOFTBOX) aunque aparezca después
+    assert clf.classify("USER_DATA") == "CYLINDER"
+
+
+def test_priority_and_kinds():
+    rules = [
+        ShapeRule("suffix", "_repo.py", "CYLINDER", 50),
+        ShapeRule("extension", "yml", "SOFTBOX", 40),
+        ShapeRule("regex", r"^check_\w+", "DIAMOND", 60),
+        ShapeRule("substring", "repo", "BOX", 10),
+    ]
+    clf = ShapeClassifier(rules)
+    assert clf.classify("user_repo.py") == "CYLINDER"
+    assert clf.classify("user_repo.pyc") == "BOX"       # suffix solo al final
+    assert clf.classify("docker-compose.yml") == "SOFTBOX"
+    assert clf.classify("check_repo.py") == "DIAMOND"   # regex con mayor prioridad
+    assert clf.classify("main.py") == "BOX"             # default
+
+
+def test_overlapping_patterns_use_fail_links():
+    clf = ShapeClassifier([ShapeRule("substring", "abcd", "BOX", 1),
+                           ShapeRule("substring", "bce", "DIAMOND", 5)], default="SOFTBOX")
+    assert clf.classify("xabcex") == "DIAMOND"
+    assert clf.classify("abcd") == "BOX"
+    assert clf.classify("abc") == "SOFTBOX"
+
+
+def test_regex_rules_with_groups_keep_their_meaning():
+    rules = [
+        ShapeRule("regex", r"^check_\w+", "DIAMOND", 60),
+        ShapeRule("regex", r"(\w)\1", "CYLINDER", 50),           # Letra repetida (backreference)
+        ShapeRule("regex", r"(?P<v>v\d)_(?P=v)", "SOFTBOX", 40),
+        ShapeRule("regex", r"(?s)^start.end$", "SOFTBOX", 30),
+        ShapeRule("regex", r"_svc$", "BOX", 20),
+    ]
+    clf = ShapeClassifier(rules, default="DIAMOND")
+    assert clf.classify("check_x") == "DIAMOND"
+    assert clf.classify("feed") == "CYLINDER"
+    assert clf.classify("abc") == "DIAMOND"          # \1 no apunta al grupo de otra regla
+    assert clf.classify("api_v1_v1") == "SOFTBOX"
+    assert clf.classify("START-END") == "SOFTBOX"    # La regla conserva IGNORECASE
+    assert clf.classify("auth_svc") == "BOX"
+    with pytest.raises(ValueError):
+        ShapeClassifier([ShapeRule("regex", r"(a", "BOX")])
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text('{"defaults": false, "rules": [{"kind": "extension", "pattern": ".proto", "shape": "diamond"}]}')
+    clf = ShapeClassifier(load_rules(str(path)))
+    assert clf.classify("api.proto") == "DIAMOND"
+    assert clf.classify("Postgres DB") == "BOX"
+
+
+def test_user_rules_without_priority_beat_the_defaults(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text('[{"kind": "suffix", "pattern": "DB", "shape": "diamond"},'
+                    ' {"kind": "substring", "pattern": "USER", "shape": "cylinder", "priority": 5}]')
+    clf = ShapeClassifier(load_rules(str(path)))
+    assert clf.classify("Postgres DB") == "DIAMOND"     # La de fábrica (DB, 30) también acierta
+    assert clf.classify("user store") == "SOFTBOX"      # Prioridad explícita 5 < 10 de fábrica
+    assert clf.classify("Redis DATA") == "CYLINDER"
@@ -0,0 +1,70 @@
+from ascii_architect.clustering import cluster
+from ascii_architect.graph import ScanGraph
+from ascii_architect.router import Router
+
+
+def _package_graph():
+    # Dos paquetes (api/, core/) más main.py en la raíz
+    graph = ScanGraph()
+    for i in range(4):
+        graph.add_edge(f"h{i}.py", f"s{i}.py", src_folder="api/handlers", dst_folder="api")
+        graph.add_edge(f"h{i}.py", f"m{i}.py", src_folder="api/handlers", dst_folder="core")
+        graph.add_edge(f"m{i}.py", f"m{(i + 1) % 4}.py", src_folder="core", dst_folder="core")
+    graph.add_edge("main.py", "h0.py", src_folder="", dst_folder="api/handlers")
+    return graph
+
+
+def _ring_of_cliques():
+    graph = ScanGraph()
+    for c in range(3):
+        members = [f"c{c}_{i}.py" for i in range(4)]
+        for a in members:
+            for b in members:
+                if a < b:
+                    graph.add_edge(a, b)
+        graph.add_edge(members[0], f"c{(c + 1) % 3}_0.py")
+    return graph
+
+
+def test_small_graph_is_returned_unchanged():
+    graph = _package_graph()
+    same, groups = cluster(graph, max_nodes=100)
+    assert same is graph and groups == []
+
+
+def test_folder_clusters_respect_budget_and_sum_edges():
+    graph = _package_graph()
+    clustered, groups = cluster(graph, max_nodes=4, method="folder")
+    assert clustered.node_count <= 4
+    assert ("core/* [4]", 4) in groups
+    assert clustered.pair_weights()[("api/handlers/* [4]", "core/* [4]")] == 4
+    assert ["main.py", "api/handlers/* [4]"] in clustered.rows()
+
+
+def test_partial_split_of_a_flat_folder_keeps_the_hubs():
+    graph = ScanGraph()
+    for i in range(8):
+        graph.add_edge("pkg [DIR]", f"pkg/leaf{i}.py", "contains", src_folder="pkg", dst_folder="pkg")
+    for hub in ("pkg/scanner.py", "pkg/narrator.py"):
+        graph.add_edge("pkg [DIR]", hub, "contains", src_folder="pkg", dst_folder="pkg")
+        for i in range(3):
+            graph.add_edge(hub, f"pkg/leaf{i}.py", src_folder="pkg", dst_folder="pkg")
+    clustered, groups = cluster(graph, max_nodes=5, method="folder")
+    labels = set(clustered.labels)
+    assert {"pkg/scanner.py", "pkg/narrator.py"} <= labels
+    # Solo archivos directos de la carpeta: '*', no '**'
+    assert any(label.startswith("pkg/* [") for label, _ in groups)
+    assert not any("**" in label for label, _ in groups)
+
+
+def test_community_clusters_find_cliques():
+    clustered, groups = cluster(_ring_of_cliques(), max_nodes=3, method="community")
+    assert sorted(size for _, size in groups) == [4, 4, 4]
+    assert len(clustered) == 3
+    assert set(clustered.weights) == {1}
+
+
+def test_router_labels_aggregated_edges():
+    clustered, _ = cluster(_package_graph(), max_nodes=4)
+    drawing = Router().render(clustered)
+    assert "-4-" in drawing
@@ -0,0 +1,57 @@
+from ascii_architect.compact_topology import compact_topology, encode, short_id
+from ascii_architect.graph import ScanGraph
+
+
+def _tree(folders: int, files: int) -> ScanGraph:
+    graph = ScanGraph()
+    for f in range(folders):
+        folder = f"pkg/mod{f}"
+        for i in range(files):
+            graph.add_edge(f"mod{f} [DIR]", f"{folder}/file{i}.py", "contains", src_folder=folder, dst_folder=folder)
+    # Solo mod0 importa de verdad: es la carpeta importante
+    graph.add_edge("pkg/mod0/file0.py", "pkg/mod0/file1.py", "import", src_folder="pkg/mod0", dst_folder="pkg/mod0")
+    return graph
+
+
+def test_short_ids():
+    assert [short_id(n) for n in (0, 9, 10, 35, 36, 1295, 1296)] == ["0", "9", "a", "z", "10", "zz", "100"]
+
+
+def test_names_are_interned_and_containment_summarized():
+    graph = ScanGraph.from_topology("app [DIR] -> util.py ; main.py -> util.py ; main.py -> db.py")
+    text = encode(graph)
+    lines = text.splitlines()
+    assert "[DIR]" not in text
+    # util.py está en app: la tabla lo dice, la arista 'contains' sobra
+    assert lines[1:3] == ["@ROOT: 0=db.py 1=main.py", "@app: 2=util.py"]
+    assert "import: 1>2,0" in lines
+    assert lines[-1].startswith("contains: 1 ")
+
+
+def test_files_in_several_folders_keep_their_contains_edges():
+    graph = ScanGraph.from_topology("api [DIR] -> main.py ; web [DIR] -> main.py ; api [DIR] -> db.py")
+    lines = encode(graph).splitlines()
+    assert lines[1:] == [
+        "@ROOT: 0=main.py",
+        "@api: 1=api [DIR] 2=db.py",
+        "@web: 3=web [DIR]",
+        "contains: 1>0 3>0",
+        "contains: 1 implícitas (cada archivo está listado en su carpeta)",
+    ]
+
+
+def test_budget_summarizes_least_important_folders_first():
+    graph = _tree(folders=20, files=30)
+    full, report = compact_topology(graph, budget=0)
+    assert report["compact"] == len(full) < report["raw"] // 2
+
+    text, report = compact_topology(graph, budget=1500)
+    assert len(text) <= 1500 and not report["truncated"]
+    assert "pkg/mod0" not in report["summarized"] and "pkg/mod19" in report["summarized"]
+    assert "@pkg/mod19: " in text and "** [30]" in text
+    assert "file1.py" in text    # mod0 sigue detallada
+
+
+def test_truncates_as_last_resort():
+    text, report = compact_topology(_tree(folders=5, files=5), budget=120)
+    assert len(text) <= 120 and report["truncated"] and "RECORTADO" in text
@@ -0,0 +1,43 @@
+import os
+
+from ascii_architect import docs_context
+from ascii_architect.docs_context import DocsContextLoader, read_prefix
+
+
+def test_read_prefix_only_reads_what_fits(tmp_path):
+    big = tmp_path / "README.md"
+    big.write_text("x" * 100_000 + "\r\n")
+    text, truncated = read_prefix(str(big), 10)
+    assert text == "x" * 10 and truncated
+    small = tmp_path / "a.md"
+    small.write_bytes(b"uno\r\ndos\r\n")
+    assert read_prefix(str(small), 100) == ("uno\ndos\n", False)
+
+
+def test_budget_is_shared_by_priority(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "README.md").write_text("r" * 50)
+    (tmp_path / "ROADMAP.txt").write_text("m" * 50)
+    (tmp_path / "docs" / "README.md").write_text("d" * 50)
+    loader = DocsContextLoader(budget=80, per_file=1000)
+    text = loader.load(tmp_path)
+    # README de la raíz entero, ROADMAP recortado a lo que queda, docs/ ya no entra
+    assert text.index("CONTENIDO DE README.md") < text.index("CONTENIDO DE ROADMAP.txt")
+    assert "r" * 50 in text and "m" * 30 + "\n... [TRUNCADO" in text
+    assert "d" * 10 not in text
+
+
+def test_unchanged_files_come_from_cache(tmp_path, monkeypatch):
+    readme = tmp_path / "README.md"
+    readme.write_text("hola")
+    loader = DocsContextLoader()
+    first = loader.load(tmp_path)
+
+    calls = []
+    monkeypatch.setattr(docs_context, "read_prefix", lambda *args: calls.append(args))
+    assert loader.load(tmp_path) == first and calls == []
+
+    readme.write_text("adiós")
+    os.utime(readme, ns=(0, 10**9))
+    monkeypatch.undo()
+    assert "adiós" in loader.load(tmp_path)
@@ -0,0 +1,110 @@
+from ascii_architect.extractors import (ImportRef, extract_go_imports, extract_js_imports, extract_python_imports,
+                                        extract_rust_imports)
+
+SOURCE = '''"""Docstring.
+
+import fake_in_docstring
+"""
+from __future__ import annotations
+import os, sys as system
+import a.b.c as abc
+from pkg.sub import (
+    first,
+    second as alias,
+)
+from . import sibling
+from ..parent.mod import thing
+x = "import not_an_import"
+try:
+    import optional_dep
+except ImportError:
+    optional_dep = None
+
+def f():
+    import late_inside
+
+
+import after_def
+'''
+
+
+def test_header_mode_stops_at_first_def(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE)
+    refs = extract_python_imports(path)
+    assert refs == [
+        ImportRef("__future__", ("annotations",)),
+        ImportRef("os"),
+        ImportRef("sys"),
+        ImportRef("a.b.c"),
+        ImportRef("pkg.sub", ("first", "second")),
+        ImportRef("", ("sibling",), 1),
+        ImportRef("parent.mod", ("thing",), 2),
+        ImportRef("optional_dep"),
+    ]
+
+
+def test_header_mode_keeps_optional_and_type_checking_imports(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(
+        "try:\n    from pkg.router import Router\nexcept ImportError:\n    from router import Router\n"
+        "else:\n    import extra\n"
+        "if TYPE_CHECKING:\n    import typing_only\n"
+        "if DEBUG:\n    import debug_only\nelse:\n    import not_debug\n"
+        "try: import one_liner\nexcept ImportError: pass\n"
+        "for name in ():\n    try:\n        import in_loop\n    except ImportError:\n        pass\n"
+        "def f():\n    try:\n        import in_function\n    except ImportError:\n        pass\n"
+    )
+    modules = [ref.module for ref in extract_python_imports(path)]
+    assert modules == ["pkg.router", "router", "extra", "typing_only", "one_liner"]
+
+
+def test_late_mode_includes_conditional_and_late_imports(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE + "if TYPE_CHECKING: import typing_only\n")
+    modules = [ref.module for ref in extract_python_imports(path, late=True)]
+    assert modules[-4:] == ["optional_dep", "late_inside", "after_def", "typing_only"]
+    assert "fake_in_docstring" not in modules and "not_an_import" not in modules
+
+
+def test_broken_file_returns_partial_result(tmp_path):
+    path = tmp_path / "broken.py"
+    path.write_text("import ok\nx = (\n")
+    assert extract_python_imports(path) == [ImportRef("ok")]
+
+
+def test_js_imports_skip_comments_and_strings():
+    source = b"""// import "nope"
+import React, { useState } from "react";
+import {
+  a as b,
+} from './utils';
+export * from "../lib/index.js";
+/* require('no') */
+const y = require('./y');
+const lazy = await import("./lazy");
+const s = "import q from 'q'";
+"""
+    assert [r.module for r in extract_js_imports(None, source=source)] == [
+        "react", "./utils", "../lib/index.js", "./y", "./lazy"]
+
+
+def test_go_imports_stop_at_first_declaration():
+    source = b'package main\n\nimport "fmt"\nimport (\n  api "acme.dev/app/api" // x\n  _ "acme.dev/app/db"\n)\n\nfunc main() {}\nimport "late"\n'
+    assert [r.module for r in extract_go_imports(None, source=source)] == [
+        "fmt", "acme.dev/app/api", "acme.dev/app/db"]
+
+
+def test_rust_mod_and_use_trees():
+    source = b"""mod parser;
+pub(crate) mod lexer;
+mod inline { fn x() {} }
+use crate::parser::{Parser, ast::{self, Node}};
+use super::util as u;
+#[cfg(test)]
+mod tests;
+fn main() { let s = "use fake::x;"; }
+"""
+    assert [r.module for r in extract_rust_imports(None, source=source)] == [
+        "self::parser", "self::lexer", "crate::parser::Parser", "crate::parser::ast",
+        "crate::parser::ast::Node", "super::util", "self::tests"]
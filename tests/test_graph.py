@@ -0,0 +1,57 @@
+from ascii_architect.graph import ScanGraph, collapse_cycles, find_cycles, tarjan_scc
+from ascii_architect.router import Router
+
+
+def test_tarjan_finds_components():
+    # 0 <-> 1, 2 -> 3 -> 4 -> 2, 5 aislado
+    adjacency = [[1], [0, 2], [3], [4], [2], []]
+    components = sorted(sorted(c) for c in tarjan_scc(adjacency))
+    assert components == [[0, 1], [2, 3, 4], [5]]
+
+
+def test_tarjan_is_iterative_on_long_chains():
+    n = 100_000
+    adjacency = [[i + 1] for i in range(n - 1)] + [[0]]
+    components = tarjan_scc(adjacency)
+    assert len(components) == 1 and len(components[0]) == n
+
+
+def test_find_cycles_reports_import_loops():
+    edges = [("a.py", "b.py"), ("b.py", "a.py"), ("c.py", "c.py"), ("c.py", "d.py")]
+    assert find_cycles(edges) == [["a.py", "b.py"], ["c.py"]]
+
+
+def test_collapse_cycles_rewrites_grid():
+    grid = [["a.py", "b.py"], ["b.py", "a.py"], ["main.py", "a.py"]]
+    new_grid, cycles = collapse_cycles(grid)
+    assert cycles == [["a.py", "b.py"]]
+    assert new_grid == [["main.py", "a.py + b.py [CYCLE]"]]
+
+
+def test_scan_graph_interns_labels_and_serializes():
+    graph = ScanGraph()
+    graph.add_edge("pkg [DIR]", "b.py", "contains")
+    graph.add_edge("a.py", "b.py", "import")
+    graph.add_edge("a.py", "b.py", "import")
+    assert len(graph) == 2 and graph.node_count == 3
+    assert graph.labels.count("b.py") == 1
+    text = graph.to_topology()
+    assert text == "a.py -> b.py ; pkg [DIR] -> b.py"
+    again = ScanGraph.from_topology(text)
+    assert again.to_topology() == text
+    assert sorted(again.edges()) == [("a.py", "b.py", "import"), ("pkg [DIR]", "b.py", "contains")]
+
+
+def test_sorted_edges_order_is_cached_until_the_next_edge():
+    graph = ScanGraph.from_topology("b.py -> c.py ; a.py -> c.py")
+    first = graph.sorted_edges()
+    assert first == [("a.py", "c.py", "import"), ("b.py", "c.py", "import")]
+    assert graph.sorted_edges() == first and graph._order is not None
+    graph.add_edge("a b.py", "a.py")
+    assert graph.to_topology() == "a b.py -> a.py ; a.py -> c.py ; b.py -> c.py"
+
+
+def test_router_draws_scan_graph_like_its_topology():
+    graph = ScanGraph.from_topology("ROOT [DIR] -> main.py ; main.py -> db.sql ; Terraform -> infra.tf")
+    router = Router()
+    assert router.render(graph) == router.render(graph.to_topology())
@@ -0,0 +1,119 @@
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from http.server import HTTPServer
+from pathlib import Path
+
+import pytest
+
+from ascii_architect import http_service
+from ascii_architect.http_service import RenderHandler, RenderService, SharedMetrics, flow_nodes
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "main.py").write_text("import util\n")
+    (tmp_path / "app" / "util.py").write_text("x = 1\n")
+    server = HTTPServer(("127.0.0.1", 0), RenderHandler)
+    server.service = RenderService(tmp_path, max_body=2048)
+    server.metrics = SharedMetrics(1)
+    server.slot = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _call(port, method, path, body=None, content_type="application/json"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        data = body if isinstance(body, (str, bytes)) or body is None else json.dumps(body)
+        conn.request(method, path, body=data, headers={"Content-Type": content_type})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_flow_endpoint_and_limits(service):
+    port = service.server_port
+    status, body = _call(port, "POST", "/flow", {"id": "x", "layout": "A -> B", "cycles": "report"})
+    assert status == 200 and body["ok"] and "A" in body["diagram"] and body["id"] == "x"
+    status, body = _call(port, "POST", "/flow", "A -> B", content_type="text/plain")
+    assert status == 200 and body["ok"]
+
+    assert _call(port, "POST", "/flow", "{roto")[0] == 400
+    assert _call(port, "POST", "/flow", {"layout": "A -> B", "cycles": "nope"})[0] == 400
+    assert _call(port, "POST", "/flow", {"layout": "x" * 4096})[0] == 413
+    assert _call(port, "GET", "/flow")[0] == 405
+    assert _call(port, "GET", "/nope")[0] == 404
+
+    status, metrics = _call(port, "GET", "/metrics")
+    assert metrics["requests"] == 7 and metrics["errors"] == 5 and metrics["endpoints"]["/flow"] == 6
+    assert metrics["latency_ms"]["p50"] is not None
+
+
+def test_flow_node_limit_under_the_body_limit(service, monkeypatch):
+    monkeypatch.setattr(http_service, "MAX_FLOW_NODES", 10)
+    port = service.server_port
+    layout = " -> ".join(f"N{i}" for i in range(11))       # 11 nodos, muy por debajo de max_body
+    status, body = _call(port, "POST", "/flow", {"layout": layout})
+    assert status == 413 and "10 nodos" in body["error"]
+    # Se cuentan nodos, no separadores: filas vacías y flechas sueltas no suman
+    assert flow_nodes("A -> B ; ; ; -> ; C") == 3
+    assert _call(port, "POST", "/flow", {"layout": "A -> B" + " ;" * 20})[0] == 200
+
+
+def test_scan_stays_inside_root(service):
+    port = service.server_port
+    status, body = _call(port, "POST", "/scan", {"path": "app", "explain": True})
+    assert status == 200 and "main.py" in body["diagram"]
+    assert body["analysis"]["imports"] == 1
+    assert _call(port, "POST", "/scan", {"path": ".."})[0] == 403
+    assert _call(port, "POST", "/scan", {"path": "app", "depth": 99})[0] == 400
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork solo en POSIX")
+def test_prefork_workers_share_metrics(tmp_path):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    proc = subprocess.Popen([sys.executable, "-m", "ascii_architect.cli", "http", "--port", "0", "--workers", "2",
+                             "--root", str(tmp_path)], stdout=subprocess.PIPE, text=True, env=env)
+    try:
+        line = proc.stdout.readline()
+        port = int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+        for i in range(6):
+            assert _call(port, "POST", "/flow", {"layout": f"A{i} -> B"})[0] == 200
+        status, health = _call(port, "GET", "/health")
+        assert status == 200 and health["workers"] == 2
+        assert _call(port, "GET", "/metrics")[1]["endpoints"]["/flow"] == 6
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork solo en POSIX")
+def test_workers_are_recycled_after_max_requests(tmp_path):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    proc = subprocess.Popen([sys.executable, "-m", "ascii_architect.cli", "http", "--port", "0", "--workers", "2",
+                             "--max-requests", "2", "--root", str(tmp_path)], stdout=subprocess.PIPE, text=True, env=env)
+    try:
+        line = proc.stdout.readline()
+        port = int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+        pids = set()
+        for _ in range(8):
+            status, health = _call(port, "GET", "/health")
+            assert status == 200
+            pids.add(health["worker"])
+        assert len(pids) > 2     # Cada worker sale a las 2 peticiones y el padre lo reemplaza
+        assert _call(port, "GET", "/metrics")[1]["requests"] == 8
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
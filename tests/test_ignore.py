@@ -0,0 +1,63 @@
+from ascii_architect.ignore import IgnoreRules, is_ignored, parse_lines
+from ascii_architect.scanner import ProjectScanner
+
+
+def _rules(text, base=""):
+    return IgnoreRules(base, parse_lines(text.splitlines()))
+
+
+def test_last_match_wins_and_negation():
+    rules = _rules("*.log\n!important.log\n# comentario\n\n")
+    assert rules.match("debug.log", False) is True
+    assert rules.match("logs/important.log", False) is False
+    assert rules.match("main.py", False) is None
+
+
+def test_anchoring_and_directory_only_patterns():
+    rules = _rules("/build/\ngen/\ndocs/**/b\nsrc/*.tmp\n")
+    assert rules.match("build", True) is True
+    assert rules.match("src/build", True) is None       # anclado a la raíz
+    assert rules.match("src/gen", True) is True          # sin '/' interna: cualquier nivel
+    assert rules.match("gen", False) is None             # 'gen/' solo aplica a directorios
+    assert rules.match("docs/b", True) is True
+    assert rules.match("docs/x/y/b", True) is True
+    assert rules.match("src/a.tmp", False) is True
+    assert rules.match("src/deep/a.tmp", False) is None  # '*' no cruza '/'
+
+
+def test_bracket_classes_with_literal_brackets():
+    rules = _rules("[]a]x\n[!]]y\nz[ab\n")
+    assert rules.match("]x", False) is True and rules.match("ax", False) is True
+    assert rules.match("bx", False) is None
+    assert rules.match("qy", False) is True and rules.match("]y", False) is None
+    assert rules.match("z[ab", False) is True           # '[' sin cerrar: literal
+    assert rules.match("za", False) is None
+    assert _rules("[]\n").match("[]", False) is True
+    assert _rules("[z-a]\n").match("[z-a]", False) is True   # Rango inválido: no lanza, literal
+
+
+def test_deeper_files_override_parent_rules():
+    chain = (_rules("*.tmp\n"), _rules("!keep.tmp\n", base="sub"))
+    assert is_ignored(chain, "sub/keep.tmp", False) is False
+    assert is_ignored(chain, "sub/other.tmp", False) is True
+    assert is_ignored(chain[:1], "keep.tmp", False) is True
+
+
+def test_scanner_prunes_ignored_trees(tmp_path):
+    files = {
+        ".gitignore": "generated/\n*_pb2.py\n",
+        "main.py": "import utils\n",
+        "utils.py": "",
+        "api_pb2.py": "",
+        "generated/models.py": "",
+        "pkg/.ignore": "!keep_pb2.py\n",
+        "pkg/keep_pb2.py": "",
+    }
+    for rel, content in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    flow = ProjectScanner().scan(str(tmp_path), max_depth=3).to_topology()
+    assert "main.py -> utils.py" in flow and "keep_pb2.py" in flow
+    assert "api_pb2.py" not in flow and "models.py" not in flow
+    assert "models.py" in ProjectScanner(gitignore=False).scan(str(tmp_path), max_depth=3).to_topology()
@@ -0,0 +1,46 @@
+from ascii_architect.extractors import ImportRef
+from ascii_architect.module_index import ModuleIndex, package_prefix
+
+
+def _index(*paths, prefix=()):
+    index = ModuleIndex(prefix)
+    for path in paths:
+        index.add(path)
+    return index
+
+
+def test_absolute_imports_resolve_packages_and_src_layout():
+    index = _index("src/app/__init__.py", "src/app/core.py", "src/app/db/__init__.py", "src/app/db/models.py", "main.py")
+    assert index.resolve(ImportRef("app.core"), "main.py") == ["src/app/core.py"]
+    assert index.resolve(ImportRef("src.app.db.models"), "main.py") == ["src/app/db/models.py"]
+    # 'from paquete import submódulo' apunta al submódulo; si no existe, al paquete
+    assert index.resolve(ImportRef("app.db", ("models",)), "main.py") == ["src/app/db/models.py"]
+    assert index.resolve(ImportRef("app.db", ("Session",)), "main.py") == ["src/app/db/__init__.py"]
+    assert index.resolve(ImportRef("app.core.Engine"), "main.py") == ["src/app/core.py"]
+    assert index.resolve(ImportRef("os"), "main.py") == []
+
+
+def test_relative_imports_resolve_by_path():
+    index = _index("pkg/__init__.py", "pkg/canvas.py", "pkg/sub/__init__.py", "pkg/sub/router.py")
+    assert index.resolve(ImportRef("canvas", ("Canvas",), 1), "pkg/router.py") == ["pkg/canvas.py"]
+    assert index.resolve(ImportRef("", ("canvas",), 2), "pkg/sub/router.py") == ["pkg/canvas.py"]
+    assert index.resolve(ImportRef("", ("x",), 1), "pkg/sub/router.py") == ["pkg/sub/__init__.py"]
+    assert index.resolve(ImportRef("", ("x",), 5), "pkg/sub/router.py") == []
+
+
+def test_ambiguous_names_prefer_the_closest_file_and_get_path_labels():
+    index = _index("a/utils.py", "b/utils.py", "b/service.py", "main.py")
+    assert index.resolve(ImportRef("utils"), "b/service.py") == ["b/utils.py"]
+    assert index.resolve(ImportRef("a.utils"), "b/service.py") == ["a/utils.py"]
+    assert index.label("b/utils.py") == "b/utils.py"
+    assert index.label("b/service.py") == "service.py"
+
+
+def test_package_prefix(tmp_path):
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "__init__.py").write_text("")
+    assert package_prefix(tmp_path / "pkg" / "sub") == ["pkg", "sub"]
+    assert package_prefix(tmp_path) == []
+    index = _index("mod.py", prefix=["pkg", "sub"])
+    assert index.resolve(ImportRef("pkg.sub.mod"), "other.py") == ["mod.py"]
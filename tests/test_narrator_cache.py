@@ -0,0 +1,84 @@
+import os
+import time
+
+from ascii_architect.graph import ScanGraph
+from ascii_architect.narrator import Narrator
+from ascii_architect.narrator_cache import NarratorCache, cache_key
+from ascii_architect.transport import TransportError
+
+
+class _Reply:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {"text": self.text}
+
+
+class _FakeTransport:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def post(self, payload, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise TransportError("HTTP 503", status=503)
+        return _Reply(f"análisis {self.calls}")
+
+
+def test_key_ignores_formatting_but_not_content():
+    prompt = Narrator.PROMPTS["pro"]
+    assert cache_key("b -> c ; a  ->  b", prompt) == cache_key("a -> b ; b -> c", prompt)
+    assert cache_key("a -> b", prompt) != cache_key("a -> c", prompt)
+    assert cache_key("a -> b", prompt) != cache_key("a -> b", Narrator.PROMPTS["doom"])
+    assert cache_key("a -> b", prompt) != cache_key("a -> b", prompt, context="README")
+
+
+def test_same_graph_in_another_order_shares_the_compact_key(tmp_path):
+    first = ScanGraph.from_topology("pkg [DIR] -> b.py ; b.py -> c.py ; a.py -> b.py ; lonely.py")
+    second = ScanGraph.from_topology("lonely.py ; a.py -> b.py ; b.py -> c.py ; pkg [DIR] -> b.py")
+    prompt = Narrator.PROMPTS["pro"]
+    assert cache_key(first, prompt, encoding="compact:100") == cache_key(second, prompt, encoding="compact:100")
+    assert cache_key(first, prompt, encoding="compact:100") != cache_key(first, prompt, encoding="raw")
+    third = ScanGraph.from_topology("a.py -> b.py ; b.py -> c.py ; pkg [DIR] -> b.py")
+    assert cache_key(third, prompt) != cache_key(first, prompt)      # Sin el nodo suelto
+
+    transport = _FakeTransport()
+    narrator = Narrator(transport=transport, cache=NarratorCache(tmp_path))
+    assert narrator.compact
+    assert narrator.explain(first, use_ai=True) == narrator.explain(second, use_ai=True)
+    assert transport.calls == 1
+
+
+def test_narrator_reuses_cached_answers(tmp_path):
+    transport = _FakeTransport()
+    narrator = Narrator(transport=transport, cache=NarratorCache(tmp_path))
+    first = narrator.explain("a.py -> b.py", use_ai=True, style="pro")
+    assert narrator.explain("a.py -> b.py", use_ai=True, style="pro") == first == "análisis 1"
+    assert list(narrator.explain_stream("a.py -> b.py", style="pro")) == [first]
+    assert transport.calls == 1
+    assert narrator.explain("a.py -> b.py", use_ai=True, style="pro", refresh=True) == "análisis 2"
+    assert narrator.explain("a.py -> b.py", use_ai=True, style="hacker") == "análisis 3"
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = NarratorCache(tmp_path)
+    narrator = Narrator(transport=_FakeTransport(fail=True), cache=cache)
+    assert narrator.explain("a.py -> b.py", use_ai=True) == "Error n8n: 503"
+    assert not cache.path.exists() or not any(cache.path.iterdir())
+
+
+def test_ttl_and_size_bound(tmp_path):
+    cache = NarratorCache(tmp_path, ttl=60, max_entries=2)
+    cache.put("k1", "uno")
+    cache.put("k2", "dos")
+    past = time.time() - 30
+    for key in ("k1", "k2"):
+        os.utime(cache.path / f"{key}.json", (past, past))
+    assert cache.get("k1") == "uno"     # El acierto la marca como usada
+    cache.put("k3", "tres")             # Se pasa de 2: sale la menos usada (k2)
+    assert cache.get("k2") is None
+    assert cache.get("k1") == "uno" and cache.get("k3") == "tres"
+
+    assert NarratorCache(tmp_path, ttl=-1).get("k3") is None   # Caducada
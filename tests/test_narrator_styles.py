@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+from ascii_architect.narrator import Narrator
+
+
+class _Reply:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {"text": self.text}
+
+
+class _SlowTransport:
+    """Tarda distinto según la personalidad y cuenta las peticiones simultáneas."""
+
+    def __init__(self, delays, pool_size=4):
+        self.pool_size = pool_size
+        self.delays = {Narrator.PROMPTS[style]: (style, delay) for style, delay in delays.items()}
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def post(self, payload, **kwargs):
+        style, delay = next(v for prompt, v in self.delays.items() if payload["prompt"].startswith(prompt))
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(delay)
+        with self._lock:
+            self.active -= 1
+        return _Reply(f"análisis {style}")
+
+
+def _collect(narrator, styles, limit):
+    async def run():
+        return [item async for item in narrator.explain_styles("a.py -> b.py", styles, limit=limit)]
+    return asyncio.run(run())
+
+
+def test_styles_run_concurrently_in_completion_order():
+    transport = _SlowTransport({"pro": 0.3, "jarvis": 0.1, "doom": 0.2})
+    started = time.perf_counter()
+    results = _collect(Narrator(transport=transport), ["pro", "jarvis", "doom"], limit=4)
+    elapsed = time.perf_counter() - started
+
+    assert [style for style, _ in results] == ["jarvis", "doom", "pro"]
+    assert dict(results)["doom"] == "análisis doom"
+    assert elapsed < 0.5    # La más lenta (0.3 s), no la suma (0.6 s)
+
+
+def test_concurrency_limit_is_respected():
+    transport = _SlowTransport({"pro": 0.05, "jarvis": 0.05, "doom": 0.05, "eli5": 0.05})
+    results = _collect(Narrator(transport=transport), ["pro", "jarvis", "doom", "eli5"], limit=2)
+    assert len(results) == 4 and transport.peak == 2
+
+
+def test_concurrency_never_exceeds_the_transport_pool():
+    transport = _SlowTransport({"pro": 0.05, "jarvis": 0.05, "doom": 0.05, "eli5": 0.05}, pool_size=2)
+    results = _collect(Narrator(transport=transport), ["pro", "jarvis", "doom", "eli5"], limit=8)
+    assert len(results) == 4 and transport.peak == 2
+
+
+def test_own_transport_pool_follows_pool_size():
+    narrator = Narrator(pool_size=6)
+    assert narrator.transport.pool_size == 6
+    assert narrator.transport.session.get_adapter("http://localhost").poolmanager.connection_pool_kw["maxsize"] == 6
@@ -0,0 +1,43 @@
+import pytest
+
+from ascii_architect.pager import paginate, parse_page_size
+from ascii_architect.router import Router
+
+FLOW = "User -> API -> Very_Long_Service_Name -> DB ; A -> B -> C -> D ; E -> F"
+
+
+def test_pages_tile_the_full_diagram():
+    router = Router()
+    diagram = router.layout(FLOW)
+    full = router.rasterize(diagram).grid
+    pages = paginate(diagram, 40, 12)
+    assert pages.count > 1
+    for number in range(1, pages.count + 1):
+        x0, y0, w, h = pages.rect(number)
+        tile = router.rasterize(diagram, viewport=(x0, y0, w, h))
+        assert (tile.width, tile.height) == (w, h)
+        assert tile.grid == [row[x0:x0 + w] for row in full[y0:y0 + h]]
+
+
+def test_cuts_fall_between_nodes():
+    router = Router()
+    diagram = router.layout(FLOW)
+    pages = paginate(diagram, 40, 12)
+    for node in diagram.nodes:
+        for cut in pages.x_cuts[1:-1]:
+            assert not node.x < cut < node.x + node.w
+
+
+def test_render_single_page_has_connector_markers():
+    router = Router()
+    page = router.render(FLOW, page=1, page_size=(40, 12))
+    assert router.last_pages.count == 6
+    assert "p2" in page and "Very_Long" not in page
+    with pytest.raises(ValueError):
+        router.render(FLOW, page=99, page_size=(40, 12))
+
+
+def test_parse_page_size():
+    assert parse_page_size("120x40") == (120, 40)
+    with pytest.raises(ValueError):
+        parse_page_size("wide")
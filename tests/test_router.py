@@ -0,0 +1,75 @@
+from ascii_architect.layout import compact_layout, grid_layout
+from ascii_architect.records import Anchors, Diagram, EdgeRecord, NodeRecord
+from ascii_architect.router import Router
+
+
+def _rows(sizes):
+    return [[NodeRecord(f"n{r}{c}", "BOX", "", w, h, r, c) for c, (w, h) in enumerate(row)]
+            for r, row in enumerate(sizes)]
+
+
+def test_compaction_preserves_order_and_spacing():
+    rows = _rows([[(40, 3), (5, 3)], [(5, 3), (5, 3), (5, 3)], [(5, 3)]])
+    grid_w, grid_h = grid_layout(rows)
+    width, height = compact_layout(rows, gap_x=4, gap_y=3)
+    for row in rows:
+        for prev, node in zip(row, row[1:]):
+            assert node.x >= prev.x + prev.w + 4
+    # La fila 2 no hereda el ancho de la etiqueta larga de la fila 0
+    assert rows[2][0].x == rows[0][0].x
+    assert width * height < grid_w * grid_h
+
+
+def test_router_reports_area_saved():
+    router = Router(compact=True)
+    # La etiqueta ancha infla la columna 1 en el grid; la fila de abajo no la necesita
+    diagram = router.render("Start -> A_really_really_long_label ; B ; D -> E -> F -> G")
+    stats = router.last_compaction
+    assert stats["ratio"] > 0.3
+    assert stats["after"][0] * stats["after"][1] < stats["before"][0] * stats["before"][1]
+    assert "A_really_really_long_label" in diagram
+    plain = Router()
+    assert plain.render("A -> B") is not None
+    assert plain.last_compaction is None
+
+
+def test_router_reports_no_savings_when_nothing_compacts():
+    router = Router(compact=True)
+    router.render("A")
+    assert router.last_compaction["saved"] == 0
+    assert router.last_compaction["before"] == router.last_compaction["after"]
+    # Dos nodos: solo cambia el hueco entre columnas (GAP_X -> MIN_GAP_X), no el padding del canvas
+    router.render("A -> B")
+    stats = router.last_compaction
+    assert stats["before"][1] == stats["after"][1]
+    assert stats["before"][0] - stats["after"][0] == Router.GAP_X - Router.MIN_GAP_X
+    assert stats["ratio"] < 0.1
+
+
+def test_shape_cache_is_bounded():
+    router = Router(shape_cache_size=2)
+    first = router._get_node_shape("A", "BOX")
+    router._get_node_shape("B", "BOX")
+    assert router._get_node_shape(" A ", "BOX") is first     # Acierto: A pasa a ser la más reciente
+    router._get_node_shape("C", "BOX")                        # Expulsa B (la menos usada)
+    info = router._shape_cache.cache_info()
+    assert info.currsize == 2 and info.hits == 1
+    assert router._get_node_shape("A", "BOX") is first
+    router._get_node_shape("B", "BOX")
+    assert router._shape_cache.cache_info().misses == 4
+
+
+def test_records_have_no_instance_dict():
+    node = NodeRecord("a", "BOX", "+-+", 3, 1, 0, 0)
+    for record in (node, Anchors(0, 0, 3, 1), EdgeRecord(0, 1, "h"), Diagram([], [], [], 1, 1)):
+        assert not hasattr(record, "__dict__")
+
+
+def test_layout_uses_records_and_shares_art():
+    router = Router()
+    diagram = router.layout("api.py -> db.sql ; api.py -> cache.py")
+    assert [node.label for node in diagram.nodes] == ["api.py", "db.sql", "api.py", "cache.py"]
+    assert diagram.nodes[0].art is diagram.nodes[2].art
+    assert [(e.src, e.dst, e.kind) for e in diagram.edges] == [(0, 1, "h"), (0, 2, "v"), (1, 3, "v"), (2, 3, "h")]
+    anchors = diagram.anchors[0]
+    assert anchors.e == (diagram.nodes[0].x + diagram.nodes[0].w - 1, anchors.cy)
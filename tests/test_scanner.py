@@ -0,0 +1,120 @@
+import os
+import time
+
+from ascii_architect.scanner import ProjectScanner
+
+
+def _tree(tmp_path, files):
+    for rel, content in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def test_scan_depth_and_ignored_dirs(tmp_path):
+    root = _tree(tmp_path, {
+        "main.py": "import utils\n",
+        "utils.py": "",
+        "pkg/models.py": "",
+        "pkg/deep/hidden.py": "",
+        "node_modules/lib.py": "",
+        ".cache/x.py": "",
+        "schema.sql": "",
+    })
+    flow = ProjectScanner().scan(str(root), max_depth=2).to_topology()
+    edges = flow.split(" ; ")
+    assert "main.py -> utils.py" in edges
+    assert "pkg [DIR] -> models.py" in edges
+    assert "ROOT [DIR] -> schema.sql" in edges
+    assert "hidden.py" not in flow and "lib.py" not in flow and "x.py" not in flow
+
+
+def test_scan_missing_path():
+    assert ProjectScanner().scan("/does/not/exist").to_topology() == "Error -> Path_Not_Found"
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    files = {f"mod_{i}.py": f"import mod_{(i + 1) % 40}\nimport os\n" for i in range(40)}
+    files.update({f"pkg/sub_{i}.py": "from mod_3 import x\n" for i in range(20)})
+    root = _tree(tmp_path, files)
+    serial = ProjectScanner().scan(str(root), max_depth=2).to_topology()
+    assert ProjectScanner(jobs=4, chunk_size=5).scan(str(root), max_depth=2).to_topology() == serial
+    assert ProjectScanner(jobs=2, pool="process", chunk_size=16).scan(str(root), max_depth=2).to_topology() == serial
+
+
+def _age(root, seconds=3600):
+    """Mtimes antiguos: fuera de la ventana 'racy' de la caché."""
+    old = time.time() - seconds
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, (old, old))
+
+
+def test_cache_reuses_and_detects_changes(tmp_path):
+    root = _tree(tmp_path, {"main.py": "import utils\n", "utils.py": "", "pkg/models.py": "import utils\n"})
+    _age(root)
+    baseline = ProjectScanner().scan(str(root), max_depth=2).to_topology()
+
+    first = ProjectScanner(cache=True)
+    assert first.scan(str(root), max_depth=2).to_topology() == baseline
+    assert first.last_cache_stats["parsed"] == 3
+    assert (root / ".ascii-arch" / "scan.cache").exists()
+
+    second = ProjectScanner(cache=True)
+    assert second.scan(str(root), max_depth=2).to_topology() == baseline
+    assert second.last_cache_stats == {"hits": 3, "parsed": 0, "checked": 0}
+
+    # Edición, renombrado y borrado
+    (root / "main.py").write_text("import helpers\n")
+    (root / "utils.py").rename(root / "helpers.py")
+    (root / "pkg" / "models.py").unlink()
+    third = ProjectScanner(cache=True)
+    flow = third.scan(str(root), max_depth=2).to_topology()
+    assert flow == ProjectScanner().scan(str(root), max_depth=2).to_topology()
+    assert "main.py -> helpers.py" in flow and "models.py" not in flow
+    assert third.last_cache_stats["parsed"] == 2
+
+
+def test_cache_touch_without_changes_skips_parse(tmp_path):
+    root = _tree(tmp_path, {"main.py": "import utils\n", "utils.py": ""})
+    _age(root)
+    ProjectScanner(cache=True).scan(str(root))
+    os.utime(root / "main.py", None)
+    scanner = ProjectScanner(cache=True)
+    assert "main.py -> utils.py" in scanner.scan(str(root)).to_topology()
+    assert scanner.last_cache_stats == {"hits": 1, "parsed": 0, "checked": 1}
+
+
+def test_scan_keeps_same_named_modules_apart(tmp_path):
+    root = _tree(tmp_path, {
+        "api/__init__.py": "",
+        "api/utils.py": "",
+        "api/views.py": "from .utils import helper\n",
+        "core/__init__.py": "",
+        "core/utils.py": "",
+        "core/engine.py": "from core import utils\nimport api.views\n",
+    })
+    edges = ProjectScanner().scan(str(root), max_depth=2).to_topology().split(" ; ")
+    assert "views.py -> api/utils.py" in edges
+    assert "engine.py -> core/utils.py" in edges
+    assert "engine.py -> views.py" in edges
+
+
+def test_polyglot_scan_resolves_js_go_and_rust(tmp_path):
+    root = _tree(tmp_path, {
+        "web/app.ts": "import { api } from './api';\nconst cfg = require('./config.js');\nimport React from 'react';\n",
+        "web/api/index.ts": "export const api = 1;\n",
+        "web/config.js": "",
+        "svc/go.mod": "module example.com/svc\n\ngo 1.21\n",
+        "svc/main.go": 'package main\n\nimport (\n    "fmt"\n    "example.com/svc/store"\n)\n\nfunc main() {}\n',
+        "svc/store/db.go": "package store\n",
+        "core/Cargo.toml": "",
+        "core/src/lib.rs": "mod parser;\nuse crate::parser::ast::Node;\n",
+        "core/src/parser.rs": "pub mod ast;\n",
+        "core/src/parser/ast.rs": "use super::super::lib;\n",
+    })
+    edges = ProjectScanner(jobs=2, chunk_size=2).scan(str(root), max_depth=4).to_topology().split(" ; ")
+    assert "app.ts -> index.ts" in edges and "app.ts -> config.js" in edges
+    assert "main.go -> store [DIR]" in edges and "store [DIR] -> db.go" in edges
+    assert "lib.rs -> parser.rs" in edges and "lib.rs -> ast.rs" in edges
+    assert "parser.rs -> ast.rs" in edges
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+# Coste propio de importar la CLI (sin typer/click, que no dependen de nosotros)
+STARTUP_BUDGET_MS = 100
+HEAVY = ("torch", "transformers", "requests", "urllib3", "asyncio",
+         "ascii_architect.scanner", "ascii_architect.narrator", "ascii_architect.neural_engine")
+
+
+def _importtime(*args):
+    """{módulo: tiempo acumulado en µs} de `python -X importtime ...`."""
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True,
+                          env=env, timeout=60)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times, proc.stdout
+
+
+def test_flow_never_loads_heavy_modules():
+    times, out = _importtime("-m", "ascii_architect.cli", "flow", "a -> b")
+    assert "TEMPLATE MODE" in out
+    assert [name for name in HEAVY if name in times] == []
+
+
+def test_cli_import_fits_the_startup_budget():
+    # La mejor de tres: el primer arranque paga la caché de disco / los .pyc
+    own = []
+    for _ in range(3):
+        times, _ = _importtime("-c", "import ascii_architect.cli")
+        own.append(times["ascii_architect.cli"] - times.get("typer", 0))
+    assert min(own) / 1000 < STARTUP_BUDGET_MS
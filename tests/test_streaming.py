@@ -0,0 +1,79 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ascii_architect.narrator import Narrator
+from ascii_architect.streaming import iter_ndjson, iter_sse
+from ascii_architect.transport import NarratorTransport
+
+
+class _ChunkedStub(BaseHTTPRequestHandler):
+    """Responde server.reply = (content_type, [chunks]); antes del segundo chunk espera a server.release."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        content_type, chunks = self.server.reply
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, chunk in enumerate(chunks):
+            if i == 1:
+                self.server.release.wait(5)
+            data = chunk if isinstance(chunk, bytes) else chunk.encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChunkedStub)
+    server.release = threading.Event()
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_port}/webhook/explain"
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_sse_events_split_across_chunks():
+    chunks = ['data: {"text": "Ho', 'la"}\r\n\r\n: ping\n\ndata: ', 'uno\ndata: dos\n\n', "data: [DONE]\n\ndata: x\n\n"]
+    assert list(iter_sse(chunks)) == ["Hola", "uno\ndos"]
+
+
+def test_ndjson_accepts_openai_style_deltas():
+    chunks = ['{"choices": [{"delta": {"content": "a"}}]}\n{"out', 'put": "b"}\n\n']
+    assert list(iter_ndjson(chunks)) == ["a", "b"]
+
+
+def test_stream_yields_before_the_reply_ends(stub):
+    stub.reply = ("text/event-stream", ['data: {"text": "Primero"}\n\n', 'data: {"text": " segundo"}\n\n'])
+    narrator = Narrator(transport=NarratorTransport(stub.url))
+    fragments = narrator.explain_stream("a.py -> b.py")
+    # El servidor no manda el segundo evento hasta que recibimos el primero
+    assert next(fragments) == "Primero"
+    stub.release.set()
+    assert list(fragments) == [" segundo"]
+
+
+def test_stream_falls_back_to_single_json_reply(stub):
+    stub.release.set()
+    stub.reply = ("application/json", [json.dumps({"output": "Análisis "})])
+    narrator = Narrator(transport=NarratorTransport(stub.url))
+    assert list(narrator.explain_stream("a.py -> b.py")) == ["Análisis "]
+
+
+def test_plain_chunked_text_keeps_multibyte_characters(stub):
+    stub.release.set()
+    data = "Señor, el núcleo".encode()
+    stub.reply = ("text/plain", [data[:3], data[3:]])   # La ñ queda partida entre chunks
+    narrator = Narrator(transport=NarratorTransport(stub.url))
+    assert "".join(narrator.explain_stream("a.py -> b.py")) == "Señor, el núcleo"
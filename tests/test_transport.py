@@ -0,0 +1,127 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ascii_architect.narrator import Narrator
+from ascii_architect.transport import CircuitOpenError, NarratorTransport, TransportError
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """Webhook de mentira: responde los códigos de `script` en orden (después, 200)."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server.hits.append((self.client_address[1], json.loads(body)))
+        status = server.script.pop(0) if server.script else 200
+        if status == "truncated":
+            # 200 chunked que se corta a mitad de un chunk
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"20\r\n{\"text\": \"o")
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        data = json.dumps({"text": "ok"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    server.hits = []
+    server.script = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}/webhook/explain"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_transient_errors_on_one_connection(stub):
+    stub.script = [503, 502]
+    delays = []
+    transport = NarratorTransport(stub.url, retries=2, sleep=delays.append)
+    assert transport.post({"text": "a -> b"}).json() == {"text": "ok"}
+    assert transport.post({"text": "c -> d"}).ok
+    # Keep-alive: los cuatro intentos salen por el mismo puerto local
+    assert len(stub.hits) == 4 and len({port for port, _ in stub.hits}) == 1
+    assert len(delays) == 2 and all(0 <= d <= 1.0 for d in delays)
+    stats = transport.metrics.snapshot()
+    assert stats["requests"] == 2 and stats["retries"] == 2 and stats["errors"] == {"status:503": 1, "status:502": 1}
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [400]
+    transport = NarratorTransport(stub.url, retries=3, sleep=lambda s: None)
+    with pytest.raises(TransportError) as info:
+        transport.post({})
+    assert info.value.status == 400 and len(stub.hits) == 1
+    assert transport.breaker.state == "closed"
+
+
+def test_circuit_opens_and_recovers(stub):
+    now = [0.0]
+    stub.script = [503, 503]
+    transport = NarratorTransport(stub.url, retries=0, failure_threshold=2, reset_after=10,
+                                  sleep=lambda s: None, clock=lambda: now[0])
+    for _ in range(2):
+        with pytest.raises(TransportError):
+            transport.post({})
+    with pytest.raises(CircuitOpenError):
+        transport.post({})
+    assert len(stub.hits) == 2 and transport.metrics.rejected == 1
+
+    now[0] = 11.0   # half-open: la prueba pasa y el circuito se cierra
+    assert transport.post({}).ok and transport.breaker.state == "closed"
+
+
+def test_narrator_reports_connection_errors():
+    transport = NarratorTransport("http://127.0.0.1:9/webhook", retries=1, connect_timeout=0.5,
+                                  sleep=lambda s: None)
+    result = Narrator(transport=transport).explain("a.py -> b.py", use_ai=True)
+    assert result.startswith("Error conexión")
+    assert transport.metrics.snapshot()["attempts"] == 2
+
+
+def test_truncated_response_is_a_transport_failure(stub):
+    stub.script = ["truncated", "truncated"]
+    transport = NarratorTransport(stub.url, retries=1, sleep=lambda s: None)
+    result = Narrator(transport=transport).explain("a.py -> b.py", use_ai=True)
+    assert result.startswith("Error conexión")
+    stats = transport.metrics.snapshot()
+    assert stats["attempts"] == 2 and stats["failures"] == 1
+    assert stats["errors"] == {"ChunkedEncodingError": 2}
+    assert transport.breaker.failures == 1
+
+
+def test_truncated_response_during_half_open_reopens_the_circuit(stub):
+    now = [0.0]
+    stub.script = [503, 503, "truncated"]
+    transport = NarratorTransport(stub.url, retries=0, failure_threshold=2, reset_after=10,
+                                  sleep=lambda s: None, clock=lambda: now[0])
+    for _ in range(2):
+        with pytest.raises(TransportError):
+            transport.post({})
+
+    now[0] = 11.0   # half-open: la prueba falla con una respuesta cortada y el circuito se reabre
+    with pytest.raises(TransportError) as info:
+        transport.post({})
+    assert not isinstance(info.value, CircuitOpenError)
+    assert transport.breaker.state == "open"
+
+    now[0] = 22.0   # La siguiente prueba no queda bloqueada por la anterior
+    assert transport.post({}).ok and transport.breaker.state == "closed"
@@ -0,0 +1,99 @@
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from ascii_architect.scanner import ProjectScanner
+from ascii_architect.watch import FrameRenderer, InotifyWatcher, PollingWatcher
+
+
+def test_frame_renderer_redraws_only_changed_rows():
+    renderer = FrameRenderer(stream=io.StringIO(), height=50)
+    first = renderer.diff("a\nb\nc")
+    assert first.startswith("\x1b[?25l\x1b[2J")
+    assert renderer.diff("a\nB\nc") == "\x1b[2;1HB\x1b[K\x1b[4;1H"
+    # Filas sobrantes del frame anterior se borran
+    assert renderer.diff("a") == "\x1b[2;1H\x1b[K\x1b[3;1H\x1b[K\x1b[2;1H"
+
+
+def test_frame_renderer_clips_to_terminal_height():
+    renderer = FrameRenderer(stream=io.StringIO(), height=5)
+    renderer.diff("\n".join(str(i) for i in range(10)))
+    assert renderer.previous == ["0", "1", "2", "... (7 filas más; usa --page-size)"]
+
+
+def _touch_later(path, text, delay=0.1):
+    timer = threading.Timer(delay, path.write_text, args=(text,))
+    timer.start()
+    return timer
+
+
+def test_polling_watcher_reports_changed_paths(tmp_path):
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / ".hidden").write_text("")
+    watcher = PollingWatcher(str(tmp_path), interval=0.02, debounce=0.02)
+    assert watcher.wait(timeout=0.05) == set()
+    _touch_later(tmp_path / "a.py", "import os\n")
+    changes = watcher.wait(timeout=2)
+    assert str(tmp_path / "a.py") in changes
+
+
+def test_ignore_files_are_watched(tmp_path):
+    (tmp_path / ".gitignore").write_text("")
+    watcher = PollingWatcher(str(tmp_path), interval=0.02, debounce=0.02)
+    _touch_later(tmp_path / ".env", "SECRET=1\n")
+    assert watcher.wait(timeout=0.3) == set()
+    _touch_later(tmp_path / ".gitignore", "build/\n")
+    assert str(tmp_path / ".gitignore") in watcher.wait(timeout=2)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify solo en Linux")
+def test_inotify_watcher_debounces_and_tracks_new_dirs(tmp_path):
+    watcher = InotifyWatcher(str(tmp_path), max_depth=3, debounce=0.05)
+    try:
+        (tmp_path / "pkg").mkdir()
+        assert str(tmp_path / "pkg") in watcher.wait(timeout=1)
+
+        start = time.monotonic()
+        for i in range(5):
+            (tmp_path / "pkg" / "mod.py").write_text(f"x = {i}\n")
+        (tmp_path / ".ascii-arch").mkdir()
+        changes = watcher.wait(timeout=1)
+        assert time.monotonic() - start < 0.5
+        assert str(tmp_path / "pkg" / "mod.py") in changes
+        assert not any(".ascii-arch" in path for path in changes)
+    finally:
+        watcher.close()
+
+
+def test_scan_with_watch_hints_only_rechecks_changed_paths(tmp_path):
+    for name, text in {"main.py": "import utils\n", "utils.py": "", "other.py": ""}.items():
+        (tmp_path / name).write_text(text)
+    scanner = ProjectScanner(cache=True)
+    root = str(tmp_path.resolve())
+    assert "main.py -> utils.py" in scanner.scan(root).to_topology()
+
+    (tmp_path / "main.py").write_text("import other\n")
+    changed = {os.path.join(root, "main.py"), root}
+    flow = scanner.scan(root, changed=changed).to_topology()
+    assert "main.py -> other.py" in flow
+    assert scanner.last_cache_stats["hits"] == 2
+
+
+def test_watch_frames_reuse_an_in_memory_cache_without_writing_to_disk(tmp_path):
+    for name, text in {"main.py": "import utils\n", "utils.py": "", "other.py": ""}.items():
+        (tmp_path / name).write_text(text)
+    scanner = ProjectScanner(memory_cache=True)      # Como 'scan --watch' sin --cache
+    root = str(tmp_path.resolve())
+    scanner.scan(root)
+    assert scanner.last_cache_stats["parsed"] == 3
+
+    (tmp_path / "main.py").write_text("import other\n")
+    flow = scanner.scan(root, changed={os.path.join(root, "main.py"), root}).to_topology()
+    assert "main.py -> other.py" in flow
+    assert scanner.last_cache_stats["hits"] == 2 and scanner.last_cache_stats["parsed"] == 1
+    scanner.save_cache()
+    assert not (tmp_path / ".ascii-arch").exists()